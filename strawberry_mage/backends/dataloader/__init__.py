@@ -1 +1,129 @@
-"""WIP universal backend using a strawberry-graphql dataloader (https://strawberry.rocks/docs/guides/dataloaders)."""
+"""Universal backend using a strawberry-graphql dataloader (https://strawberry.rocks/docs/guides/dataloaders)."""
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, Union
+
+from overrides import overrides
+from strawberry.annotation import StrawberryAnnotation
+from strawberry.dataloader import DataLoader
+from strawberry.directive import StrawberryDirective
+from strawberry.extensions import Extension
+from strawberry.schema.types import ConcreteType
+from strawberry.types import Info
+
+from strawberry_mage.core.types import GraphQLOperation, IDataBackend, TEntity
+from strawberry_mage.core.utils import freeze, get_request_state
+
+
+class DataLoaderBackend(IDataBackend[TEntity]):
+    """
+    Data backend resolving relationships with dataloaders, wrapping any backend which implements load_related.
+
+    Entities are resolved by the wrapped backend without their relationships. Relationship fields are then resolved
+    lazily, the dataloader collects the parent entities of every relationship field within one graphql request and
+    loads the related entities of all of them with a single call to load_related of the wrapped backend.
+    Dataloaders are kept in the request context, see get_request_state.
+    """
+
+    def __init__(self, backend: IDataBackend[TEntity]):
+        """
+        Create a new backend wrapping another backend.
+
+        :param backend: backend used to load the data
+        """
+        self._backend = backend
+
+    @property
+    def backend(self) -> IDataBackend[TEntity]:
+        """
+        Get the wrapped backend.
+
+        :return: backend used to load the data
+        """
+        return self._backend
+
+    def _get_loader(self, model: Type[TEntity], attribute: str, info: Info, **kwargs) -> DataLoader:
+        state = get_request_state(info.context)
+        loader_key = ("dataloader", model, attribute, freeze(kwargs))
+        loader = state.get(loader_key)
+        if loader is None:
+
+            async def load(keys: List[Tuple]) -> List[Any]:
+                return await self._backend.load_related(model, attribute, keys, info=info, **kwargs)
+
+            loader = state[loader_key] = DataLoader(load_fn=load)
+        return loader
+
+    @overrides
+    async def resolve_relationship(
+        self, model: Type[TEntity], attribute: str, info: Info, parent: TEntity, *args, **kwargs
+    ) -> Any:
+        key = tuple(getattr(parent, k) for k in self.get_primary_key(model))
+        return await self._get_loader(model, attribute, info, **kwargs).load(key)
+
+    @overrides
+    async def load_related(self, model: Type[TEntity], attribute: str, keys, *args, **kwargs) -> List[Any]:
+        return await self._backend.load_related(model, attribute, keys, *args, **kwargs)
+
+    @overrides
+    async def resolve(
+        self, model: Type[TEntity], operation: GraphQLOperation, info: Info, data: Any, *args, **kwargs
+    ) -> Any:
+        return await self._backend.resolve(model, operation, info, data, *args, load_relationships=False, **kwargs)
+
+    @overrides
+    def get_strawberry_field_type(self, type_: StrawberryAnnotation) -> Union[Type, str]:
+        return self._backend.get_strawberry_field_type(type_)
+
+    @overrides
+    def get_attributes(self, model: Type[TEntity], operation: Optional[GraphQLOperation] = None) -> List[str]:
+        return self._backend.get_attributes(model, operation)
+
+    @overrides
+    def get_attribute_types(self, model: Type[TEntity]) -> Dict[str, Type]:
+        return self._backend.get_attribute_types(model)
+
+    @overrides
+    def get_attribute_type(self, model: Type[TEntity], attr: str) -> Type:
+        return self._backend.get_attribute_type(model, attr)
+
+    @overrides
+    def get_primary_key(self, model: Type[TEntity]) -> Tuple:
+        return self._backend.get_primary_key(model)
+
+    @overrides
+    def get_parent_class_name(self, model: Type[TEntity]) -> Optional[str]:
+        return self._backend.get_parent_class_name(model)
+
+    @overrides
+    def get_children_class_names(self, model: Type[TEntity]) -> Optional[Set[str]]:
+        return self._backend.get_children_class_names(model)
+
+    @overrides
+    def get_operations(self, model: Type[TEntity]) -> Set[GraphQLOperation]:
+        return self._backend.get_operations(model)
+
+    @overrides
+    def pre_setup(self, models: Iterable[Type[TEntity]]) -> None:
+        self._backend.pre_setup(models)
+
+    @overrides
+    def post_setup(self) -> None:
+        self._backend.post_setup()
+
+    @overrides
+    def dispose(self) -> None:
+        self._backend.dispose()
+
+    @overrides
+    def get_schema_directives(self) -> List[StrawberryDirective]:
+        return self._backend.get_schema_directives()
+
+    @overrides
+    def get_schema_extensions(self) -> List[Type[Extension]]:
+        return self._backend.get_schema_extensions()
+
+    @overrides
+    def get_polymorphic_type(self, base_type: ConcreteType):
+        return self._backend.get_polymorphic_type(base_type)
+
+
+__all__ = ["DataLoaderBackend"]
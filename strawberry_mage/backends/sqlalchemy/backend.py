@@ -1,32 +1,44 @@
 """Strawberry-GraphQL-Mage data backend that uses SQLAlchemy mapper objects to load data from a database."""
-import itertools
-from functools import lru_cache
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, Union
+import dataclasses
+from inspect import isclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Type, Union
 
+from frozendict import frozendict
 from overrides import overrides
-from sqlalchemy import Integer, String, inspect
+from sqlalchemy import Integer, String
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
-from sqlalchemy.orm import (
-    ColumnProperty,
-    Mapper,
-    RelationshipProperty,
-    sessionmaker,
-)
-from sqlalchemy.orm.interfaces import MANYTOMANY, ONETOMANY
-from sqlalchemy.orm.util import AliasedInsp
+from sqlalchemy.orm import sessionmaker
+from strawberry.directive import StrawberryDirective
+from strawberry.extensions import Extension
 from strawberry.schema.types import ConcreteType
 from strawberry.types import Info
 
+from strawberry_mage.backends.sqlalchemy.loading import loading
+from strawberry_mage.backends.sqlalchemy.metadata import ModelMetadata, create_model_metadata, get_metadata
 from strawberry_mage.backends.sqlalchemy.models import SQLAlchemyModel
 from strawberry_mage.backends.sqlalchemy.operations import (
+    PlanCacheType,
     create_,
     delete_,
+    delete_where_,
     list_,
+    load_related_,
     retrieve_,
     update_,
+    update_where_,
+)
+from strawberry_mage.backends.sqlalchemy.pagination import CountMode
+from strawberry_mage.backends.sqlalchemy.session import (
+    READ_OPERATIONS,
+    SessionExtension,
+    SessionScope,
+    scoped_session,
 )
 from strawberry_mage.core.backend import DataBackendBase
-from strawberry_mage.core.types import GraphQLOperation, IEntityModel
+from strawberry_mage.core.cache import LRUCache
+from strawberry_mage.core.result_cache import IResultCache
+from strawberry_mage.core.types import GraphQLOperation, IEntityModel, Selection
+from strawberry_mage.core.utils import freeze
 
 
 class SQLAlchemyBackend(DataBackendBase):
@@ -34,32 +46,99 @@ class SQLAlchemyBackend(DataBackendBase):
 
     _TYPE_MAP = {Integer: int, String: str}
 
-    def __init__(self, engine: AsyncEngine):
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        plan_cache_size: Optional[int] = 256,
+        metadata_cache_size: Optional[int] = 1024,
+        selection_cache_size: Optional[int] = 1024,
+        count_mode: CountMode = CountMode.EXACT,
+        concurrent_count: bool = False,
+        session_scope: SessionScope = SessionScope.FIELD,
+        max_concurrent_reads: int = 0,
+        insert_chunk_size: int = 1000,
+        column_projection: bool = True,
+        raw_rows: bool = False,
+        json_aggregation: bool = False,
+        result_cache: Optional[IResultCache] = None,
+    ):
         """
         Create a new backend with a given database engine.
 
         :param engine: engine to use
+        :param plan_cache_size: maximum number of cached query plans, None for unbounded, 0 disables the cache
+        :param metadata_cache_size: maximum number of models with cached annotations, None for unbounded
+        :param selection_cache_size: maximum number of cached selections (and lists of variables they depend on),
+            None for unbounded, 0 disables the cache
+        :param count_mode: how to compute total results counts of query-many operations
+        :param concurrent_count: run the count query in a separate session concurrently with the page query,
+            requires a connection pool which can provide more than one connection
+        :param session_scope: lifetime of sessions, REQUEST shares one session (and connection) by all fields of a
+            graphql request, which requires the request to have a context
+        :param max_concurrent_reads: if positive, independent query root fields of a request run concurrently, each in
+            a separate session, at most this many at once; requires a connection pool which can provide that many
+            connections
+        :param insert_chunk_size: maximum number of rows inserted by one statement when creating entities in bulk,
+            0 creates all entities through the ORM
+        :param column_projection: load only the selected columns of entities (with primary and foreign keys),
+            otherwise all columns except the unselected heavy columns of models (__deferred_columns__) are loaded
+        :param raw_rows: resolve query operations with read-only entities built directly from result rows instead of
+            orm instances, relationships are loaded by one query per selected relationship; the entities are not
+            attached to the session and their unselected attributes are not set
+        :param json_aggregation: resolve query operations with a single statement, which aggregates the selected
+            relationships of every entity into one JSON document in the database (SQLite or PostgreSQL); the entities
+            are read-only the same way as with raw_rows, which this option takes precedence over
+        :param result_cache: cache of the results of query operations, results are invalidated by the names of the
+            tables they were read from (including the tables of selected and filtered relationships) when other
+            operations change the tables; cached entities are shared by requests and must not be modified
         """
+        super().__init__(metadata_cache_size, selection_cache_size)
         self._session = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+        self._plan_cache: PlanCacheType = LRUCache(maxsize=plan_cache_size)
+        self._count_mode = count_mode
+        self._concurrent_count = concurrent_count
+        self._session_scope = session_scope
+        self._max_concurrent_reads = max_concurrent_reads
+        self._insert_chunk_size = insert_chunk_size
+        self._column_projection = column_projection
+        self._raw_rows = raw_rows
+        self._json_aggregation = json_aggregation
+        self._result_cache = result_cache
+        self._metadata: Mapping[Type[Union[IEntityModel, SQLAlchemyModel]], ModelMetadata] = {}
+
+    @property
+    def result_cache(self) -> Optional[IResultCache]:
+        """
+        Get the cache of the results of query operations.
+
+        :return: result cache, None if results are not cached
+        """
+        return self._result_cache
 
-    @staticmethod
-    def _remove_polymorphic_cols(model: Type[Union[IEntityModel, SQLAlchemyModel]], cols: List[str]) -> List[str]:
-        inspection: Mapper = inspect(model)
-        if inspection.polymorphic_on is None:
-            return cols
-        return [c for c in cols if c != inspection.polymorphic_on.key]
-
-    @staticmethod
-    def _remove_pk_cols(model: Type[Union[IEntityModel, SQLAlchemyModel]], cols: List[str]):
-        return [c for c in cols if c not in model.get_primary_key()]
-
-    @staticmethod
-    def _is_nullable(col: Union[ColumnProperty, RelationshipProperty]):
-        if isinstance(col, ColumnProperty):
-            return getattr(col, "nullable", False) or getattr(col.expression, "nullable", False)
-        if col.direction in {ONETOMANY}:
-            return True
-        return all((c.nullable for c in col.local_columns))
+    @property
+    def plan_cache(self) -> PlanCacheType:
+        """
+        Get the cache of compiled query plans used for query-one and query-many operations.
+
+        :return: plan cache
+        """
+        return self._plan_cache
+
+    def get_metadata(self, model: Type[Union[IEntityModel, SQLAlchemyModel]]) -> ModelMetadata:
+        """
+        Get metadata of a model.
+
+        Metadata of the models of the schema are collected while the models are set up and the registry is frozen
+        in pre_setup, metadata of other models (e.g. aliases) are collected on every call.
+        :param model: model or its alias
+        :return: metadata of the model
+        """
+        metadata = self._metadata.get(model)
+        if metadata is None:
+            metadata = create_model_metadata(model)
+            if not isinstance(self._metadata, frozendict):
+                self._metadata[model] = metadata
+        return metadata
 
     @overrides
     def get_attributes(
@@ -67,86 +146,45 @@ class SQLAlchemyBackend(DataBackendBase):
         model: Type[Union[IEntityModel, SQLAlchemyModel]],
         operation: Optional[GraphQLOperation] = None,
     ) -> List[str]:
-        inspection = inspect(model)
-        all_ = list(a for a in (inspection.mapper.attrs if isinstance(inspection, AliasedInsp) else inspection.attrs))
-        pk_cols = set(inspection.mapper.primary_key)
-        fk_cols = (
-            set(itertools.chain(*[c.local_columns for c in all_ if isinstance(c, RelationshipProperty)])) - pk_cols
-        )
-        all_ = [a.key for a in all_ if not (isinstance(a, ColumnProperty) and any(c in fk_cols for c in a.columns))]
-        if operation in {GraphQLOperation.QUERY_ONE, GraphQLOperation.QUERY_MANY, None}:
-            return all_
-        all_ = self._remove_polymorphic_cols(model, all_)
-        all_ = self._remove_pk_cols(model, all_)
-        if operation in {
-            GraphQLOperation.CREATE_ONE,
-            GraphQLOperation.CREATE_MANY,
-            GraphQLOperation.UPDATE_ONE,
-            GraphQLOperation.UPDATE_MANY,
-        }:
-            return all_
-        return []
-
-    @lru_cache(maxsize=2000)
-    def _get_attribute_type(self, attr: Union[ColumnProperty, RelationshipProperty]) -> Type:
-        if isinstance(attr, ColumnProperty):
-            python_type = (
-                attr.expression.type.impl.python_type
-                if hasattr(attr.expression.type, "impl")
-                else attr.expression.type.python_type
-            )
-        else:
-            python_type = attr.entity.class_.__name__
-
-        if self._is_nullable(attr):
-            python_type = Optional[python_type]  # type: ignore
-        if isinstance(attr, RelationshipProperty) and attr.direction in {
-            ONETOMANY,
-            MANYTOMANY,
-        }:
-            python_type = Optional[List[python_type]]  # type: ignore
-        return python_type
-
-    @lru_cache
+        return list(self.get_metadata(model).attributes[operation])
+
     @overrides
     def get_attribute_type(self, model: Type[Union[IEntityModel, SQLAlchemyModel]], attr: str) -> Type:
-        inspection = inspect(model)
-        col: Union[ColumnProperty, RelationshipProperty] = getattr(
-            inspection.mapper.attrs if isinstance(inspection, AliasedInsp) else inspection.attrs,
-            attr,
-        )
-        return self._get_attribute_type(col)
+        return self.get_metadata(model).attribute_types[attr]
 
-    @lru_cache
     @overrides
     def get_attribute_types(self, model: Type[Union[IEntityModel, SQLAlchemyModel]]) -> Dict[str, Type]:
-        return {attr: self.get_attribute_type(model, attr) for attr in self.get_attributes(model)}
+        metadata = self.get_metadata(model)
+        return {attr: metadata.attribute_types[attr] for attr in metadata.attributes[None]}
 
     @overrides
     def get_primary_key(self, model: Type[Union[IEntityModel, SQLAlchemyModel]]) -> Tuple:
-        return tuple(a.key for a in inspect(model).primary_key)
+        return self.get_metadata(model).primary_key
 
     @overrides
     def get_parent_class_name(self, model: Type["IEntityModel"]) -> Optional[str]:
-        inspection = inspect(model)
-        if inspection.polymorphic_on is not None:
-            return [
-                m.class_.__name__
-                for m in inspection.polymorphic_map.values()
-                if m.local_table == inspection.polymorphic_on.table
-            ][0]
-        return None
+        return self.get_metadata(model).parent_class_name
 
     @overrides
     def get_children_class_names(self, model: Type[SQLAlchemyModel]) -> Optional[Set[str]]:
-        inspection = inspect(model)
-        if inspection.polymorphic_on is not None and inspection.polymorphic_on.table == model.__table__:
-            return {m.class_.__name__ for m in inspection.polymorphic_map.values()}
-        return None
+        children = self.get_metadata(model).children_class_names
+        return set(children) if children is not None else None
 
     @overrides
     def get_operations(self, model: Type[Union[IEntityModel, SQLAlchemyModel]]) -> Set[GraphQLOperation]:
-        return {GraphQLOperation(i) for i in range(1, 9)}
+        operations = set(GraphQLOperation)
+        metadata = self.get_metadata(model)
+        if all(
+            attribute in metadata.relationships and metadata.relationships[attribute].uselist
+            for attribute in metadata.attributes[GraphQLOperation.UPDATE_WHERE]
+        ):
+            # Only attributes and references to one entity can be set by filters
+            operations.remove(GraphQLOperation.UPDATE_WHERE)
+        return operations
+
+    @overrides
+    def get_schema_directives(self) -> List[StrawberryDirective]:
+        return [loading]
 
     @overrides
     def get_polymorphic_type(self, base_type: ConcreteType):
@@ -161,32 +199,258 @@ class SQLAlchemyBackend(DataBackendBase):
         data: Any,
         session_factory: Optional[sessionmaker] = None,
         *args,
+        load_relationships: bool = True,
         **kwargs
     ) -> Any:
-        async with (session_factory if session_factory else self._session)() as session:
-            for field in info.selected_fields:  # type: ignore
-                selection = self._build_selection(field, model.get_schema_manager(), operation)
-                if operation == GraphQLOperation.QUERY_MANY:
-                    return await list_(session, model, data, selection)
-                if operation == GraphQLOperation.QUERY_ONE:
-                    return await retrieve_(session, model, data, selection)
-                if operation == GraphQLOperation.CREATE_ONE:
-                    return [*(await create_(session, model, [data], selection)), None][0]
-                if operation == GraphQLOperation.CREATE_MANY:
-                    return await create_(session, model, data, selection)
-                if operation == GraphQLOperation.UPDATE_ONE:
-                    return [*(await update_(session, model, [data], selection)), None][0]
-                if operation == GraphQLOperation.UPDATE_MANY:
-                    return await update_(session, model, data, selection)
-                if operation == GraphQLOperation.DELETE_ONE:
-                    return await delete_(session, model, [data])
-                if operation == GraphQLOperation.DELETE_MANY:
-                    return await delete_(session, model, data)
+        """
+        Resolve a graphql operation.
+
+        :param model: model to resolve the operation for
+        :param operation: graphql operation
+        :param info: strawberry info
+        :param data: graphql input
+        :param session_factory: factory of sessions to use instead of the configured session scope
+        :param args: nullable arguments
+        :param load_relationships: load the selected relationships together with the entities
+        :param kwargs: nullable arguments
+        :return: result of the operation
+        """
+        selection = self.get_selection(info, model.get_schema_manager(), operation)
+        if not load_relationships:
+            selection = _get_columns_selection(selection)
+        count_mode = None
+        if operation == GraphQLOperation.QUERY_MANY and self._is_selected(info, {"totalResultsCount", "totalPages"}):
+            count_mode = self._count_mode
+        cursors = operation == GraphQLOperation.QUERY_MANY and self._is_selected(info, {"nextCursor", "previousCursor"})
+        result_cache = self._result_cache
+        if result_cache is None:
+            return await self._resolve(model, operation, info, data, selection, count_mode, session_factory, cursors)
+        if operation not in READ_OPERATIONS:
+            try:
+                return await self._resolve(
+                    model, operation, info, data, selection, count_mode, session_factory, cursors
+                )
+            finally:
+                result_cache.invalidate(_get_written_tables(model))
+
+        input_ = dataclasses.asdict(data) if dataclasses.is_dataclass(data) else data
+        key = (model, operation, freeze(input_), freeze(selection), count_mode, cursors)
+        result = result_cache.get(key)
+        if result is not None:
+            return result
+        # Versions of the tables are taken before reading, changes made meanwhile invalidate the result
+        snapshot = result_cache.snapshot(_get_read_tables(model, selection, input_))
+        result = await self._resolve(model, operation, info, data, selection, count_mode, session_factory, cursors)
+        if result is not None:
+            result_cache.set(key, result, snapshot)
+        return result
+
+    async def _resolve(
+        self,
+        model: Type[Union[IEntityModel, SQLAlchemyModel]],
+        operation: GraphQLOperation,
+        info: Info,
+        data: Any,
+        selection: Selection,
+        count_mode: Optional[CountMode],
+        session_factory: Optional[sessionmaker] = None,
+        cursors: bool = True,
+    ) -> Any:
+        """
+        Resolve a graphql operation with the database, see resolve.
+
+        :param model: model to resolve the operation for
+        :param operation: graphql operation
+        :param info: strawberry info
+        :param data: graphql input
+        :param selection: selected fields
+        :param count_mode: how to count the total results of query-many operations, None skips counting
+        :param session_factory: factory of sessions to use instead of the configured session scope
+        :param cursors: encode the cursors of the page of query-many operations
+        :return: result of the operation
+        """
+        session_context = (
+            session_factory()
+            if session_factory
+            else scoped_session(
+                self._session, info.context, self._session_scope, operation, self._max_concurrent_reads
+            )
+        )
+        session_factory = session_factory if session_factory else self._session
+        async with session_context as session:
+            projection = self._column_projection
+            if operation == GraphQLOperation.QUERY_MANY:
+                if count_mode is not None and self._concurrent_count:
+                    async with session_factory() as count_session:
+                        return await list_(
+                            session,
+                            model,
+                            data,
+                            selection,
+                            self._plan_cache,
+                            count_mode,
+                            count_session,
+                            projection,
+                            self._raw_rows,
+                            self._json_aggregation,
+                            cursors,
+                        )
+                return await list_(
+                    session,
+                    model,
+                    data,
+                    selection,
+                    self._plan_cache,
+                    count_mode,
+                    None,
+                    projection,
+                    self._raw_rows,
+                    self._json_aggregation,
+                    cursors,
+                )
+            if operation == GraphQLOperation.QUERY_ONE:
+                return await retrieve_(
+                    session,
+                    model,
+                    data,
+                    selection,
+                    self._plan_cache,
+                    projection,
+                    self._raw_rows,
+                    self._json_aggregation,
+                )
+            if operation == GraphQLOperation.CREATE_ONE:
+                created = await create_(session, model, [data], selection, self._insert_chunk_size, projection)
+                return [*created, None][0]
+            if operation == GraphQLOperation.CREATE_MANY:
+                return await create_(session, model, data, selection, self._insert_chunk_size, projection)
+            if operation == GraphQLOperation.UPDATE_ONE:
+                return [*(await update_(session, model, [data], selection, projection)), None][0]
+            if operation == GraphQLOperation.UPDATE_MANY:
+                return await update_(session, model, data, selection, projection)
+            if operation == GraphQLOperation.DELETE_ONE:
+                return await delete_(session, model, [data])
+            if operation == GraphQLOperation.DELETE_MANY:
+                return await delete_(session, model, data)
+            if operation == GraphQLOperation.UPDATE_WHERE:
+                return await update_where_(session, model, data)
+            if operation == GraphQLOperation.DELETE_WHERE:
+                return await delete_where_(session, model, data)
+
+    @overrides
+    async def load_related(
+        self,
+        model: Type[Union[IEntityModel, SQLAlchemyModel]],
+        attribute: str,
+        keys: Sequence[Tuple],
+        *args,
+        page_size: Optional[int] = None,
+        offset: Optional[int] = None,
+        info: Optional[Info] = None,
+        **kwargs
+    ) -> List[Any]:
+        context = info.context if info is not None else None
+        async with scoped_session(
+            self._session, context, self._session_scope, GraphQLOperation.QUERY_MANY, self._max_concurrent_reads
+        ) as session:
+            return await load_related_(session, model, attribute, keys, page_size, offset)
+
+    @overrides
+    def get_schema_extensions(self) -> List[Type[Extension]]:
+        return [SessionExtension]
 
     @overrides
     def pre_setup(self, models: Iterable[Type["IEntityModel"]]) -> None:
-        pass
+        registry = {model: self.get_metadata(model) for model in models}
+        for model, metadata in registry.items():
+            model.__mapper_metadata__ = metadata
+        self._metadata = frozendict(registry)
 
     @overrides
     def post_setup(self) -> None:
         pass
+
+    @overrides
+    def dispose(self) -> None:
+        super().dispose()
+        for model in self._metadata:
+            if "__mapper_metadata__" in vars(model):
+                del model.__mapper_metadata__
+        self._metadata = {}
+        self._plan_cache.clear()
+        if self._result_cache is not None:
+            self._result_cache.clear()
+
+
+def _collect_tables(model: Type[Union[IEntityModel, SQLAlchemyModel]], value: Any, tables: Set[str]) -> None:
+    """
+    Collect names of the tables of a model and of the relationships used in a selection, filters or ordering.
+
+    :param model: model of the value
+    :param value: selection of the model or graphql input (converted to dicts) referencing its attributes
+    :param tables: set to add the names to
+    """
+    metadata = get_metadata(model)
+    tables.update(table.name for table in metadata.mapper.tables)
+    if isinstance(value, list):
+        for item in value:
+            _collect_tables(model, item, tables)
+    if not isinstance(value, dict):
+        return
+    for key, sub_value in value.items():
+        if isclass(key):
+            # Fragment on a polymorphic sub-model
+            _collect_tables(key, sub_value, tables)
+        elif key in metadata.relationships:
+            relationship = metadata.relationships[key]
+            if relationship.secondary is not None:
+                tables.add(relationship.secondary.name)
+            _collect_tables(relationship.target, sub_value, tables)
+        elif isinstance(sub_value, (dict, list)):
+            # Logical operators and quantifiers of filters
+            _collect_tables(model, sub_value, tables)
+
+
+def _get_read_tables(model: Type[Union[IEntityModel, SQLAlchemyModel]], selection: Selection, input_: Any) -> Set[str]:
+    """
+    Get names of the tables a query operation reads from.
+
+    :param model: queried model
+    :param selection: selected fields
+    :param input_: graphql input converted to dicts
+    :return: names of the tables
+    """
+    tables: Set[str] = set()
+    _collect_tables(model, selection, tables)
+    _collect_tables(model, input_, tables)
+    return tables
+
+
+def _get_written_tables(model: Type[Union[IEntityModel, SQLAlchemyModel]]) -> Set[str]:
+    """
+    Get names of the tables an operation changing entities of a model may write to.
+
+    References of relationships are written to the tables of the related models or to association tables.
+    :param model: changed model
+    :return: names of the tables
+    """
+    metadata = get_metadata(model)
+    tables = {table.name for table in metadata.mapper.tables}
+    for relationship in metadata.relationships.values():
+        tables.update(table.name for table in get_metadata(relationship.target).mapper.tables)
+        if relationship.secondary is not None:
+            tables.add(relationship.secondary.name)
+    return tables
+
+
+def _get_columns_selection(selection: Selection) -> Selection:
+    """
+    Get selected columns of a selection, without the selected relationships.
+
+    :param selection: selection of the resolved entities
+    :return: selection of scalar fields, including fragments on polymorphic sub-entities
+    """
+    return Selection(
+        {key: _get_columns_selection(value) for key, value in selection.items() if not isinstance(key, str)},
+        fields=selection.fields,
+    )
@@ -0,0 +1,191 @@
+"""Entities aggregated by the database into JSON documents (SQLite JSON1, PostgreSQL json functions)."""
+import dataclasses
+import re
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Type, cast
+from uuid import UUID
+
+from sqlalchemy import JSON, Enum, Interval
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator, TypeEngine
+
+from strawberry_mage.backends.sqlalchemy.rows import EntityRow
+
+
+class json_document(FunctionElement):  # noqa: N801 pylint: disable=invalid-name
+    """JSON object of key and value pairs, json_document(key, value, ...)."""
+
+    type = JSON()
+    name = "json_document"
+    inherit_cache = True
+
+
+class json_collection(FunctionElement):  # noqa: N801 pylint: disable=invalid-name
+    """
+    JSON array aggregating the documents of a column, an empty array without rows.
+
+    json_collection(document, ordering, ...) orders the documents by the ordering expressions, SQLite aggregates them
+    in the order of the rows of the subquery instead.
+    """
+
+    type = JSON()
+    name = "json_collection"
+    inherit_cache = True
+
+
+class json_nested(FunctionElement):  # noqa: N801 pylint: disable=invalid-name
+    """Document (or collection) selected by a subquery, embedded in another document as JSON instead of text."""
+
+    type = JSON()
+    name = "json_nested"
+    inherit_cache = True
+
+
+@compiles(json_document)
+def _compile_json_document(element: json_document, compiler: Any, **kw) -> str:
+    return f"json_object({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(json_document, "postgresql")
+def _compile_json_document_postgresql(element: json_document, compiler: Any, **kw) -> str:
+    return f"json_build_object({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(json_collection)
+def _compile_json_collection(element: json_collection, compiler: Any, **kw) -> str:
+    document, *_ = element.clauses.clauses
+    return f"json_group_array(json({compiler.process(document, **kw)}))"
+
+
+@compiles(json_collection, "postgresql")
+def _compile_json_collection_postgresql(element: json_collection, compiler: Any, **kw) -> str:
+    document, *ordering = element.clauses.clauses
+    order_by = f" ORDER BY {', '.join(compiler.process(o, **kw) for o in ordering)}" if ordering else ""
+    return f"coalesce(json_agg({compiler.process(document, **kw)}{order_by}), '[]'::json)"
+
+
+@compiles(json_nested)
+def _compile_json_nested(element: json_nested, compiler: Any, **kw) -> str:
+    return f"json({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(json_nested, "postgresql")
+def _compile_json_nested_postgresql(element: json_nested, compiler: Any, **kw) -> str:
+    return compiler.process(element.clauses, **kw)
+
+
+_FRACTION = re.compile(r"\.(\d+)")
+_INTERVAL = re.compile(
+    r"(?:([+-]?\d+) years? ?)?(?:([+-]?\d+) mons? ?)?(?:([+-]?\d+) days? ?)?(?:([+-])?(\d+):(\d+):(\d+(?:\.\d+)?))?"
+)
+
+
+def _get_iso_parser(python_type: Type) -> Callable[[str], Any]:
+    # fromisoformat of python < 3.11 only reads fractions of 3 or 6 digits, PostgreSQL drops their trailing zeros
+    def parse(value: str) -> Any:
+        return python_type.fromisoformat(_FRACTION.sub(lambda m: f".{m.group(1)[:6]:0<6}", value, count=1))
+
+    return date.fromisoformat if python_type is date else parse
+
+
+def _parse_interval(value: str) -> timedelta:
+    # Intervals in the default "postgres" style, months are 30 days and years 365 days like in database drivers
+    match = _INTERVAL.fullmatch(value)
+    if match is None or not value:
+        raise Exception(f"Intervals can only be read in the postgres interval style, not {value!r}")
+    years, months, days, sign, hours, minutes, seconds = match.groups()
+    duration = timedelta(hours=int(hours or 0), minutes=int(minutes or 0), seconds=float(seconds or 0))
+    return timedelta(days=int(years or 0) * 365 + int(months or 0) * 30 + int(days or 0)) + (
+        -duration if sign == "-" else duration
+    )
+
+
+def get_converter(type_: TypeEngine, dialect: Any) -> Optional[Callable[[Any], Any]]:
+    """
+    Get a converter of values of a column type read from JSON documents.
+
+    JSON has no enums, dates, intervals, UUIDs nor decimals (and SQLite renders booleans as numbers), values of such
+    types are converted the same way as by the result processing of the column type. Databases whose drivers return
+    dates and intervals natively render them in JSON in ISO format (any length of fractions) and in the postgres
+    interval style, such values are parsed by the converter instead.
+    :param type_: type of the column
+    :param dialect: dialect of the database
+    :return: converter of not null values, None if the values are read as they are
+    """
+    type_ = type_.dialect_impl(dialect)
+    if isinstance(type_, Interval):
+        # Without a native interval type, intervals are stored as datetimes since the epoch
+        since_epoch = cast(Callable[[Any], datetime], get_converter(type_.impl, dialect))
+        return lambda value: since_epoch(value) - type_.epoch
+    if isinstance(type_, TypeDecorator):
+        impl = get_converter(type_.impl, dialect)
+        return lambda value: type_.process_result_value(impl(value) if impl is not None else value, dialect)
+    if isinstance(type_, Enum):
+        return type_.result_processor(dialect, None)
+    try:
+        python_type = type_.python_type
+    except NotImplementedError:
+        return None
+    if python_type in (datetime, date, time):
+        processor = type_.result_processor(dialect, None)
+        return processor if processor is not None else _get_iso_parser(python_type)
+    if python_type is timedelta:
+        return _parse_interval
+    if python_type is UUID:
+        return UUID
+    if python_type is bool:
+        return bool
+    if python_type is Decimal:
+        return lambda value: Decimal(str(value))
+    return None
+
+
+@dataclasses.dataclass(frozen=True)
+class RelatedDocumentPlan:
+    """Key of the documents of a selected relationship in the documents of the parent entities, see DocumentPlan."""
+
+    # Model owning the relationship, documents of other (polymorphic) models have no such relationship
+    owner: Type
+    attribute: str
+    key: str
+    uselist: bool
+    plan: "DocumentPlan"
+
+
+@dataclasses.dataclass(frozen=True)
+class DocumentPlan:
+    """Keys of the attributes of the entities of one selection level in their documents and how to read them."""
+
+    # Map of [polymorphic identity, (row class, [attribute name, document key])], keyed by None for plain models
+    attributes: Mapping[Any, Tuple[Type[EntityRow], Tuple[Tuple[str, str], ...]]]
+    # Key of the polymorphic discriminator
+    discriminator: Optional[str]
+    # Map of [document key, converter of the values], see get_converter
+    converters: Mapping[str, Callable[[Any], Any]]
+    relationships: Tuple[RelatedDocumentPlan, ...] = ()
+
+    def read(self, document: Dict[str, Any]) -> EntityRow:
+        """
+        Create an entity and its related entities from a document.
+
+        :param document: JSON document of the entity
+        :return: entity
+        """
+        identity = document[self.discriminator] if self.discriminator is not None else None
+        row_class, attributes = self.attributes.get(identity, self.attributes[None])
+        entity = row_class()
+        for attribute, key in attributes:
+            value = document[key]
+            converter = self.converters.get(key)
+            setattr(entity, attribute, converter(value) if converter is not None and value is not None else value)
+        for related in self.relationships:
+            if not isinstance(entity, related.owner):
+                continue
+            value = document[related.key]
+            if related.uselist:
+                setattr(entity, related.attribute, [related.plan.read(v) for v in value])
+            else:
+                setattr(entity, related.attribute, related.plan.read(value) if value is not None else None)
+        return entity
@@ -0,0 +1,77 @@
+"""Strategies for loading relationships selected in graphql queries."""
+import enum
+from typing import Any, Dict, Optional
+
+import strawberry
+from graphql import DirectiveLocation
+
+from strawberry_mage.backends.sqlalchemy.metadata import get_metadata
+from strawberry_mage.core.types import Selection
+
+
+@strawberry.enum(description="How a relationship is loaded from the database.")
+class LoadingStrategy(enum.Enum):
+    """How a relationship is loaded from the database."""
+
+    # Outer join in the query of the parent entity
+    JOINED = "joined"
+    # Separate query for the related entities of all parent entities using IN
+    SELECTIN = "selectin"
+    # Separate query for the related entities joined to the query of the parent entities as a subquery
+    SUBQUERY = "subquery"
+
+
+@strawberry.directive(
+    locations=[DirectiveLocation.FIELD],
+    description="Choose how a relationship field is loaded from the database.",
+)
+def loading(value: Any, strategy: LoadingStrategy):
+    """
+    Choose how a relationship is loaded, the strategy is applied by the backend when building the query.
+
+    :param value: resolved value of the field
+    :param strategy: loading strategy
+    :return: value
+    """
+    return value
+
+
+def get_loading_strategy(model: Any, attribute: str, selection: Optional[Selection] = None) -> LoadingStrategy:
+    """
+    Get the loading strategy of a selected relationship.
+
+    The strategy is taken from the @loading directive of the selected field (given by its name in literals or by its
+    value in coerced variables), then from the __loading_strategies__ mapping of [relationship name, strategy] on the
+    model. By default, relationships to one entity are joined and relationships to many entities are loaded with a
+    separate IN query, so that sibling collections do not multiply the rows of each other.
+    :param model: model (or its alias) owning the relationship
+    :param attribute: name of the relationship
+    :param selection: selection of the relationship field
+    :return: loading strategy
+    """
+    directive: Optional[Dict[str, Any]] = getattr(selection, "directives", {}).get("loading")
+    if directive is not None and directive.get("strategy") is not None:
+        strategy = directive["strategy"]
+        if isinstance(strategy, LoadingStrategy):
+            return strategy
+        return LoadingStrategy[strategy] if strategy in LoadingStrategy.__members__ else LoadingStrategy(strategy)
+    configured = getattr(model, "__loading_strategies__", {}).get(attribute)
+    if configured is not None:
+        return configured
+    return LoadingStrategy.SELECTIN if get_metadata(model).relationships[attribute].uselist else LoadingStrategy.JOINED
+
+
+def get_polymorphic_loading_strategy(model: Any) -> LoadingStrategy:
+    """
+    Get how sub-models of a polymorphic model selected by fragments are loaded.
+
+    The strategy is taken from the __polymorphic_loading__ attribute of the model. With JOINED (the default), tables
+    of the selected sub-models are joined to the query of the model. With SELECTIN, the tables of every loaded
+    sub-model are queried separately using IN, sub-models whose fragments select relationships are still joined.
+    :param model: polymorphic model (or its alias)
+    :return: loading strategy, JOINED or SELECTIN
+    """
+    strategy = getattr(model, "__polymorphic_loading__", LoadingStrategy.JOINED)
+    if strategy not in {LoadingStrategy.JOINED, LoadingStrategy.SELECTIN}:
+        raise Exception(f"Sub-models of {model.__name__} can only be loaded with the JOINED or SELECTIN strategy")
+    return strategy
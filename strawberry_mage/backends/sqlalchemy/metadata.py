@@ -0,0 +1,161 @@
+"""Metadata of SQLAlchemy models precomputed from their mappers."""
+import itertools
+from dataclasses import dataclass
+from inspect import isclass
+from typing import Any, FrozenSet, List, Mapping, Optional, Tuple, Type, Union
+
+from frozendict import frozendict
+from sqlalchemy import Column, Table, inspect
+from sqlalchemy.orm import ColumnProperty, Mapper, RelationshipProperty
+from sqlalchemy.orm.interfaces import MANYTOMANY, ONETOMANY
+
+from strawberry_mage.backends.sqlalchemy.rows import EntityRow, create_row_class
+from strawberry_mage.core.types import GraphQLOperation
+
+_READ_OPERATIONS = {GraphQLOperation.QUERY_ONE, GraphQLOperation.QUERY_MANY, None}
+_WRITE_OPERATIONS = {
+    GraphQLOperation.CREATE_ONE,
+    GraphQLOperation.CREATE_MANY,
+    GraphQLOperation.UPDATE_ONE,
+    GraphQLOperation.UPDATE_MANY,
+    GraphQLOperation.UPDATE_WHERE,
+}
+
+
+@dataclass(frozen=True)
+class RelationshipMetadata:
+    """Metadata of a relationship of a model."""
+
+    key: str
+    direction: Any
+    uselist: bool
+    target: Type
+    secondary: Optional[Table]
+    local_remote_pairs: Tuple[Tuple[Column, Column], ...]
+
+
+@dataclass(frozen=True)
+class ModelMetadata:
+    """Metadata of a model, see create_model_metadata."""
+
+    mapper: Mapper
+    primary_key: Tuple[str, ...]
+    attributes: Mapping[Optional[GraphQLOperation], Tuple[str, ...]]
+    attribute_types: Mapping[str, Type]
+    relationships: Mapping[str, RelationshipMetadata]
+    local_table: Table
+    polymorphic: bool
+    parent_class_name: Optional[str]
+    children_class_names: Optional[FrozenSet[str]]
+    # Class of read-only rows of the model, see rows.create_row_class
+    row_class: Type[EntityRow]
+
+
+def _is_nullable(col: Union[ColumnProperty, RelationshipProperty]):
+    if isinstance(col, ColumnProperty):
+        return getattr(col, "nullable", False) or getattr(col.expression, "nullable", False)
+    if col.direction in {ONETOMANY}:
+        return True
+    return all((c.nullable for c in col.local_columns))
+
+
+def get_attribute_type(attr: Union[ColumnProperty, RelationshipProperty]) -> Type:
+    """
+    Get python type of a mapped attribute.
+
+    :param attr: column or relationship property
+    :return: python type, related entities are referenced by the name of their class
+    """
+    if isinstance(attr, ColumnProperty):
+        python_type = (
+            attr.expression.type.impl.python_type
+            if hasattr(attr.expression.type, "impl")
+            else attr.expression.type.python_type
+        )
+    else:
+        python_type = attr.entity.class_.__name__
+
+    if _is_nullable(attr):
+        python_type = Optional[python_type]  # type: ignore
+    if isinstance(attr, RelationshipProperty) and attr.direction in {
+        ONETOMANY,
+        MANYTOMANY,
+    }:
+        python_type = Optional[List[python_type]]  # type: ignore
+    return python_type
+
+
+def _get_attributes(mapper: Mapper, operation: Optional[GraphQLOperation]) -> Tuple[str, ...]:
+    all_ = list(mapper.attrs)
+    pk_cols = set(mapper.primary_key)
+    fk_cols = set(itertools.chain(*[c.local_columns for c in all_ if isinstance(c, RelationshipProperty)])) - pk_cols
+    keys = [a.key for a in all_ if not (isinstance(a, ColumnProperty) and any(c in fk_cols for c in a.columns))]
+    if operation in _READ_OPERATIONS:
+        return tuple(keys)
+    if operation not in _WRITE_OPERATIONS:
+        return ()
+    primary_key = {c.key for c in mapper.primary_key}
+    polymorphic_on = mapper.polymorphic_on.key if mapper.polymorphic_on is not None else None
+    return tuple(k for k in keys if k != polymorphic_on and k not in primary_key)
+
+
+def _get_parent_class_name(mapper: Mapper) -> Optional[str]:
+    if mapper.polymorphic_on is not None:
+        return [
+            m.class_.__name__ for m in mapper.polymorphic_map.values() if m.local_table == mapper.polymorphic_on.table
+        ][0]
+    return None
+
+
+def _get_children_class_names(mapper: Mapper) -> Optional[FrozenSet[str]]:
+    if mapper.polymorphic_on is not None and mapper.polymorphic_on.table == mapper.class_.__table__:
+        return frozenset(m.class_.__name__ for m in mapper.polymorphic_map.values())
+    return None
+
+
+def create_model_metadata(model: Type) -> ModelMetadata:
+    """
+    Collect metadata of a model from its mapper.
+
+    :param model: mapped class or its alias
+    :return: metadata of the model
+    """
+    mapper: Mapper = inspect(model).mapper
+    return ModelMetadata(
+        mapper=mapper,
+        primary_key=tuple(c.key for c in mapper.primary_key),
+        attributes=frozendict(
+            {operation: _get_attributes(mapper, operation) for operation in [None, *GraphQLOperation]}
+        ),
+        attribute_types=frozendict({attr.key: get_attribute_type(attr) for attr in mapper.attrs}),
+        relationships=frozendict(
+            {
+                prop.key: RelationshipMetadata(
+                    key=prop.key,
+                    direction=prop.direction,
+                    uselist=bool(prop.uselist),
+                    target=prop.mapper.class_,
+                    secondary=prop.secondary,
+                    local_remote_pairs=tuple(prop.local_remote_pairs),
+                )
+                for prop in mapper.relationships
+            }
+        ),
+        local_table=mapper.local_table,
+        polymorphic=bool(mapper.polymorphic_map),
+        parent_class_name=_get_parent_class_name(mapper),
+        children_class_names=_get_children_class_names(mapper),
+        row_class=create_row_class(mapper.class_),
+    )
+
+
+def get_metadata(model: Type) -> ModelMetadata:
+    """
+    Get metadata of a model from the registry of its backend, see SQLAlchemyBackend.pre_setup.
+
+    :param model: mapped class or its alias
+    :return: metadata of the model, collected again if the model is not set up
+    """
+    # Subclasses must not use the metadata of their parent
+    metadata = vars(model).get("__mapper_metadata__") if isclass(model) else None
+    return metadata if metadata is not None else create_model_metadata(model)
@@ -1,12 +1,14 @@
 """Entity Models for use with SQLAlchemy Mage backend."""
 
 from functools import cached_property
-from typing import Type, cast
+from typing import Dict, Tuple, Type, cast
 
 from inflection import underscore
-from sqlalchemy import inspect
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import declarative_base, declared_attr
 
+from strawberry_mage.backends.sqlalchemy.loading import LoadingStrategy
+from strawberry_mage.backends.sqlalchemy.search import setup_search_indexes
 from strawberry_mage.core.models import EntityModel
 
 _Base = declarative_base()
@@ -25,6 +27,14 @@ class SQLAlchemyModel(_Base, EntityModel, metaclass=_BaseMeta):
     """
 
     __abstract__ = True
+    # Map of [relationship name, loading strategy] overriding how relationships are loaded by default
+    __loading_strategies__: Dict[str, LoadingStrategy] = {}
+    # How sub-models selected by fragments are loaded, see loading.get_polymorphic_loading_strategy
+    __polymorphic_loading__: LoadingStrategy = LoadingStrategy.JOINED
+    # Names of string attributes which can be filtered by the search operator, see search.setup_search_indexes
+    __search_columns__: Tuple[str, ...] = ()
+    # Names of heavy columns which are not loaded unless selected, even when the backend loads all columns
+    __deferred_columns__: Tuple[str, ...] = ()
 
     @declared_attr
     def __tablename__(self):
@@ -43,6 +53,7 @@ class SQLAlchemyModel(_Base, EntityModel, metaclass=_BaseMeta):
 
 
 _SQLAlchemyModel = SQLAlchemyModel
+event.listen(SQLAlchemyModel, "instrument_class", setup_search_indexes, propagate=True)
 
 
 def create_base_entity() -> Type[SQLAlchemyModel]:
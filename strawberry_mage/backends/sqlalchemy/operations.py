@@ -1,36 +1,122 @@
 """SQLAlchemy operations for resolving graphql queries."""
+import asyncio
 import dataclasses
 from enum import Enum
 from functools import partial
 from inspect import isclass, iscoroutinefunction
 from math import ceil
-from typing import Any, Callable, Dict, List, Tuple, Type, Union, cast
-
-from sqlalchemy import Table, and_, delete, inspect, not_, or_, select
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple, Type, Union, cast
+
+from sqlalchemy import (
+    Column,
+    Table,
+    and_,
+    bindparam,
+    delete,
+    insert,
+    inspect,
+    not_,
+    or_,
+    select,
+    true,
+    tuple_,
+    type_coerce,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import InstrumentedAttribute, RelationshipProperty, contains_eager, selectinload
-from sqlalchemy.orm.base import MANYTOMANY
+from sqlalchemy.orm import (
+    InstrumentedAttribute,
+    Load,
+    Mapper,
+    aliased,
+    RelationshipProperty,
+    contains_eager,
+    joinedload,
+    selectin_polymorphic,
+    selectinload,
+    subqueryload,
+)
+from sqlalchemy.orm.base import MANYTOMANY, MANYTOONE, ONETOMANY
 from sqlalchemy.orm.util import AliasedClass, with_polymorphic
-from sqlalchemy.sql import ColumnElement, Join
+from sqlalchemy.sql import ColumnElement, Join, Select
 from sqlalchemy.sql.elements import BooleanClauseList, ColumnClause
-from sqlalchemy.sql.expression import case, desc, func, nulls_last
+from sqlalchemy.sql.expression import case, desc, func, literal_column, nulls_first, nulls_last
 from sqlalchemy.sql.functions import count
 from sqlalchemy.sql.operators import ColumnOperators as ColOps
 from strawberry import UNSET
 
+from strawberry_mage.backends.sqlalchemy.documents import (
+    DocumentPlan,
+    RelatedDocumentPlan,
+    get_converter,
+    json_collection,
+    json_document,
+    json_nested,
+)
+from strawberry_mage.backends.sqlalchemy.loading import (
+    LoadingStrategy,
+    get_loading_strategy,
+    get_polymorphic_loading_strategy,
+)
+from strawberry_mage.backends.sqlalchemy.metadata import get_metadata
 from strawberry_mage.backends.sqlalchemy.models import SQLAlchemyModel
+from strawberry_mage.backends.sqlalchemy.pagination import (
+    CountMode,
+    InvalidCursorError,
+    KeysetType,
+    create_keyset_filter,
+    decode_cursor,
+    encode_cursor,
+    estimate_count,
+    get_keyset,
+)
+from strawberry_mage.backends.sqlalchemy.rows import EntityRow, RelatedRowsPlan, RowsPlan
+from strawberry_mage.backends.sqlalchemy.search import LikePrefix, create_search_filter, prefix_match
+from strawberry_mage.core.cache import LRUCache
+from strawberry_mage.core.resolvers.base import NESTED_OFFSET, NESTED_PAGE_SIZE
 from strawberry_mage.core.strawberry_types import (
+    COLLECTION_CHANGES_SUFFIX,
+    CollectionUpdate,
     DeleteResult,
+    UpdateResult,
     OrderingDirection,
+    DeleteWhere,
     PrimaryKeyField,
     QueryMany,
+    UpdateWhere,
 )
 from strawberry_mage.core.type_creator import strip_defer_typename
-from strawberry_mage.core.types import IEntityModel, IsDataclass
+from strawberry_mage.core.types import IEntityModel, IsDataclass, Selection
+from strawberry_mage.core.utils import freeze
 
 SelectablesType = Dict[str, Union[Join, Type[SQLAlchemyModel], AliasedClass]]
 
 
+@dataclasses.dataclass(frozen=True)
+class QueryPlan:
+    """Parameterized statement compiled for one query shape, only values need to be bound to execute it."""
+
+    statement: Select
+    # Selects primary keys of one page, the statement then loads the entities with the keys bound as page_keys
+    keys_statement: Optional[Select] = None
+    # Reads entities from the rows of the statement, which selects columns instead of orm entities (raw rows)
+    rows: Optional[RowsPlan] = None
+    # Reads entities from the JSON documents selected by the statement (JSON aggregation)
+    documents: Optional[DocumentPlan] = None
+
+
+PlanCacheType = LRUCache[Hashable, QueryPlan]
+
+# Lowest limit of bound parameters in one statement among the supported databases (SQLite)
+MAX_BOUND_PARAMETERS = 32766
+
+_LOADERS = {
+    LoadingStrategy.JOINED: joinedload,
+    LoadingStrategy.SELECTIN: selectinload,
+    LoadingStrategy.SUBQUERY: subqueryload,
+}
+
+
 def _build_pk_query(
     model: Union[Type[IEntityModel], Type[SQLAlchemyModel]],
     selectable: Union[Table, Type[SQLAlchemyModel], AliasedClass],
@@ -48,17 +134,34 @@ def _build_pk_query(
     return and_(*conditions)
 
 
-def _build_multiple_pk_query(model: Type[Union[SQLAlchemyModel, IEntityModel]], selectable, data: List[Any]):
-    if not data:
-        return None
-    return or_(
-        _build_pk_query(
-            model,
-            selectable,
-            {k: getattr(entry.primary_key_, k) for k in model.get_primary_key()},
-        )
-        for entry in data
-    )
+def _create_polymorphic_entity(
+    model: Type[Union[SQLAlchemyModel, IEntityModel]],
+    selection: Optional[Dict] = None,
+    aliased_: bool = True,
+    strategy: Optional[LoadingStrategy] = None,
+) -> AliasedClass:
+    """
+    Create a polymorphic alias of a model, which joins only the tables of sub-models selected by fragments.
+
+    Sub-models loaded with the SELECTIN polymorphic loading strategy are left out, unless their fragments select
+    relationships, see create_selection_joins. Entities of other sub-models are loaded without their own columns.
+    :param model: model of the entities
+    :param selection: selected fields of the entities, None if the entities are only filtered
+    :param aliased_: whether the joined tables are aliased as a subquery
+    :param strategy: polymorphic loading strategy overriding the one of the model
+    :return: polymorphic alias
+    """
+    mapper: Mapper = get_metadata(model).mapper
+    mappers = set()
+    if selection and get_metadata(model).polymorphic:
+        strategy = strategy if strategy is not None else get_polymorphic_loading_strategy(model)
+        for key, sub_selection in selection.items():
+            if not (isclass(key) and key is not model and issubclass(key, model)):
+                continue
+            if strategy == LoadingStrategy.JOINED or any(isinstance(k, str) for k in sub_selection):
+                # Tables between the model and the sub-model are joined as well
+                mappers.update(m for m in inspect(key).iterate_to_root() if m.isa(mapper) and m is not mapper)
+    return with_polymorphic(model, [m for m in mapper.self_and_descendants if m in mappers], aliased=aliased_)
 
 
 def _get_model_pk_values(model: Type[Union[SQLAlchemyModel, IEntityModel]], data: IsDataclass):
@@ -69,60 +172,309 @@ def _get_dict_pk_values(model: Type[Union[SQLAlchemyModel, IEntityModel]], data:
     return tuple(data.get(key) for key in model.get_primary_key())
 
 
-def _create_pk_class(data: Dict[str, Any]):
-    return type("StubInput", (), {"primary_key_": type("StubPk", (), data)})()
+ReferencesType = Dict[Type[Union[SQLAlchemyModel, IEntityModel]], Dict[Tuple, Any]]
+
+
+def _get_related_model(
+    model: Type[Union[SQLAlchemyModel, IEntityModel]], prop: str
+) -> Optional[Type[Union[SQLAlchemyModel, IEntityModel]]]:
+    prop_type = strip_defer_typename(model.get_attribute_type(prop))
+    if not isinstance(prop_type, str):
+        return None
+    related_model = model.get_schema_manager().get_model_for_name(prop_type)
+    if related_model is None:
+        raise Exception(f"Unable to resolve related type for {prop_type} on {model}")
+    return related_model
+
+
+def _get_collection_entries(entries: Optional[List[Any]]) -> List[Any]:
+    return entries if entries is not UNSET and entries is not None else []
+
+
+def _collect_references(
+    model: Type[Union[SQLAlchemyModel, IEntityModel]],
+    input_objects: List[IsDataclass],
+    collection_updates: bool = False,
+) -> Dict[Type[Union[SQLAlchemyModel, IEntityModel]], Set[Tuple]]:
+    """
+    Collect primary keys of all entities referenced by relationships in mutation inputs.
+
+    :param model: model of the inputs
+    :param input_objects: graphql inputs
+    :param collection_updates: include entities added by collection changes
+    :return: primary keys of referenced entities by their model
+    """
+    references: Dict[Type[Union[SQLAlchemyModel, IEntityModel]], Set[Tuple]] = {}
+    for input_object in input_objects:
+        for prop in input_object.__dataclass_fields__:
+            value = getattr(input_object, prop)
+            if value is UNSET or value is None or prop == "primary_key_" or isinstance(value, Enum):
+                continue
+            if isinstance(value, CollectionUpdate):
+                if not collection_updates:
+                    continue
+                prop, value = prop[: -len(COLLECTION_CHANGES_SUFFIX)], _get_collection_entries(value.add)
+            related_model = _get_related_model(model, prop)
+            if related_model is None:
+                continue
+            keys = references.setdefault(related_model, set())
+            for entry in value if isinstance(value, list) else [value]:
+                keys.add(_get_model_pk_values(related_model, entry.primary_key_))
+    return references
+
+
+def _create_pk_filter(model: Type[Union[SQLAlchemyModel, IEntityModel]], selectable: Any) -> ColumnElement:
+    """
+    Create a filter matching primary keys bound as the keys parameter, see _execute_for_keys.
+
+    Single column primary keys are compiled to an IN of expanded parameters, composite primary keys to a tuple IN
+    (rendered as IN (VALUES ...) where the database needs it).
+    :param model: model of the primary key
+    :param selectable: model or its alias to filter
+    :return: filter expression
+    """
+    primary_key = [getattr(selectable, key) for key in model.get_primary_key()]
+    keys = bindparam("keys", expanding=True)
+    return primary_key[0].in_(keys) if len(primary_key) == 1 else tuple_(*primary_key).in_(keys)
+
+
+async def _execute_for_keys(
+    session: AsyncSession,
+    statement: Any,
+    model: Type[Union[SQLAlchemyModel, IEntityModel]],
+    keys: Iterable[Tuple],
+    parameters: Optional[Dict[str, Any]] = None,
+) -> List[Any]:
+    """
+    Execute a statement filtered by _create_pk_filter for primary keys, split to chunks under the parameter limit.
+
+    :param session: sqlalchemy session
+    :param statement: statement to execute
+    :param model: model of the primary keys
+    :param keys: primary key values
+    :param parameters: other parameters of the statement
+    :return: result of every chunk, no results when there are no keys
+    """
+    parameters = parameters if parameters is not None else {}
+    keys = list(keys)
+    key_size = len(model.get_primary_key())
+    chunk_size = max(1, (MAX_BOUND_PARAMETERS - len(parameters)) // key_size)
+    results = []
+    for start in range(0, len(keys), chunk_size):
+        chunk = keys[start : start + chunk_size]
+        key_parameters = [key[0] for key in chunk] if key_size == 1 else [tuple(key) for key in chunk]
+        results.append(await session.execute(statement, {**parameters, "keys": key_parameters}))
+    return results
+
+
+def _missing_reference(related_model: Type[Union[SQLAlchemyModel, IEntityModel]], key: Tuple) -> Exception:
+    primary_key = ", ".join(f"{k}={v!r}" for k, v in zip(related_model.get_primary_key(), key))
+    return Exception(f"{related_model.__name__} with primary key ({primary_key}) does not exist")
+
+
+async def _check_references(
+    session: AsyncSession, references: Dict[Type[Union[SQLAlchemyModel, IEntityModel]], Set[Tuple]]
+):
+    """
+    Check that referenced entities exist, selecting only their primary keys.
+
+    :param session: sqlalchemy session
+    :param references: primary keys of referenced entities by their model
+    """
+    for related_model, keys in references.items():
+        primary_key = [getattr(related_model, key) for key in related_model.get_primary_key()]
+        statement = select(*primary_key).where(_create_pk_filter(related_model, related_model))
+        results = await _execute_for_keys(session, statement, related_model, keys)
+        missing = keys - {tuple(row) for result in results for row in result.all()}
+        if missing:
+            raise _missing_reference(related_model, sorted(missing)[0])
+
+
+async def _load_references(
+    session: AsyncSession, references: Dict[Type[Union[SQLAlchemyModel, IEntityModel]], Set[Tuple]]
+) -> ReferencesType:
+    """
+    Load referenced entities with one query per model.
+
+    :param session: sqlalchemy session
+    :param references: primary keys of referenced entities by their model
+    :return: referenced entities by their model and primary key
+    """
+    loaded: ReferencesType = {}
+    for related_model, keys in references.items():
+        statement = select(related_model).where(_create_pk_filter(related_model, related_model))
+        results = await _execute_for_keys(session, statement, related_model, keys)
+        instances = [instance for result in results for instance in result.scalars().all()]
+        loaded[related_model] = {_get_model_pk_values(related_model, instance): instance for instance in instances}
+    return loaded
+
+
+def _get_reference(references: ReferencesType, related_model: Type[Union[SQLAlchemyModel, IEntityModel]], entry: Any):
+    key = _get_model_pk_values(related_model, entry.primary_key_)
+    instance = references.get(related_model, {}).get(key)
+    if instance is None:
+        raise _missing_reference(related_model, key)
+    return instance
 
 
-async def _set_instance_attrs(
+def _set_instance_attrs(
     model: Type[Union[SQLAlchemyModel, IEntityModel]],
     instance: object,
     input_object: IsDataclass,
-    session: AsyncSession,
+    references: ReferencesType,
 ):
+    """
+    Set attributes of an instance from a mutation input.
+
+    :param model: model of the instance
+    :param instance: model instance
+    :param input_object: graphql input
+    :param references: entities referenced by the inputs of the mutation, see _load_references
+    """
     for prop in input_object.__dataclass_fields__:
         value = getattr(input_object, prop)
         if value is UNSET or prop == "primary_key_":
             continue
-        prop_type = strip_defer_typename(model.get_attribute_type(prop))
-        if isinstance(prop_type, str):
-            related_model = model.get_schema_manager().get_model_for_name(prop_type)
-            if related_model is None:
-                raise Exception(f"Unable to resolve related type for {prop_type} on {model}")
+        related_model = _get_related_model(model, prop)
+        if related_model is not None:
             if isinstance(value, list):
-                expr = select(related_model).where(_build_multiple_pk_query(related_model, related_model, value))
-                setattr(instance, prop, (await session.execute(expr)).scalars().all())
+                setattr(instance, prop, [_get_reference(references, related_model, entry) for entry in value])
             elif isinstance(value, Enum):
                 setattr(instance, prop, value.name)
+            elif value is None:
+                setattr(instance, prop, None)
             else:
-                setattr(
-                    instance,
-                    prop,
-                    await session.get(related_model, dataclasses.asdict(value.primary_key_)),
-                )
+                setattr(instance, prop, _get_reference(references, related_model, value))
         else:
             setattr(instance, prop, value)
 
 
+def _get_window(
+    property_: InstrumentedAttribute, arguments: Optional[Dict[str, Any]]
+) -> Optional[Tuple[int, Optional[int]]]:
+    if arguments is None or property_.property.direction not in {ONETOMANY, MANYTOMANY}:
+        return None
+    # Literal arguments of selected fields are not coerced by strawberry
+    page_size = arguments.get("page_size", NESTED_PAGE_SIZE)
+    offset = int(arguments.get("offset", NESTED_OFFSET) or 0)
+    if page_size is None and not offset:
+        return None
+    return offset, int(page_size) if page_size is not None else None
+
+
+def _create_window_filter(
+    columns: List[Any],
+    partition_by: List[Any],
+    parents: List[Any],
+    order_by: List[Any],
+    window: Tuple[int, Optional[int]],
+    select_from: Any,
+    targets: List[Any],
+) -> ColumnElement:
+    """
+    Create a filter limiting the rows of a relationship per parent entity.
+
+    The subquery selecting the rows in the window is correlated to the parent entity of the filtered row, so only the
+    rows of that parent entity are ordered, not the whole table.
+    :param columns: key columns of the limited rows
+    :param partition_by: columns referencing the parent entity
+    :param parents: columns referencing the parent entity in the query the filter is used in
+    :param order_by: ordering of the rows within one parent entity
+    :param window: tuple [offset, page size], page size of None means no limit
+    :param select_from: selectable containing all the columns, independent of the query the filter is used in
+    :param targets: columns matched against the key columns of the rows in the window
+    :return: filter expression
+    """
+    offset, page_size = window
+    statement = (
+        select(*columns)
+        .select_from(select_from)
+        .where(*(column == parent for column, parent in zip(partition_by, parents)))
+        .order_by(*order_by)
+        .offset(offset)
+        .limit(page_size)
+    )
+    if len(targets) == 1:
+        return targets[0].in_(statement)
+    return tuple_(*targets).in_(statement)
+
+
+def _create_relationship_window_filter(
+    property_: InstrumentedAttribute,
+    related_model: Union[Type[IEntityModel], Type[SQLAlchemyModel], AliasedClass],
+    window: Tuple[int, Optional[int]],
+    secondary: Optional[Any] = None,
+) -> ColumnElement:
+    """
+    Create a filter limiting the related entities of a to-many relationship per parent entity.
+
+    Related entities are ordered by the default ordering (primary key descending).
+    :param property_: the relationship
+    :param related_model: related model (or its alias) the filter is applied to
+    :param window: tuple [offset, page size]
+    :param secondary: association table (or its alias) of a many-to-many relationship the filter is applied to
+    :return: filter expression
+    """
+    expression = property_.expression
+    if property_.property.direction == MANYTOMANY:
+        parent_key, child_key = expression.clauses[0].right.key, expression.clauses[1].right.key
+        secondary = secondary if secondary is not None else expression.clauses[0].right.table
+        ranked_secondary = property_.property.secondary.alias()
+        return _create_window_filter(
+            [ranked_secondary.c[child_key]],
+            [ranked_secondary.c[parent_key]],
+            [secondary.c[parent_key]],
+            [desc(ranked_secondary.c[child_key])],
+            window,
+            ranked_secondary,
+            [secondary.c[child_key]],
+        )
+    related_mapper = property_.property.mapper
+    ranked_model = aliased(related_mapper.class_)
+    primary_key = [getattr(ranked_model, key) for key in related_mapper.class_.get_primary_key()]
+    references = [
+        related_mapper.get_property_by_column(remote).key for _, remote in property_.property.local_remote_pairs
+    ]
+    return _create_window_filter(
+        primary_key,
+        [getattr(ranked_model, key) for key in references],
+        [getattr(related_model, key) for key in references],
+        [desc(c) for c in primary_key],
+        window,
+        ranked_model,
+        [getattr(related_model, key) for key in related_mapper.class_.get_primary_key()],
+    )
+
+
 def _create_join(
     selectables: SelectablesType,
     related_model: Union[Type[IEntityModel], Type[SQLAlchemyModel], AliasedClass],
     property_: InstrumentedAttribute,
     nested_path: str,
     select_from: Union[Join, Type[SQLAlchemyModel], AliasedClass],
+    window: Optional[Tuple[int, Optional[int]]] = None,
 ) -> ColumnClause:
     expression = property_.expression
     if isinstance(expression, BooleanClauseList):
         if property_.property.direction == MANYTOMANY and len(expression.clauses) == 2:
             m2m_path = f"{nested_path}._m2m"
             if m2m_path not in selectables:
-                selectables[m2m_path] = expression.clauses[0].right.table
+                secondary = expression.clauses[0].right.table
+                selectables[m2m_path] = secondary
+                secondary_join = expression.clauses[0]
+                if window is not None:
+                    # Limit the association rows per parent entity
+                    secondary_join = and_(
+                        secondary_join, _create_relationship_window_filter(property_, related_model, window, secondary)
+                    )
                 selectables["__selection__"] = selectables["__selection__"].join(
-                    selectables[m2m_path], expression.clauses[0], isouter=True
+                    selectables[m2m_path], secondary_join, isouter=True
                 )
+            related_attribute = inspect(related_model).mapper.get_property_by_column(expression.clauses[1].left).key
             # noinspection PyTypeChecker
             join_expression: ColumnClause = getattr(
                 selectables[m2m_path].c, expression.clauses[1].right.key
-            ) == getattr(inspect(related_model).local_table.c, expression.clauses[1].left.key)
+            ) == getattr(related_model, related_attribute)
             selectables["__selection__"] = selectables["__selection__"].join(
                 related_model, join_expression, isouter=True
             )
@@ -136,7 +488,11 @@ def _create_join(
             if inspect(select_from).local_table == expression.left.table
             else expression.right == getattr(related_model, expression.left.key)
         )
-        selectables["__selection__"] = selectables["__selection__"].join(related_model, join_expression, isouter=True)
+        on_clause = join_expression
+        if window is not None:
+            # Limit the related rows per parent entity
+            on_clause = and_(join_expression, _create_relationship_window_filter(property_, related_model, window))
+        selectables["__selection__"] = selectables["__selection__"].join(related_model, on_clause, isouter=True)
         return join_expression
 
 
@@ -148,6 +504,8 @@ async def _apply_nested(
     attribute: str,
     selectables: SelectablesType,
     eager_options: Any = None,
+    *,
+    arguments: Optional[Dict[str, Any]] = None,
     **kwargs,
 ):
     """
@@ -160,6 +518,7 @@ async def _apply_nested(
     :param attribute: attribute which is used on the model to retrieve the relationship property
     :param selectables: selectables which will be modified and used
     :param eager_options: eager options for select statement
+    :param arguments: arguments of the selected field, page_size and offset limit to-many relationships per entity
     :return: what op returns
     """
     nested_path = f"{path}.{attribute}"
@@ -173,9 +532,11 @@ async def _apply_nested(
     if nested_path not in selectables:
         related_type_name = strip_defer_typename(model.get_attribute_type(attribute))
         related_model_raw = model.get_schema_manager().get_model_for_name(related_type_name)
-        related_model = with_polymorphic(related_model_raw, "*", aliased=True)
+        related_model = _create_polymorphic_entity(
+            related_model_raw, input_ if isinstance(input_, Selection) else None
+        )
         selectables[nested_path] = related_model
-        _create_join(selectables, related_model, prop, nested_path, select_from)
+        _create_join(selectables, related_model, prop, nested_path, select_from, _get_window(prop, arguments))
     eager_options = (
         contains_eager(prop.of_type(selectables[nested_path]))
         if eager_options is None
@@ -186,45 +547,397 @@ async def _apply_nested(
     return op(selectables[nested_path], nested_path, input_, selectables, eager_options, **kwargs)
 
 
+def _get_row_values(
+    model: Type[Union[SQLAlchemyModel, IEntityModel]], input_object: IsDataclass
+) -> Optional[Dict[Column, Any]]:
+    """
+    Convert a mutation input to values of table columns.
+
+    :param model: model of the input
+    :param input_object: graphql input
+    :return: values by column, None if the input sets a collection and cannot be written without the ORM
+    """
+    mapper: Mapper = get_metadata(model).mapper
+    row = {}
+    for prop in input_object.__dataclass_fields__:
+        value = getattr(input_object, prop)
+        if value is UNSET or prop == "primary_key_":
+            continue
+        if prop in mapper.column_attrs:
+            row[mapper.column_attrs[prop].columns[0]] = value.name if isinstance(value, Enum) else value
+            continue
+        relationship = mapper.relationships.get(prop)
+        if relationship is None or relationship.direction != MANYTOONE or relationship.secondary is not None:
+            return None
+        # Reference to one entity, only the foreign key columns are set
+        related_mapper = relationship.mapper
+        for local, remote in relationship.local_remote_pairs:
+            remote_key = related_mapper.get_property_by_column(remote).key
+            row[local] = getattr(value.primary_key_, remote_key) if value is not None else None
+    return row
+
+
+def _order_collections(entities: Iterable[Any], selection: Dict) -> None:
+    """
+    Order the loaded collections of the selected to-many relationships by the default ordering (primary key descending).
+
+    Collections loaded by the orm (joined or by separate queries) come in the order of the rows of the database, the
+    entities built from rows and JSON documents have their collections ordered by the database already.
+    :param entities: orm instances (or None)
+    :param selection: selected fields of the instances
+    """
+    for entity in entities:
+        if entity is None:
+            continue
+        relationships = inspect(entity).mapper.relationships
+        for attr, sub_selection in selection.items():
+            if isclass(attr):
+                if isinstance(entity, attr):
+                    _order_collections([entity], sub_selection)
+                continue
+            # Only loaded relationships are ordered, reading the others would load them
+            if attr not in relationships or attr not in entity.__dict__:
+                continue
+            related = getattr(entity, attr)
+            if relationships[attr].uselist:
+                related_key = relationships[attr].mapper.class_.get_primary_key()
+                related.sort(key=lambda e: tuple(getattr(e, k) for k in related_key), reverse=True)
+                _order_collections(related, sub_selection)
+            else:
+                _order_collections([related], sub_selection)
+
+
+async def _reload(
+    session: AsyncSession,
+    model: Type[Union[SQLAlchemyModel, IEntityModel]],
+    keys: Iterable[Tuple],
+    selection: Dict[str, Dict],
+    projection: bool = True,
+) -> List[Any]:
+    """
+    Load entities changed by a mutation, ordered by the default ordering.
+
+    :param session: sqlalchemy session
+    :param model: model of the entities
+    :param keys: primary keys of the entities
+    :param selection: selected fields
+    :param projection: load only the selected columns
+    :return: list of entities
+    """
+    polymorphic_model = _create_polymorphic_entity(model, selection)
+    model_query = select(polymorphic_model)
+    selectables: SelectablesType = {"": polymorphic_model, "__selection__": model_query}
+
+    eager_options = await create_selection_joins(model, "", selection, selectables, projection=projection)
+    ordering = await create_ordering(model, "", add_default_ordering(model, []), selectables)
+
+    expression = (
+        cast(Type[SQLAlchemyModel], selectables["__selection__"])
+        .filter(_create_pk_filter(model, polymorphic_model))
+        .order_by(*ordering)
+    )
+    if eager_options != (None,):
+        expression = expression.options(*eager_options)
+    # Rows may have been changed bypassing the instances which are already present in the session
+    expression = expression.execution_options(populate_existing=True)
+    # Chunks in the default ordering (primary key descending) keep the results ordered
+    results = await _execute_for_keys(session, expression, model, sorted(set(keys), reverse=True))
+    entities = [entity for result in results for entity in result.unique().scalars().all()]
+    _order_collections(entities, selection)
+    return entities
+
+
+async def _bulk_insert(
+    session: AsyncSession,
+    model: Type[Union[SQLAlchemyModel, IEntityModel]],
+    rows: List[Dict[str, Any]],
+    chunk_size: int,
+) -> List[Dict[str, Any]]:
+    """
+    Insert rows with multi-row INSERT statements, bypassing the ORM unit of work.
+
+    Generated primary keys are fetched by RETURNING. When the dialect does not support RETURNING and the primary keys
+    are not part of the rows, every row is inserted by a separate statement to get its primary key.
+    :param session: sqlalchemy session
+    :param model: inserted model
+    :param rows: values of the rows by column key
+    :param chunk_size: maximum number of rows in one statement
+    :return: primary keys of the inserted rows
+    """
+    mapper: Mapper = get_metadata(model).mapper
+    table = mapper.local_table
+    key_columns = [(key, mapper.get_property(key).columns[0]) for key in model.get_primary_key()]
+    dialect = session.get_bind().dialect
+
+    # All rows of a multi-row insert need values for the same columns
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    primary_keys = []
+    for columns, group in groups.items():
+        has_keys = all(column.key in columns for _, column in key_columns)
+        if not columns or not has_keys and not getattr(dialect, "full_returning", False):
+            for row in group:
+                inserted = (await session.execute(insert(table).values(row))).inserted_primary_key
+                primary_keys.append({key: inserted._mapping[column.key] for key, column in key_columns})
+            continue
+        rows_per_statement = max(1, min(chunk_size, MAX_BOUND_PARAMETERS // max(len(columns), 1)))
+        for start in range(0, len(group), rows_per_statement):
+            chunk = group[start : start + rows_per_statement]
+            if has_keys:
+                await session.execute(insert(table).values(chunk))
+                primary_keys.extend({key: row[column.key] for key, column in key_columns} for row in chunk)
+            else:
+                statement = insert(table).values(chunk).returning(*(column for _, column in key_columns))
+                primary_keys.extend(
+                    {key: row[i] for i, (key, _) in enumerate(key_columns)}
+                    for row in (await session.execute(statement)).all()
+                )
+    return primary_keys
+
+
 async def create_(
     session: AsyncSession,
     model: Type[Union[SQLAlchemyModel, IEntityModel]],
     data: List[Any],
     selection: Dict[str, Dict],
+    insert_chunk_size: int = 1000,
+    projection: bool = True,
 ):
     """
     Resolve the create-many operation.
 
+    Inputs of a model without inheritance which set only columns and references to one entity are inserted in bulk,
+    without creating ORM instances, the referenced entities are only checked to exist.
     :param session: sqlalchemy session
     :param model: which model to use
     :param data: graphql input
     :param selection: selected fields
+    :param insert_chunk_size: maximum number of rows inserted by one statement in bulk
+    :param projection: load only the selected columns of the created entities
     :return: list of created models
     """
-    # TODO: create related models as well maybe?
-    models = []
-    for create_type in data:
-        instance = model()
-        await _set_instance_attrs(model, instance, create_type, session)
-        models.append(instance)
-    session.add_all(models)
-    await session.flush(models)
-    primary_keys = [{key: getattr(instance, key) for key in model.get_primary_key()} for instance in models]
+    mapper: Mapper = get_metadata(model).mapper
+    rows = None
+    if insert_chunk_size > 0 and mapper.inherits is None and mapper.polymorphic_on is None:
+        rows = [_get_row_values(model, create_type) for create_type in data]
+    if rows is not None and all(row is not None for row in rows):
+        await _check_references(session, _collect_references(model, data))
+        primary_keys = await _bulk_insert(
+            session, model, [{c.key: v for c, v in cast(Dict, row).items()} for row in rows], insert_chunk_size
+        )
+    else:
+        # TODO: create related models as well maybe?
+        references = await _load_references(session, _collect_references(model, data))
+        models = []
+        for create_type in data:
+            instance = model()
+            _set_instance_attrs(model, instance, create_type, references)
+            models.append(instance)
+        session.add_all(models)
+        await session.flush(models)
+        primary_keys = [{key: getattr(instance, key) for key in model.get_primary_key()} for instance in models]
     await session.commit()
 
-    data = [_create_pk_class(instance) for instance in primary_keys]
-    polymorphic_model = with_polymorphic(model, "*", aliased=True)
-    model_query = select(polymorphic_model)
-    selectables: SelectablesType = {"": polymorphic_model, "__selection__": model_query}
-    pk_filter = _build_multiple_pk_query(model, polymorphic_model, data)
+    return await _reload(
+        session, model, [_get_dict_pk_values(model, key) for key in primary_keys], selection, projection
+    )
 
-    eager_options = await create_selection_joins(model, "", selection, selectables)
-    ordering = await create_ordering(model, "", add_default_ordering(model, []), selectables)
 
-    expression = cast(Type[SQLAlchemyModel], selectables["__selection__"]).filter(pk_filter).order_by(*ordering)
-    if eager_options != (None,):
-        expression = expression.options(*eager_options)
-    return (await session.execute(expression)).unique().scalars().all()
+async def _bulk_update(
+    session: AsyncSession,
+    model: Type[Union[SQLAlchemyModel, IEntityModel]],
+    rows: List[Tuple[IsDataclass, Dict[Column, Any]]],
+):
+    """
+    Update rows with UPDATE ... WHERE pk = :pk statements executed for many parameter sets, bypassing the ORM.
+
+    :param session: sqlalchemy session
+    :param model: updated model
+    :param rows: tuples [graphql input, values by column]
+    """
+    mapper: Mapper = get_metadata(model).mapper
+    # Statements are executed per table (joined inheritance) and per set of updated columns
+    groups: Dict[Tuple[Table, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+    for entry, values in rows:
+        tables: Dict[Table, Dict[str, Any]] = {}
+        for column, value in values.items():
+            tables.setdefault(column.table, {})[column.key] = value
+        for table, parameters in tables.items():
+            for column in table.primary_key.columns:
+                parameters[f"pk_{column.key}"] = getattr(
+                    entry.primary_key_, mapper.get_property_by_column(column).key
+                )
+            groups.setdefault((table, tuple(sorted(parameters))), []).append(parameters)
+
+    for (table, _), parameters_list in groups.items():
+        statement = update(table).where(
+            and_(*(column == bindparam(f"pk_{column.key}") for column in table.primary_key.columns))
+        )
+        await session.execute(statement, parameters_list)
+
+
+def _get_relationship_values(
+    mapper: Mapper, pairs: List[Tuple[Column, Column]], entry: Any, prefix: str
+) -> Dict[str, Any]:
+    """
+    Get values of the columns referencing an entity in a relationship.
+
+    :param mapper: mapper of the referenced entity
+    :param pairs: pairs [column of the referenced entity, referencing column]
+    :param entry: primary key field of the referenced entity
+    :param prefix: prefix of the parameter names
+    :return: values by parameter name (prefix + key of the referencing column)
+    """
+    values = {}
+    for column, referencing in pairs:
+        key = mapper.get_property_by_column(column).key
+        if key not in mapper.class_.get_primary_key():
+            raise Exception(f"Collections can only be changed when they reference the primary key of {mapper.class_}")
+        values[f"{prefix}{referencing.key}"] = getattr(entry.primary_key_, key)
+    return values
+
+
+def _get_collection_fields(model: Type[Union[SQLAlchemyModel, IEntityModel]], input_object: IsDataclass) -> Set[str]:
+    """
+    Get fields of an update input which change collections, by their entries or by the changes of their entries.
+
+    :param model: model of the input
+    :param input_object: graphql input
+    :return: names of the fields
+    """
+    relationships = get_metadata(model).relationships
+    fields = set()
+    for prop in input_object.__dataclass_fields__:
+        name = prop[: -len(COLLECTION_CHANGES_SUFFIX)] if prop.endswith(COLLECTION_CHANGES_SUFFIX) else prop
+        if name in relationships and relationships[name].uselist:
+            fields.add(prop)
+    return fields
+
+
+def _get_collection_inputs(
+    model: Type[Union[SQLAlchemyModel, IEntityModel]], input_object: IsDataclass
+) -> Dict[str, Tuple[Optional[List[Any]], Optional[CollectionUpdate]]]:
+    """
+    Get collections changed by an update input.
+
+    :param model: model of the input
+    :param input_object: graphql input
+    :return: map of [relationship name, (replacing entries or None, collection changes or None)]
+    """
+    collections: Dict[str, Tuple[Optional[List[Any]], Optional[CollectionUpdate]]] = {}
+    for prop in _get_collection_fields(model, input_object):
+        value = getattr(input_object, prop)
+        if value is UNSET or value is None:
+            continue
+        if isinstance(value, CollectionUpdate):
+            prop = prop[: -len(COLLECTION_CHANGES_SUFFIX)]
+            collections[prop] = (collections.get(prop, (None, None))[0], value)
+        else:
+            collections[prop] = (value, collections.get(prop, (None, None))[1])
+    return collections
+
+
+async def _update_collections(
+    session: AsyncSession,
+    model: Type[Union[SQLAlchemyModel, IEntityModel]],
+    data: List[Any],
+):
+    """
+    Apply collection changes of update inputs without loading the collections.
+
+    Entries of replaced collections are diffed against the keys of the current entries, selected from the association
+    table (many-to-many) or the foreign keys of the related entities (one-to-many), then the changes of the inputs are
+    applied. Collections of many-to-many relationships are changed by INSERT and DELETE statements of the association
+    table, collections of one-to-many relationships by UPDATE statements of the foreign keys of the related entities.
+    :param session: sqlalchemy session
+    :param model: updated model
+    :param data: graphql input
+    """
+    mapper: Mapper = get_metadata(model).mapper
+    collections: Dict[str, List[Tuple[Any, Optional[List[Any]], Optional[CollectionUpdate]]]] = {}
+    for entry in data:
+        for prop, (replacement, changes) in _get_collection_inputs(model, entry).items():
+            collections.setdefault(prop, []).append((entry, replacement, changes))
+
+    for prop, updates in collections.items():
+        relationship = mapper.relationships[prop]
+        related_mapper = relationship.mapper
+        # Columns referencing the parent and the related entities, in the association table or the related table
+        parent_columns = [column for _, column in relationship.synchronize_pairs]
+        if relationship.secondary is not None:
+            child_pairs = relationship.secondary_synchronize_pairs
+        else:
+            child_pairs = [(c, c) for c in parent_columns[0].table.primary_key.columns]
+        child_columns = [column for _, column in child_pairs]
+
+        def get_row(parent: Dict[str, Any], item: Any) -> Tuple:
+            child = _get_relationship_values(related_mapper, child_pairs, item, "child_")
+            return tuple({**parent, **child}.items())
+
+        # Current entries of the replaced collections, as rows of parameters like get_row
+        current: Dict[Tuple, Set[Tuple]] = {}
+        replaced = {
+            tuple(_get_relationship_values(mapper, relationship.synchronize_pairs, entry, "parent_").values())
+            for entry, replacement, _ in updates
+            if replacement is not None
+        }
+        if replaced:
+            names = [*(f"parent_{c.key}" for c in parent_columns), *(f"child_{c.key}" for c in child_columns)]
+            keys = bindparam("keys", expanding=True)
+            statement = select(*parent_columns, *child_columns).where(
+                parent_columns[0].in_(keys) if len(parent_columns) == 1 else tuple_(*parent_columns).in_(keys)
+            )
+            for result in await _execute_for_keys(session, statement, model, replaced):
+                for row in result.all():
+                    current.setdefault(tuple(row[: len(parent_columns)]), set()).add(tuple(zip(names, row)))
+
+        removed: List[Tuple] = []
+        added: List[Tuple] = []
+        for entry, replacement, changes in updates:
+            parent = _get_relationship_values(mapper, relationship.synchronize_pairs, entry, "parent_")
+            remove = [get_row(parent, item) for item in _get_collection_entries(changes.remove if changes else None)]
+            add = [get_row(parent, item) for item in _get_collection_entries(changes.add if changes else None)]
+            if replacement is not None:
+                target = {row for row in (get_row(parent, item) for item in replacement) if row not in remove}
+                target.update(add)
+                existing = current.get(tuple(parent.values()), set())
+                remove = [row for row in existing if row not in target]
+                add = [row for row in target if row not in existing]
+            removed.extend(remove)
+            added.extend(add)
+        removed_parameters = [dict(row) for row in removed]
+        added_parameters = [dict(row) for row in added]
+
+        parent_filter = and_(*(c == bindparam(f"parent_{c.key}") for c in parent_columns))
+        child_filter = and_(*(c == bindparam(f"child_{c.key}") for c in child_columns))
+        if relationship.secondary is not None:
+            # Added rows are deleted first, so that adding an entity already in the collection does not fail
+            if removed_parameters or added_parameters:
+                statement = delete(relationship.secondary).where(parent_filter, child_filter)
+                await session.execute(statement, [*removed_parameters, *added_parameters])
+            if added_parameters:
+                await session.execute(
+                    insert(relationship.secondary),
+                    [
+                        {
+                            **{c.key: row[f"parent_{c.key}"] for c in parent_columns},
+                            **{c.key: row[f"child_{c.key}"] for c in child_columns},
+                        }
+                        for row in added_parameters
+                    ],
+                )
+        else:
+            table = parent_columns[0].table
+            if removed_parameters:
+                statement = update(table).where(child_filter, parent_filter).values({c: None for c in parent_columns})
+                await session.execute(statement, removed_parameters)
+            if added_parameters:
+                statement = update(table).where(child_filter).values(
+                    {c: bindparam(f"parent_{c.key}") for c in parent_columns}
+                )
+                await session.execute(statement, added_parameters)
 
 
 async def update_(
@@ -232,49 +945,61 @@ async def update_(
     model: Type[Union[SQLAlchemyModel, IEntityModel]],
     data: List[Any],
     selection: Dict[str, Dict],
+    projection: bool = True,
 ):
     """
     Resolve the update-many operation.
 
+    Inputs which set only columns and references to one entity are written by UPDATE statements directly, other
+    inputs are applied to loaded instances, with only the relationships named in the inputs loaded.
+    Collections are changed without loading them, see _update_collections.
     :param session: sqlalchemy session
     :param model: which model to use
     :param data: graphql input
     :param selection: selected fields
+    :param projection: load only the selected columns of the updated entities
     :return: list of update model instances
     """
-    pk_filter = _build_multiple_pk_query(model, model, data)
-    instances = (
-        (
-            await session.execute(
-                select(model)
-                .options(*[selectinload(a.key) for a in inspect(model).attrs if isinstance(a, RelationshipProperty)])
-                .where(pk_filter)
-            )
-        )
-        .scalars()
-        .all()
-    )
-    entities = {_get_model_pk_values(model, en): en for en in instances}
-    if len(entities) != len(data):
+    primary_key = [getattr(model, key) for key in model.get_primary_key()]
+    keys = {_get_model_pk_values(model, entry.primary_key_) for entry in data}
+    results = await _execute_for_keys(session, select(*primary_key).where(_create_pk_filter(model, model)), model, keys)
+    if sum(len(result.all()) for result in results) != len(data):
         return [None]
-    for entry in data:
-        model_instance = entities[_get_model_pk_values(model, entry.primary_key_)]
-        await _set_instance_attrs(model, model_instance, entry, session)
-    session.add_all(entities.values())
+    await _check_references(session, _collect_references(model, data, collection_updates=True))
+    await _update_collections(session, model, data)
+
+    # Collections are already changed, the other attributes are written by UPDATE statements or the ORM
+    data = [
+        dataclasses.replace(entry, **{prop: UNSET for prop in _get_collection_fields(model, entry)}) for entry in data
+    ]
+    rows = [(entry, _get_row_values(model, entry)) for entry in data]
+    await _bulk_update(session, model, [(entry, values) for entry, values in rows if values is not None])
+
+    orm_data = [entry for entry, values in rows if values is None]
+    if orm_data:
+        relationships = {
+            prop
+            for entry in orm_data
+            for prop in entry.__dataclass_fields__
+            if getattr(entry, prop) is not UNSET and prop in get_metadata(model).relationships
+        }
+        statement = (
+            select(model)
+            .options(*[selectinload(getattr(model, prop)) for prop in relationships])
+            .where(_create_pk_filter(model, model))
+        )
+        results = await _execute_for_keys(
+            session, statement, model, [_get_model_pk_values(model, entry.primary_key_) for entry in orm_data]
+        )
+        entities = {_get_model_pk_values(model, en): en for result in results for en in result.scalars().all()}
+        references = await _load_references(session, _collect_references(model, orm_data))
+        for entry in orm_data:
+            model_instance = entities[_get_model_pk_values(model, entry.primary_key_)]
+            _set_instance_attrs(model, model_instance, entry, references)
+        session.add_all(entities.values())
     await session.commit()
 
-    polymorphic_model = with_polymorphic(model, "*", aliased=True)
-    model_query = select(polymorphic_model)
-    selectables: SelectablesType = {"": polymorphic_model, "__selection__": model_query}
-    pk_filter = _build_multiple_pk_query(model, polymorphic_model, data)
-
-    eager_options = await create_selection_joins(model, "", selection, selectables)
-    ordering = await create_ordering(model, "", add_default_ordering(model, []), selectables)
-
-    expression = cast(Type[SQLAlchemyModel], selectables["__selection__"]).filter(pk_filter).order_by(*ordering)
-    if eager_options != (None,):
-        expression = expression.options(*eager_options)
-    return (await session.execute(expression)).unique().scalars().all()
+    return await _reload(session, model, keys, selection, projection)
 
 
 async def delete_(
@@ -290,11 +1015,202 @@ async def delete_(
     :param data: graphql input
     :return: number of affected rows
     """
-    pk_q = _build_multiple_pk_query(model, model, data)
-    statement = delete(model).where(pk_q)
-    result = await session.execute(statement)
+    keys = {_get_model_pk_values(model, entry.primary_key_) for entry in data}
+    results = await _execute_for_keys(session, delete(model).where(_create_pk_filter(model, model)), model, keys)
+    await session.commit()
+    return DeleteResult(affected_rows=sum(result.rowcount for result in results))
+
+
+def _get_filters(data: Union[UpdateWhere, DeleteWhere]) -> List[Dict]:
+    filters = [dataclasses.asdict(f) for f in data.filters if f is not None] if data.filters else []
+    # Filters without any criterion match every entity as well, quantifiers only apply to relationship filters
+    filters = [
+        f for f in filters if any(v is not UNSET and k not in ("ANY_", "ALL_", "NONE_") for k, v in f.items())
+    ]
+    if not filters and not data.all_entities:
+        raise Exception("Filters are required to update or delete entities by filters, unless allEntities is set")
+    return filters
+
+
+async def _build_where_statement(
+    model: Type[Union[SQLAlchemyModel, IEntityModel]], filters: List[Dict]
+) -> Tuple[Select, AliasedClass]:
+    """
+    Create a statement selecting primary keys of entities matching filters.
+
+    :param model: filtered model
+    :param filters: filters input
+    :return: tuple [statement, aliased model of the statement]
+    """
+    polymorphic_model = _create_polymorphic_entity(model)
+    primary_key = [getattr(polymorphic_model, key) for key in model.get_primary_key()]
+    selectables: SelectablesType = {"": polymorphic_model, "__selection__": select(*primary_key)}
+
+    filter_expressions = await create_object_filters(model, "", filters, selectables) if filters else []
+    return cast(Select, selectables["__selection__"]).where(*filter_expressions), polymorphic_model
+
+
+async def _select_where_keys(
+    session: AsyncSession, model: Type[Union[SQLAlchemyModel, IEntityModel]], filters: List[Dict]
+) -> Set[Tuple]:
+    """
+    Select primary keys of entities matching filters.
+
+    :param session: sqlalchemy session
+    :param model: which model to use
+    :param filters: graphql filters
+    :return: set of primary keys
+    """
+    # Joined relationships may repeat the keys
+    statement, _ = await _build_where_statement(model, filters)
+    return {tuple(row) for row in (await session.execute(statement)).all()}
+
+
+def _create_table_key_filter(model: Type[Union[SQLAlchemyModel, IEntityModel]], table: Table) -> ColumnElement:
+    """
+    Create a filter of rows of a table of a model by primary keys of the model, see _execute_for_keys.
+
+    :param model: model of the primary keys
+    :param table: table of the model (or of its parent or sub-model)
+    :return: filter expression
+    """
+    mapper: Mapper = get_metadata(model).mapper
+    # Tables of sub-models are mapped only by the mappers of the sub-models
+    table_mapper = next(m for m in mapper.self_and_descendants if table in m.tables)
+    columns = {table_mapper.get_property_by_column(column).key: column for column in table.primary_key.columns}
+    primary_key = [columns[key] for key in model.get_primary_key()]
+    keys = bindparam("keys", expanding=True)
+    return primary_key[0].in_(keys) if len(primary_key) == 1 else tuple_(*primary_key).in_(keys)
+
+
+async def _create_where_filter(
+    model: Type[Union[SQLAlchemyModel, IEntityModel]], filters: List[Dict], table: Table
+) -> ColumnElement:
+    """
+    Create a filter of rows of a table of a model matching filters of the model.
+
+    The filters are correlated to the rows by primary key as EXISTS, so that filters on relationships can join
+    the related entities without joining them to the updated / deleted table itself.
+    :param model: filtered model
+    :param filters: filters input
+    :param table: table of the model which is updated / deleted
+    :return: filter expression
+    """
+    mapper: Mapper = get_metadata(model).mapper
+    statement, polymorphic_model = await _build_where_statement(model, filters)
+    correlation = [
+        getattr(polymorphic_model, mapper.get_property_by_column(column).key) == column
+        for column in table.primary_key.columns
+    ]
+    return statement.where(*correlation).exists()
+
+
+async def update_where_(
+    session: AsyncSession,
+    model: Type[Union[SQLAlchemyModel, IEntityModel]],
+    data: UpdateWhere,
+) -> UpdateResult:
+    """
+    Resolve the update-where operation.
+
+    Matching rows are updated by one UPDATE ... WHERE EXISTS statement without selecting them. When the values span
+    multiple tables (joined inheritance), the matching primary keys are selected first, so that updating one table
+    cannot change which rows of the other tables match.
+    :param session: sqlalchemy session
+    :param model: which model to use
+    :param data: graphql input
+    :return: number of affected rows
+    """
+    filters = _get_filters(data)
+    values = _get_row_values(model, data.set)
+    if values is None:
+        raise Exception(f"Only attributes and references to one entity of {model.__name__} can be updated by filters")
+    if not values:
+        return UpdateResult(affected_rows=0)
+    await _check_references(session, _collect_references(model, [data.set]))
+
+    tables: Dict[Table, Dict[Column, Any]] = {}
+    for column, value in values.items():
+        tables.setdefault(column.table, {})[column] = value
+
+    if len(tables) == 1:
+        table, table_values = next(iter(tables.items()))
+        statement = update(table).where(await _create_where_filter(model, filters, table)).values(table_values)
+        affected_rows = (await session.execute(statement)).rowcount
+    else:
+        keys = await _select_where_keys(session, model, filters)
+        for table, table_values in tables.items():
+            statement = update(table).where(_create_table_key_filter(model, table)).values(table_values)
+            await _execute_for_keys(session, statement, model, keys)
+        affected_rows = len(keys)
+    await session.commit()
+    return UpdateResult(affected_rows=affected_rows)
+
+
+async def delete_where_(
+    session: AsyncSession,
+    model: Type[Union[SQLAlchemyModel, IEntityModel]],
+    data: DeleteWhere,
+) -> DeleteResult:
+    """
+    Resolve the delete-where operation.
+
+    Matching rows are deleted by one DELETE ... WHERE EXISTS statement without selecting them. Entities stored in
+    multiple tables (joined inheritance) are deleted from every table of the hierarchy, sub-model tables first, by
+    the primary keys selected first.
+    :param session: sqlalchemy session
+    :param model: which model to use
+    :param data: graphql input
+    :return: number of affected rows
+    """
+    mapper: Mapper = get_metadata(model).mapper
+    filters = _get_filters(data)
+    # Tables of parent models first, in the order of inheritance
+    mappers = [*reversed(list(mapper.iterate_to_root())), *mapper.self_and_descendants]
+    tables = list(dict.fromkeys(m.local_table for m in mappers))
+    if len(tables) == 1:
+        statement = delete(mapper.local_table).where(await _create_where_filter(model, filters, mapper.local_table))
+        affected_rows = (await session.execute(statement)).rowcount
+    else:
+        keys = await _select_where_keys(session, model, filters)
+        # Rows of sub-model tables reference the rows of their parent tables
+        for table in reversed(tables):
+            await _execute_for_keys(session, delete(table).where(_create_table_key_filter(model, table)), model, keys)
+        affected_rows = len(keys)
     await session.commit()
-    return DeleteResult(affected_rows=result.rowcount)
+    return DeleteResult(affected_rows=affected_rows)
+
+
+async def _build_retrieve_plan(
+    model: Union[Type[IEntityModel], Type[SQLAlchemyModel]],
+    selection: Dict[str, Dict],
+    projection: bool = True,
+    raw: bool = False,
+    dialect: Any = None,
+) -> QueryPlan:
+    pk_values = {key: bindparam(f"pk_{key}") for key in model.get_primary_key()}
+    if dialect is not None:
+        polymorphic_model = _create_polymorphic_entity(model, selection, strategy=LoadingStrategy.JOINED)
+        document, documents = _create_document(polymorphic_model, selection, projection, dialect)
+        statement = select(document).filter(_build_pk_query(model, polymorphic_model, pk_values))
+        return QueryPlan(statement=statement, documents=documents)
+    if raw:
+        polymorphic_model = _create_polymorphic_entity(model, selection, strategy=LoadingStrategy.JOINED)
+        rows = _create_rows_plan(polymorphic_model, selection, projection)
+        statement = select(*rows.columns).filter(_build_pk_query(model, polymorphic_model, pk_values))
+        return QueryPlan(statement=statement, rows=rows)
+
+    polymorphic_model = _create_polymorphic_entity(model, selection)
+    model_query = select(polymorphic_model)
+    selectables: SelectablesType = {"": polymorphic_model, "__selection__": model_query}
+    pk_filter = _build_pk_query(model, polymorphic_model, pk_values)
+
+    eager_options = await create_selection_joins(model, "", selection, selectables, projection=projection)
+
+    expression = cast(Type[SQLAlchemyModel], selectables["__selection__"]).filter(pk_filter)
+    if eager_options != (None,):
+        expression = expression.options(*eager_options)
+    return QueryPlan(statement=expression)
 
 
 async def retrieve_(
@@ -302,6 +1218,10 @@ async def retrieve_(
     model: Union[Type[IEntityModel], Type[SQLAlchemyModel]],
     data: PrimaryKeyField,
     selection: Dict[str, Dict],
+    plan_cache: Optional[PlanCacheType] = None,
+    projection: bool = True,
+    raw: bool = False,
+    aggregate: bool = False,
 ):
     """
     Resolve the query-one operation.
@@ -310,19 +1230,86 @@ async def retrieve_(
     :param model: which model to use
     :param data: graphql input
     :param selection: selected fields
+    :param plan_cache: cache of query plans, plans are rebuilt for every call if not provided
+    :param projection: load only the selected columns
+    :param raw: build read-only entities from the rows instead of orm instances, see RowsPlan
+    :param aggregate: build read-only entities from JSON documents aggregated by the database, see DocumentPlan
     :return: model instance
     """
-    polymorphic_model = with_polymorphic(model, "*", aliased=True)
-    model_query = select(polymorphic_model)
-    selectables: SelectablesType = {"": polymorphic_model, "__selection__": model_query}
-    pk_filter = _build_pk_query(model, polymorphic_model, data.primary_key_)
+    plan_key = (model, "retrieve", freeze(selection), projection, raw, aggregate)
+    plan = plan_cache.get(plan_key) if plan_cache is not None else None
+    if plan is None:
+        dialect = session.sync_session.get_bind().dialect if aggregate else None
+        plan = await _build_retrieve_plan(model, selection, projection, raw, dialect)
+        if plan_cache is not None:
+            plan_cache.set(plan_key, plan)
+
+    parameters = {f"pk_{key}": getattr(data.primary_key_, key) for key in model.get_primary_key()}
+    if plan.documents is not None:
+        document = (await session.execute(plan.statement, parameters)).scalar()
+        return plan.documents.read(document) if document is not None else None
+    if plan.rows is not None:
+        rows = (await session.execute(plan.statement, parameters)).all()
+        return ([*(await _read_rows(session, plan.rows, rows[:1])), None])[0]
+    entity = (await session.execute(plan.statement, parameters)).unique().scalar()
+    _order_collections([entity], selection)
+    return entity
+
+
+async def load_related_(
+    session: AsyncSession,
+    model: Union[Type[IEntityModel], Type[SQLAlchemyModel]],
+    attribute: str,
+    keys: Sequence[Tuple],
+    page_size: Optional[int] = None,
+    offset: Optional[int] = None,
+) -> List[Any]:
+    """
+    Load related entities of many entities with a single query.
+
+    Related entities of a to-many relationship are ordered by the default ordering (primary key descending) and
+    limited per parent entity by page_size and offset.
+    :param session: sqlalchemy session
+    :param model: model owning the relationship
+    :param attribute: name of the relationship
+    :param keys: primary keys of the parent entities
+    :param page_size: maximum number of related entities per parent entity, None for all
+    :param offset: number of related entities to skip per parent entity
+    :return: list of related entities (or the related entity) for every key, in the order of the keys
+    """
+    # Both sides are aliased, the relationship may reference the model itself
+    parent_model = aliased(model)
+    prop = getattr(parent_model, attribute)
+    related_class = prop.property.mapper.class_
+    related_model = (
+        with_polymorphic(related_class, "*", aliased=True)
+        if get_metadata(related_class).polymorphic
+        else aliased(related_class)
+    )
+    primary_key = [getattr(parent_model, key) for key in model.get_primary_key()]
 
-    eager_options = await create_selection_joins(model, "", selection, selectables)
+    relationship = prop.of_type(related_model)
+    window = _get_window(prop, {"page_size": page_size, "offset": offset})
+    if window is not None:
+        relationship = relationship.and_(
+            _create_relationship_window_filter(prop, related_model, window, prop.property.secondary)
+        )
+    statement = (
+        select(*primary_key, related_model)
+        .select_from(parent_model)
+        .join(relationship)
+        .where(_create_pk_filter(model, parent_model))
+    )
+    if prop.property.uselist:
+        statement = statement.order_by(*(desc(getattr(related_model, k)) for k in related_class.get_primary_key()))
 
-    expression = cast(Type[SQLAlchemyModel], selectables["__selection__"]).filter(pk_filter)
-    if eager_options != (None,):
-        expression = expression.options(*eager_options)
-    return (await session.execute(expression)).unique().scalar()
+    related: Dict[Tuple, List[Any]] = {}
+    for result in await _execute_for_keys(session, statement, model, set(tuple(key) for key in keys)):
+        for row in result.all():
+            related.setdefault(tuple(row[: len(primary_key)]), []).append(row[-1])
+    if prop.property.uselist:
+        return [related.get(tuple(key), []) for key in keys]
+    return [related.get(tuple(key), [None])[0] for key in keys]
 
 
 def add_default_ordering(model: Type[Union[SQLAlchemyModel, IEntityModel]], ordering: List[Dict]):
@@ -353,51 +1340,461 @@ def cleanup_ordering(ordering: List[Dict]):
     return result_ordering
 
 
+def _create_loader_option(
+    model: Union[Type[IEntityModel], Type[SQLAlchemyModel], AliasedClass],
+    attribute: str,
+    strategy: LoadingStrategy,
+    selection: Dict,
+    eager_options: Any = None,
+) -> Tuple[Any, Any]:
+    prop = getattr(model, attribute)
+    related_class = prop.property.mapper.class_
+    related_model = (
+        _create_polymorphic_entity(related_class, selection, aliased_=False)
+        if get_metadata(related_class).polymorphic
+        else related_class
+    )
+    loaded = prop.of_type(related_model)
+    window = _get_window(prop, getattr(selection, "arguments", None))
+    if window is not None:
+        loaded = loaded.and_(
+            _create_relationship_window_filter(prop, related_model, window, prop.property.secondary)
+        )
+    loader = _LOADERS[strategy]
+    option = loader(loaded) if eager_options is None else getattr(eager_options, loader.__name__)(loaded)
+    return related_model, option
+
+
+def _get_loaded_columns(
+    entity: Any, selection: Dict, projection: bool, loaded: Iterable[str] = (), fragment: bool = False
+) -> Tuple[List[str], List[str]]:
+    """
+    Get names of the columns of an entity loaded for its selection and of the columns left out.
+
+    With projection, the selected columns, the primary key, the polymorphic discriminator and the foreign keys of
+    relationships are loaded. Without projection, only heavy columns of the model (__deferred_columns__) are left out
+    unless they are selected.
+    :param entity: model, its alias or sub-entity of a polymorphic alias
+    :param selection: selected fields of the entity
+    :param projection: whether to load only the needed columns
+    :param loaded: names of other attributes to load
+    :param fragment: whether the entity is a sub-entity of a polymorphic alias, only the columns of its own table
+        are considered then
+    :return: tuple [loaded column names, left out column names]
+    """
+    mapper: Mapper = inspect(entity).mapper
+    fields = getattr(selection, "fields", set())
+    columns = [
+        prop.key
+        for prop in mapper.column_attrs
+        if not fragment or any(column.table is mapper.local_table for column in prop.columns)
+    ]
+    if projection:
+        required = set(loaded).union(get_metadata(mapper.class_).primary_key)
+        if mapper.polymorphic_on is not None:
+            required.add(mapper.get_property_by_column(mapper.polymorphic_on).key)
+        # Foreign keys identify related entities when they are loaded
+        required.update(
+            mapper.get_property_by_column(column).key
+            for relationship in mapper.relationships
+            for column in relationship.local_columns
+        )
+        left_out = {key for key in columns if key not in fields and key not in required}
+    else:
+        deferred = set(getattr(mapper.class_, "__deferred_columns__", ()))
+        left_out = {key for key in columns if key in deferred and key not in fields}
+    return [key for key in columns if key not in left_out], [key for key in columns if key in left_out]
+
+
+def _create_projection_option(
+    entity: Any,
+    selection: Dict,
+    selectables: SelectablesType,
+    eager_options: Any,
+    projection: bool,
+    loaded: Iterable[str] = (),
+    fragment: bool = False,
+) -> Optional[Any]:
+    """
+    Create a loader option deferring the columns of an entity not needed for its selection, see _get_loaded_columns.
+
+    Columns are deferred one by one, columns of sub-models not selected by fragments (which have the same attribute
+    names) are not affected.
+    :param entity: model, its alias or sub-entity of a polymorphic alias loaded at the path of the selection
+    :param selection: selected fields of the entity
+    :param selectables: selectables of the query, options of the queried entity are bound to selectables[""]
+    :param eager_options: sqlalchemy eager options of the path of the entity, None for the queried entity
+    :param projection: whether to load only the needed columns
+    :param loaded: names of other attributes to load
+    :param fragment: whether the entity is a sub-entity of a polymorphic alias
+    :return: loader option or None when all columns are loaded
+    """
+    _, keys = _get_loaded_columns(entity, selection, projection, loaded, fragment)
+    if not keys:
+        return None
+    option = eager_options if eager_options is not None else Load(selectables[""])
+    for key in keys:
+        option = option.defer(getattr(entity, key))
+    return option
+
+
+def _create_rows_plan(entity: Any, selection: Dict, projection: bool, loaded: Iterable[str] = ()) -> RowsPlan:
+    """
+    Create a plan reading entities of a selection from the columns of their alias, see RowsPlan.
+
+    Columns of sub-models selected by fragments are read from the sub-entities joined in the polymorphic alias, only
+    for the rows of the sub-models. Selected relationships (of the model and of its sub-models) are loaded by separate
+    statements, see _create_related_rows_plan.
+    :param entity: polymorphic alias (or alias) of the model, with the tables of all selected sub-models joined
+    :param selection: selected fields of the entities
+    :param projection: whether to load only the needed columns
+    :param loaded: names of other attributes to load
+    :return: plan of the rows
+    """
+    mapper: Mapper = inspect(entity).mapper
+    columns: List[Any] = []
+    base: Dict[str, int] = {}
+    for key in _get_loaded_columns(entity, selection, projection, loaded)[0]:
+        base[key] = len(columns)
+        columns.append(getattr(entity, key).label(f"column_{len(columns)}"))
+    relationships = [
+        _create_related_rows_plan(mapper.class_, key, sub_selection, projection)
+        for key, sub_selection in selection.items()
+        if isinstance(key, str)
+    ]
+    fragments: Dict[Mapper, List[Tuple[str, int]]] = {}
+    for key, sub_selection in selection.items():
+        if not (isclass(key) and hasattr(entity, key.__name__)):
+            continue
+        sub_entity = getattr(entity, key.__name__)
+        attributes = fragments[inspect(key)] = []
+        for column_key in _get_loaded_columns(sub_entity, sub_selection, projection, fragment=True)[0]:
+            if column_key not in base:
+                attributes.append((column_key, len(columns)))
+                columns.append(getattr(sub_entity, column_key).label(f"column_{len(columns)}"))
+        relationships.extend(
+            _create_related_rows_plan(key, attribute, related_selection, projection)
+            for attribute, related_selection in sub_selection.items()
+            if isinstance(attribute, str)
+        )
+
+    attributes_map = {None: (get_metadata(mapper.class_).row_class, tuple(base.items()))}
+    discriminator = None
+    if mapper.polymorphic_on is not None:
+        discriminator = base[mapper.get_property_by_column(mapper.polymorphic_on).key]
+        for identity, sub_mapper in mapper.polymorphic_map.items():
+            if not sub_mapper.isa(mapper):
+                continue
+            sub_attributes = [a for m, a_list in fragments.items() if sub_mapper.isa(m) for a in a_list]
+            attributes_map[identity] = (
+                get_metadata(sub_mapper.class_).row_class,
+                tuple(base.items()) + tuple(sub_attributes),
+            )
+    return RowsPlan(
+        columns=tuple(columns),
+        attributes=attributes_map,
+        discriminator=discriminator,
+        primary_key=tuple(base[key] for key in get_metadata(mapper.class_).primary_key),
+        relationships=tuple(relationships),
+    )
+
+
+def _create_related_rows_plan(
+    model: Union[Type[IEntityModel], Type[SQLAlchemyModel]], attribute: str, selection: Dict, projection: bool
+) -> RelatedRowsPlan:
+    """
+    Create a plan loading the rows of a selected relationship for primary keys of the parent entities.
+
+    The statement is built the same way as by load_related_, related entities of a to-many relationship are ordered by
+    the default ordering and limited per parent entity by the arguments of the selection.
+    :param model: model owning the relationship
+    :param attribute: name of the relationship
+    :param selection: selected fields of the related entities
+    :param projection: whether to load only the needed columns
+    :return: plan of the related rows
+    """
+    # Both sides are aliased, the relationship may reference the model itself
+    parent_model = aliased(model)
+    prop = getattr(parent_model, attribute)
+    related_class = prop.property.mapper.class_
+    related_model = _create_polymorphic_entity(related_class, selection, strategy=LoadingStrategy.JOINED)
+    plan = _create_rows_plan(related_model, selection, projection)
+
+    relationship = prop.of_type(related_model)
+    window = _get_window(prop, getattr(selection, "arguments", None))
+    if window is not None:
+        relationship = relationship.and_(
+            _create_relationship_window_filter(prop, related_model, window, prop.property.secondary)
+        )
+    primary_key = [getattr(parent_model, key).label(f"key_{i}") for i, key in enumerate(model.get_primary_key())]
+    statement = (
+        select(*primary_key, *plan.columns)
+        .select_from(parent_model)
+        .join(relationship)
+        .where(_create_pk_filter(model, parent_model))
+    )
+    if prop.property.uselist:
+        statement = statement.order_by(*(desc(getattr(related_model, k)) for k in related_class.get_primary_key()))
+    return RelatedRowsPlan(
+        owner=model, attribute=attribute, uselist=bool(prop.property.uselist), statement=statement, plan=plan
+    )
+
+
+async def _read_rows(session: AsyncSession, plan: RowsPlan, rows: Sequence[Any], offset: int = 0) -> List[EntityRow]:
+    """
+    Create entities from result rows and load their selected relationships, see RowsPlan.
+
+    Related rows of every relationship are loaded by one statement (per chunk of keys) for all the entities and
+    assigned to the entities by grouping them by the primary keys of the parents in one pass.
+    :param session: sqlalchemy session
+    :param plan: plan of the rows
+    :param rows: result rows, in the order of the entities
+    :param offset: position of the first column of the plan in the rows
+    :return: entity for every row
+    """
+    entities = plan.read(rows, offset)
+    for related in plan.relationships:
+        parents = [entity for entity in entities if isinstance(entity, related.owner)]
+        if not parents:
+            continue
+        primary_key = related.owner.get_primary_key()
+        keys = {tuple(getattr(parent, key) for key in primary_key) for parent in parents}
+        related_rows = [
+            row for result in await _execute_for_keys(session, related.statement, related.owner, keys) for row in result
+        ]
+        children = await _read_rows(session, related.plan, related_rows, len(primary_key))
+        groups: Dict[Tuple, List[EntityRow]] = {}
+        for row, child in zip(related_rows, children):
+            groups.setdefault(tuple(row[: len(primary_key)]), []).append(child)
+        for parent in parents:
+            group = groups.get(tuple(getattr(parent, key) for key in primary_key), [])
+            setattr(parent, related.attribute, group if related.uselist else (group[0] if group else None))
+    return entities
+
+
+def _get_unique_rows(plan: RowsPlan, rows: Iterable[Any]) -> List[Any]:
+    # Filters on relationships may join the same entity many times
+    unique: Dict[Tuple, Any] = {}
+    for row in rows:
+        unique.setdefault(plan.get_key(row), row)
+    return list(unique.values())
+
+
+def _create_document(
+    entity: Any, selection: Dict, projection: bool, dialect: Any, loaded: Iterable[str] = ()
+) -> Tuple[ColumnElement, DocumentPlan]:
+    """
+    Create a JSON document of the entities of a selection from the columns of their alias, see DocumentPlan.
+
+    Attributes are keyed by their positions, so that columns of sub-models with the same names do not collide.
+    Selected relationships (of the model and of its sub-models) are embedded as correlated subqueries, see
+    _create_related_document.
+    :param entity: polymorphic alias (or alias) of the model, with the tables of all selected sub-models joined
+    :param selection: selected fields of the entities
+    :param projection: whether to load only the needed columns
+    :param dialect: dialect of the database, see get_converter
+    :param loaded: names of other attributes to load
+    :return: tuple [document expression, plan of the documents]
+    """
+    mapper: Mapper = inspect(entity).mapper
+    arguments: List[Any] = []
+    converters: Dict[str, Callable[[Any], Any]] = {}
+
+    def add_value(value: Any) -> str:
+        key = f"c{len(arguments) // 2}"
+        arguments.extend((literal_column(f"'{key}'"), value))
+        return key
+
+    def add_column(source: Any, attribute: str) -> Tuple[str, str]:
+        column = getattr(source, attribute)
+        key = add_value(column)
+        converter = get_converter(column.type, dialect)
+        if converter is not None:
+            converters[key] = converter
+        return attribute, key
+
+    def add_relationships(owner: Type, owner_selection: Dict) -> None:
+        for attribute, sub_selection in owner_selection.items():
+            if isinstance(attribute, str):
+                value, uselist, plan = _create_related_document(
+                    entity, owner, attribute, sub_selection, projection, dialect
+                )
+                relationships.append(RelatedDocumentPlan(owner, attribute, add_value(value), uselist, plan))
+
+    relationships: List[RelatedDocumentPlan] = []
+    base = [add_column(entity, key) for key in _get_loaded_columns(entity, selection, projection, loaded)[0]]
+    add_relationships(mapper.class_, selection)
+    fragments: Dict[Mapper, List[Tuple[str, str]]] = {}
+    for model, sub_selection in selection.items():
+        if not (isclass(model) and hasattr(entity, model.__name__)):
+            continue
+        sub_entity = getattr(entity, model.__name__)
+        fragments[inspect(model)] = [
+            add_column(sub_entity, key)
+            for key in _get_loaded_columns(sub_entity, sub_selection, projection, fragment=True)[0]
+            if key not in dict(base)
+        ]
+        add_relationships(model, sub_selection)
+
+    attributes = {None: (get_metadata(mapper.class_).row_class, tuple(base))}
+    discriminator = None
+    if mapper.polymorphic_on is not None:
+        discriminator = dict(base)[mapper.get_property_by_column(mapper.polymorphic_on).key]
+        for identity, sub_mapper in mapper.polymorphic_map.items():
+            if sub_mapper.isa(mapper):
+                sub_attributes = tuple(a for m, a_list in fragments.items() if sub_mapper.isa(m) for a in a_list)
+                attributes[identity] = (get_metadata(sub_mapper.class_).row_class, tuple(base) + sub_attributes)
+    plan = DocumentPlan(
+        attributes=attributes,
+        discriminator=discriminator,
+        converters=converters,
+        relationships=tuple(relationships),
+    )
+    return json_document(*arguments), plan
+
+
+def _create_related_document(
+    parent: Any, model: Type, attribute: str, selection: Dict, projection: bool, dialect: Any
+) -> Tuple[ColumnElement, bool, DocumentPlan]:
+    """
+    Create a subquery of the documents of a selected relationship, correlated to the parent entity.
+
+    The related entities are joined to an alias of the model matching the parent by its primary key, which works the
+    same way for all kinds of relationships. Documents of a to-many relationship are aggregated to an array in the
+    default ordering (primary key descending), limited by the arguments of the selection.
+    :param parent: alias of the parent entities in the enclosing query
+    :param model: model owning the relationship
+    :param attribute: name of the relationship
+    :param selection: selected fields of the related entities
+    :param projection: whether to load only the needed columns
+    :param dialect: dialect of the database
+    :return: tuple [subquery, whether it is a collection, plan of the related documents]
+    """
+    owner = aliased(model, flat=True)
+    prop = getattr(owner, attribute)
+    related_class = prop.property.mapper.class_
+    related_model = _create_polymorphic_entity(related_class, selection, strategy=LoadingStrategy.JOINED)
+    document, plan = _create_document(related_model, selection, projection, dialect)
+    statement = (
+        select(document.label("document"))
+        .select_from(owner)
+        .join(prop.of_type(related_model))
+        .where(*(getattr(owner, key) == getattr(parent, key) for key in model.get_primary_key()))
+        .correlate(parent)
+    )
+    if not prop.property.uselist:
+        return json_nested(statement.scalar_subquery()), False, plan
+
+    primary_key = [getattr(related_model, k) for k in related_class.get_primary_key()]
+    statement = statement.add_columns(*(c.label(f"key_{i}") for i, c in enumerate(primary_key)))
+    statement = statement.order_by(*(desc(c) for c in primary_key))
+    window = _get_window(prop, getattr(selection, "arguments", None))
+    if window is not None:
+        offset, page_size = window
+        statement = statement.offset(offset).limit(page_size)
+    documents = statement.subquery()
+    # The order of the rows of a subquery is not kept by every aggregate (PostgreSQL)
+    ordering = [desc(documents.c[f"key_{i}"]) for i in range(len(primary_key))]
+    return json_nested(select(json_collection(documents.c.document, *ordering)).scalar_subquery()), True, plan
+
+
 async def create_selection_joins(
     model: Union[Type[IEntityModel], Type[SQLAlchemyModel]],
     path: str,
     selection: Dict[Union[str, Type], Dict],
     selectables: SelectablesType,
     eager_options: Any = None,
+    *,
+    joined: bool = True,
+    projection: bool = True,
+    loaded: Iterable[str] = (),
+    fragment: bool = False,
 ) -> Tuple:
     """
-    Create sqlalchemy joins for loading attributes based on graphql field selections.
+    Create sqlalchemy joins and loader options for loading attributes based on graphql field selections.
 
+    Relationships loaded with the JOINED strategy are joined to the query and populated with contains_eager, other
+    relationships (and everything selected below them) are loaded by sqlalchemy loader options. Columns of every
+    loaded entity are limited to the selected ones, see _create_projection_option.
     :param model: model used for query
     :param path: current path in ordering building
     :param selection: input from graphql field selections
     :param selectables: selectables used for creating ordering expressions
     :param eager_options: sqlalchemy eager options used for recursive calls
+    :param joined: whether the relationships can still be joined to the query
+    :param projection: whether to load only the selected columns
+    :param loaded: names of other attributes of the entities to load (e.g. keyset of cursors)
+    :param fragment: whether the selection is a fragment on a polymorphic sub-entity
     :return: tuple of all sqlalchemy eager options when using select
     """
+    # Attributes of the joined part of the query must use the aliases of the query
+    entity = selectables[path] if joined else model
     eager_options_created = []
+    projection_option = _create_projection_option(
+        entity, selection, selectables, eager_options, projection, loaded, fragment
+    )
+    if projection_option is not None:
+        eager_options_created.append(projection_option)
+    # Selected sub-models which are not joined are loaded by separate queries of their tables
+    selectin_classes = [
+        attr
+        for attr in selection
+        if isclass(attr) and issubclass(attr, SQLAlchemyModel) and not hasattr(entity, attr.__name__)
+    ]
+    if selectin_classes:
+        eager_options_created.append(
+            selectin_polymorphic(entity, selectin_classes)
+            if eager_options is None
+            else eager_options.selectin_polymorphic(selectin_classes)
+        )
     for attr, sub_selection in selection.items():
         if isclass(attr) and issubclass(attr, SQLAlchemyModel):
             sub_path = f"{path}-{attr.__name__}"
-            if not hasattr(model, attr.__name__):
+            if not hasattr(entity, attr.__name__):
                 continue
-            selectables[sub_path] = getattr(model, attr.__name__)
+            selectables[sub_path] = getattr(entity, attr.__name__)
             eager_options_created.extend(
                 await create_selection_joins(
-                    getattr(model, attr.__name__),
+                    getattr(entity, attr.__name__),
                     sub_path,
                     sub_selection,
                     selectables,
                     eager_options,
+                    joined=joined,
+                    projection=projection,
+                    fragment=True,
                 )
             )
         elif isinstance(attr, str):
-            eager_options_created.extend(
-                await _apply_nested(
-                    model,
-                    path,
-                    sub_selection,
-                    create_selection_joins,
-                    attr,
-                    selectables,
-                    eager_options,
+            strategy = get_loading_strategy(model, attr, cast(Selection, sub_selection))
+            if joined and strategy == LoadingStrategy.JOINED:
+                eager_options_created.extend(
+                    await _apply_nested(
+                        model,
+                        path,
+                        sub_selection,
+                        create_selection_joins,
+                        attr,
+                        selectables,
+                        eager_options,
+                        arguments=getattr(sub_selection, "arguments", None),
+                        projection=projection,
+                    )
                 )
-            )
+            else:
+                related_model, option = _create_loader_option(entity, attr, strategy, sub_selection, eager_options)
+                eager_options_created.extend(
+                    await create_selection_joins(
+                        related_model,
+                        f"{path}.{attr}",
+                        sub_selection,
+                        selectables,
+                        option,
+                        joined=False,
+                        projection=projection,
+                    )
+                )
+    eager_options_created = [option for option in eager_options_created if option is not None]
     return tuple(eager_options_created) if eager_options_created else (eager_options,)
 
 
@@ -407,6 +1804,8 @@ async def create_ordering(
     ordering: List[Dict],
     selectables: SelectablesType,
     *_,
+    reverse: bool = False,
+    aggregate: bool = False,
 ) -> List[ColumnElement]:
     """
     Create sqlalchemy expressions for ordering.
@@ -416,6 +1815,8 @@ async def create_ordering(
     :param ordering: input from graphql query
     :param selectables: selectables used for creating ordering expressions
     :param _:
+    :param reverse: create the exact reverse of the ordering, including the placement of nulls
+    :param aggregate: order by the first value of every group (MIN for ascending, MAX for descending ordering)
     :return: list of column expressions, selectables are modified based on needs
     """
     result_ordering = []
@@ -430,7 +1831,12 @@ async def create_ordering(
                     if (isinstance(select_from, AliasedClass) or isinstance(select_from, SQLAlchemyModel))
                     else getattr(select_from.c, attribute)
                 )
-                result_ordering.append(nulls_last(desc(col) if value == OrderingDirection.DESC else col))
+                if aggregate:
+                    col = func.max(col) if value == OrderingDirection.DESC else func.min(col)
+                if reverse:
+                    result_ordering.append(nulls_first(col if value == OrderingDirection.DESC else desc(col)))
+                else:
+                    result_ordering.append(nulls_last(desc(col) if value == OrderingDirection.DESC else col))
             elif isinstance(value, dict) and not any(isinstance(v, OrderingDirection) for v in value.values()):
                 # Enum ordering by values
                 select_from = selectables[path]
@@ -439,12 +1845,22 @@ async def create_ordering(
                     if (isinstance(select_from, AliasedClass) or isinstance(select_from, SQLAlchemyModel))
                     else getattr(select_from.c, attribute)
                 )
-                result_ordering.append(
-                    nulls_last(case(value=col, whens={k: (v if v is not UNSET else 0) for k, v in value.items()}))
-                )
+                case_ = case(value=col, whens={k: (v if v is not UNSET else 0) for k, v in value.items()})
+                if aggregate:
+                    case_ = func.min(case_)
+                result_ordering.append(nulls_first(desc(case_)) if reverse else nulls_last(case_))
             else:
                 result_ordering.extend(
-                    await _apply_nested(model, path, [value], create_ordering, attribute, selectables)
+                    await _apply_nested(
+                        model,
+                        path,
+                        [value],
+                        create_ordering,
+                        attribute,
+                        selectables,
+                        reverse=reverse,
+                        aggregate=aggregate,
+                    )
                 )
     return result_ordering
 
@@ -454,6 +1870,9 @@ FILTER_OPS = {
     "iexact": lambda c, v: ColOps.__eq__(func.lower(c), func.lower(v)),
     "contains": ColOps.contains,
     "icontains": lambda c, v: ColOps.contains(func.lower(c), func.lower(v)),
+    # Prefix patterns keep the predicates sargable, the prefix is escaped when bound
+    "startswith": prefix_match,
+    "istartswith": lambda c, v: ColOps.like(func.lower(c), func.lower(type_coerce(v, LikePrefix())), escape="/"),
     "like": ColOps.like,
     "ilike": ColOps.ilike,
     "gt": ColOps.__gt__,
@@ -497,6 +1916,49 @@ def get_attr(selectables, path, attribute):
     )
 
 
+async def _create_relationship_filter(
+    model: Union[Type[IEntityModel], Type[SQLAlchemyModel]],
+    path: str,
+    attribute: str,
+    filter_: Dict,
+    selectables: SelectablesType,
+) -> ColumnElement:
+    """
+    Create a filter of entities by their related entities as a correlated EXISTS subquery.
+
+    The related entities are not joined to the filtered statement, so filtering does not change the number of rows
+    of the filtered entities. Entities match if any (ANY_, the default), all (ALL_) or none (NONE_) of their related
+    entities match the filter.
+    :param model: model which is used for filtering against
+    :param path: current path in the filter building
+    :param attribute: name of the relationship
+    :param filter_: filter of the related entities
+    :param selectables: selectables used for attribute resolution
+    :return: filtering operation
+    """
+    quantifiers = [quantifier for quantifier in ("ANY_", "ALL_", "NONE_") if filter_.get(quantifier)]
+    if len(quantifiers) > 1:
+        raise Exception("Only one of ANY_, ALL_ and NONE_ can be set in a relationship filter")
+    related_model_raw = model.get_schema_manager().get_model_for_name(
+        strip_defer_typename(model.get_attribute_type(attribute))
+    )
+    # Filters only contain attributes of the related model itself, subclasses are not joined
+    related_model = aliased(related_model_raw)
+    # Related entities are resolved in the scope of the subquery
+    nested_filters = await create_object_filters(related_model_raw, "", [filter_], {"": related_model})
+    criterion = and_(*nested_filters) if nested_filters else None
+
+    prop = get_attr(selectables, path, attribute)
+    relationship = prop.of_type(related_model)
+    exists = relationship.any if prop.property.uselist else relationship.has
+    if quantifiers == ["ALL_"]:
+        # Related entities whose filter evaluates to NULL (e.g. comparisons of NULL values) do not match
+        return not_(exists(or_(not_(criterion), criterion.is_(None)))) if criterion is not None else true()
+    if quantifiers == ["NONE_"]:
+        return not_(exists(criterion))
+    return exists(criterion)
+
+
 async def create_object_filters(
     model: Union[Type[IEntityModel], Type[SQLAlchemyModel]],
     path: str,
@@ -528,93 +1990,410 @@ async def create_object_filters(
                 result_filters.append(or_(*nested_filters))
             elif isinstance(value, dict):
                 if "AND_" in value:
-                    # Nested filter
-                    result_filters.extend(
-                        await _apply_nested(
-                            model,
-                            path,
-                            [value],
-                            create_object_filters,
-                            attribute,
-                            selectables,
-                        )
+                    # Filter of related entities
+                    result_filters.append(
+                        await _create_relationship_filter(model, path, attribute, value, selectables)
                     )
-                    # attr = get_attr(selectables, path, attribute)
-                    # result_filters.append(ColOps.__ne__(attr, None))
                 else:
-                    negate = value.pop("NOT_", False)
+                    negate = value.get("NOT_", False)
                     for operation, filter_value in value.items():
-                        if filter_value is UNSET:
+                        if filter_value is UNSET or operation == "NOT_":
                             continue
+                        elif operation == "search":
+                            search_filter = create_search_filter(model, selectables[path], attribute, filter_value)
+                            result_filters.append(not_(search_filter) if negate else search_filter)
                         else:
                             attr = get_attr(selectables, path, attribute)
                             result_filters.append(create_filter_op(attr, operation, filter_value, negate))
     return result_filters
 
 
+def _parametrize_filter(filter_: Dict, parameters: Dict[str, Any]) -> Tuple[Dict, Hashable]:
+    result = dict(filter_)
+    shape = []
+    for attribute, value in filter_.items():
+        if value is UNSET:
+            continue
+        if attribute in {"AND_", "OR_"}:
+            nested = [_parametrize_filter(f, parameters) for f in value if f is not None]
+            result[attribute] = [f for f, _ in nested]
+            shape.append((attribute, tuple(s for _, s in nested)))
+        elif isinstance(value, dict) and "AND_" in value:
+            result[attribute], nested_shape = _parametrize_filter(value, parameters)
+            shape.append((attribute, nested_shape))
+        elif isinstance(value, dict):
+            scalar_filter = dict(value)
+            scalar_shape = []
+            for operation, filter_value in value.items():
+                if filter_value is UNSET:
+                    continue
+                if operation == "NOT_" or filter_value is None:
+                    scalar_shape.append((operation, filter_value))
+                    continue
+                name = f"filter_{len(parameters)}"
+                parameters[name] = filter_value
+                scalar_filter[operation] = bindparam(name, expanding=isinstance(filter_value, list))
+                scalar_shape.append((operation, isinstance(filter_value, list)))
+            result[attribute] = scalar_filter
+            shape.append((attribute, tuple(scalar_shape)))
+        else:
+            shape.append((attribute, freeze(value)))
+    return result, tuple(shape)
+
+
+def parametrize_filters(filters: List[Dict], parameters: Dict[str, Any]) -> Tuple[List[Dict], Hashable]:
+    """
+    Replace filter values with bound parameters.
+
+    The returned shape only depends on the structure of the filters, so statements built from the
+    parametrized filters can be reused for every input with the same shape.
+    :param filters: filters input
+    :param parameters: dictionary which is filled with the values of the bound parameters
+    :return: tuple [parametrized filters, hashable shape of the filters]
+    """
+    parametrized = [_parametrize_filter(f, parameters) for f in filters if f is not None]
+    return [f for f, _ in parametrized], tuple(s for _, s in parametrized)
+
+
+async def _build_page_keys_statement(
+    model: Type[Union[SQLAlchemyModel, IEntityModel]],
+    filters: List[Dict],
+    ordering: Optional[List[Dict]],
+    offset: bool,
+    keyset: Optional[KeysetType] = None,
+    cursor_shape: Optional[Tuple[bool, Tuple[bool, ...]]] = None,
+) -> Tuple[Select, bool]:
+    """
+    Create a statement selecting the distinct primary keys of one page.
+
+    :param model: model to list
+    :param filters: parametrized filters
+    :param ordering: ordering
+    :param offset: whether to apply the offset parameter
+    :param keyset: keyset of the ordering
+    :param cursor_shape: tuple [before, null values of the cursor] when paging by a cursor
+    :return: tuple [statement, whether any relationships had to be joined]
+    """
+    polymorphic_model = _create_polymorphic_entity(model)
+    primary_key = [getattr(polymorphic_model, key) for key in model.get_primary_key()]
+    selectables: SelectablesType = {"": polymorphic_model, "__selection__": select(*primary_key)}
+
+    filter_expressions = await create_object_filters(model, "", filters, selectables) if filters else []
+    before = cursor_shape is not None and cursor_shape[0]
+    order_by = await create_ordering(model, "", ordering, selectables, reverse=before) if ordering is not None else []
+    if keyset is not None and cursor_shape is not None:
+        columns = [(get_attr(selectables, "", attribute), direction) for attribute, direction in keyset]
+        filter_expressions.append(create_keyset_filter(columns, cursor_shape[1], before))
+
+    joined = any(path not in {"", "__selection__"} for path in selectables)
+    if joined and ordering is not None:
+        # Joined relationships multiply the rows of an entity, the page is selected from groups of rows by primary key
+        order_by = await create_ordering(model, "", ordering, selectables, reverse=before, aggregate=True)
+
+    expression = cast(Select, selectables["__selection__"])
+    if filter_expressions:
+        expression = expression.filter(*filter_expressions)
+    if joined:
+        expression = expression.group_by(*primary_key)
+    expression = expression.order_by(*order_by).limit(bindparam("limit"))
+    if offset:
+        expression = expression.offset(bindparam("offset"))
+    return expression, joined
+
+
+async def _build_list_plan(
+    model: Type[Union[SQLAlchemyModel, IEntityModel]],
+    selection: Dict[str, Dict],
+    filters: List[Dict],
+    ordering: Optional[List[Dict]],
+    limit: bool,
+    offset: bool,
+    keyset: Optional[KeysetType] = None,
+    cursor_shape: Optional[Tuple[bool, Tuple[bool, ...]]] = None,
+    projection: bool = True,
+    raw: bool = False,
+    dialect: Any = None,
+) -> QueryPlan:
+    # Cursors are encoded from the keyset attributes of the loaded entities
+    loaded = [attribute for attribute, _ in keyset] if keyset is not None else []
+    rows: Optional[RowsPlan] = None
+    documents: Optional[DocumentPlan] = None
+    if dialect is not None:
+        # Relationships are aggregated by subqueries, one row (document) is selected for every entity
+        polymorphic_model = _create_polymorphic_entity(model, selection, strategy=LoadingStrategy.JOINED)
+        document, documents = _create_document(polymorphic_model, selection, projection, dialect, loaded)
+        selectables: SelectablesType = {"": polymorphic_model, "__selection__": select(document)}
+        eager_options: Tuple = (None,)
+    elif raw:
+        # Relationships are loaded by separate statements, see _read_rows
+        polymorphic_model = _create_polymorphic_entity(model, selection, strategy=LoadingStrategy.JOINED)
+        rows = _create_rows_plan(polymorphic_model, selection, projection, loaded)
+        selectables = {"": polymorphic_model, "__selection__": select(*rows.columns)}
+        eager_options = (None,)
+    else:
+        polymorphic_model = _create_polymorphic_entity(model, selection)
+        selectables = {"": polymorphic_model, "__selection__": select(polymorphic_model)}
+        eager_options = await create_selection_joins(
+            model, "", selection, selectables, projection=projection, loaded=loaded
+        )
+
+    keys_statement: Optional[Select] = None
+    if limit:
+        keys_statement, joined = await _build_page_keys_statement(
+            model, filters, ordering, offset, keyset, cursor_shape
+        )
+        if not joined and not any(path not in {"", "__selection__"} for path in selectables):
+            # Nothing is joined, the page can be limited directly
+            keys_statement = None
+
+    if keys_statement is not None:
+        primary_key = [getattr(polymorphic_model, key) for key in model.get_primary_key()]
+        page_keys = bindparam("page_keys", expanding=True)
+        filter_expressions = [
+            primary_key[0].in_(page_keys) if len(primary_key) == 1 else tuple_(*primary_key).in_(page_keys)
+        ]
+        order_by = None
+    else:
+        filter_expressions = await create_object_filters(model, "", filters, selectables) if filters else []
+        before = cursor_shape is not None and cursor_shape[0]
+        order_by = (
+            await create_ordering(model, "", ordering, selectables, reverse=before) if ordering is not None else None
+        )
+        if keyset is not None and cursor_shape is not None:
+            columns = [(get_attr(selectables, "", attribute), direction) for attribute, direction in keyset]
+            filter_expressions.append(create_keyset_filter(columns, cursor_shape[1], before))
+
+    # Expression needs to be created after all builders, selectables may have been modified in filters / ordering
+    expression = cast(Type[SQLAlchemyModel], selectables["__selection__"])
+
+    if eager_options != (None,):
+        expression = expression.options(*eager_options)
+
+    if filter_expressions:
+        expression = expression.filter(*filter_expressions)
+
+    if order_by is not None:
+        expression = expression.order_by(*order_by)
+
+    if limit and keys_statement is None:
+        expression = expression.limit(bindparam("limit"))
+        if offset:
+            expression = expression.offset(bindparam("offset"))
+    return QueryPlan(statement=expression, keys_statement=keys_statement, rows=rows, documents=documents)
+
+
+async def _build_count_plan(model: Type[Union[SQLAlchemyModel, IEntityModel]], filters: List[Dict]) -> QueryPlan:
+    polymorphic_model = _create_polymorphic_entity(model)
+    primary_key = [getattr(polymorphic_model, key) for key in model.get_primary_key()]
+    selectables: SelectablesType = {"": polymorphic_model, "__selection__": select(*primary_key).distinct()}
+
+    filter_expressions = await create_object_filters(model, "", filters, selectables) if filters else None
+
+    expression = cast(Select, selectables["__selection__"])
+    if filter_expressions:
+        expression = expression.filter(*filter_expressions)
+    return QueryPlan(statement=select(count()).select_from(expression.subquery()))
+
+
+async def count_(
+    session: AsyncSession,
+    model: Type[Union[SQLAlchemyModel, IEntityModel]],
+    filters: List[Dict],
+    filters_shape: Hashable,
+    parameters: Dict[str, Any],
+    count_mode: CountMode = CountMode.EXACT,
+    plan_cache: Optional[PlanCacheType] = None,
+) -> int:
+    """
+    Count the distinct entities matching filters.
+
+    :param session: sqlalchemy session
+    :param model: which model to count
+    :param filters: parametrized filters
+    :param filters_shape: shape of the parametrized filters
+    :param parameters: values of the bound parameters
+    :param count_mode: how to count the entities
+    :param plan_cache: cache of query plans, plans are rebuilt for every call if not provided
+    :return: number of entities
+    """
+    if count_mode == CountMode.ESTIMATED and not filters:
+        estimate = await estimate_count(session, get_metadata(model).local_table)
+        if estimate is not None:
+            return estimate
+
+    plan_key = (model, "count", filters_shape)
+    plan = plan_cache.get(plan_key) if plan_cache is not None else None
+    if plan is None:
+        plan = await _build_count_plan(model, filters)
+        if plan_cache is not None:
+            plan_cache.set(plan_key, plan)
+    return (await session.execute(plan.statement, parameters)).scalar()
+
+
 async def list_(
     session: AsyncSession,
     model: Type[Union[SQLAlchemyModel, IEntityModel]],
     data: QueryMany,
     selection: Dict[str, Dict],
+    plan_cache: Optional[PlanCacheType] = None,
+    count_mode: Optional[CountMode] = CountMode.EXACT,
+    count_session: Optional[AsyncSession] = None,
+    projection: bool = True,
+    raw: bool = False,
+    aggregate: bool = False,
+    cursors: bool = True,
 ):
     """
     Resolve the query-many operation.
 
+    Pages are selected either by page number (offset) or by a cursor from a previous page (keyset).
+    Keyset pagination seeks directly to the rows after / before the cursor, so it stays fast for deep pages.
+    When relationships are joined, a page of distinct primary keys is selected first and only the entities of the page
+    are then loaded with their relationships.
+    The total results count is computed by a separate query, which runs concurrently with the page query when
+    a count session is provided.
     :param session: sqlalchemy session
     :param model: which model to list
     :param data: graphql input
     :param selection: selected fields
+    :param plan_cache: cache of query plans, plans are rebuilt for every call if not provided
+    :param count_mode: how to count the total results, None skips counting (the totals are returned as 0)
+    :param count_session: separate session for the count query
+    :param projection: load only the selected columns
+    :param raw: build read-only entities from the rows instead of orm instances, see RowsPlan
+    :param aggregate: build read-only entities from JSON documents aggregated by the database, see DocumentPlan
+    :param cursors: encode the cursors of the first and last entity, None is returned for the cursors otherwise
     :return: QueryManyResult
     """
-    polymorphic_model = with_polymorphic(model, "*", aliased=True)
-    model_query = select(polymorphic_model, count().over().label("total_results_count"))  # type: ignore
-    if data is not UNSET and data.page_size is not UNSET and data.page_size:
-        model_query = model_query.limit(data.page_size)
-        if data.page_number is not UNSET and data.page_number:
-            model_query = model_query.offset((data.page_number - 1) * data.page_size)
-    # TODO: implement limit+offset for nested selects
-    selectables: SelectablesType = {"": polymorphic_model, "__selection__": model_query}
-
-    eager_options = await create_selection_joins(model, "", selection, selectables)
-
-    expression = cast(Type[SQLAlchemyModel], selectables["__selection__"])
-
-    if eager_options != (None,):
-        expression = expression.options(*eager_options)
-
-    filters, ordering = None, None
+    parameters: Dict[str, Any] = {}
+    filters: List[Dict] = []
+    filters_shape: Hashable = ()
+    ordering = None
+    keyset: Optional[KeysetType] = None
+    cursor_shape: Optional[Tuple[bool, Tuple[bool, ...]]] = None
+    cursor_values: List[Any] = []
+    page_size = None
     if data is not UNSET:
         if data.filters is not UNSET and data.filters:
-            raw_filter = [dataclasses.asdict(f) for f in data.filters]
-            filters = await create_object_filters(model, "", raw_filter, selectables)
+            filters, filters_shape = parametrize_filters([dataclasses.asdict(f) for f in data.filters], parameters)
 
         if data.ordering is not UNSET and data.ordering:
             raw_ordering = [dataclasses.asdict(o) for o in data.ordering]
-            ordering = add_default_ordering(model, raw_ordering)
-            ordering = cleanup_ordering(ordering)
-            ordering = await create_ordering(model, "", ordering, selectables)
+            ordering = cleanup_ordering(add_default_ordering(model, raw_ordering))
         else:
-            ordering = await create_ordering(model, "", add_default_ordering(model, []), selectables)
-
-        # Expression needs to be created again, selectables may have been modified in filters / ordering builder
-        expression = cast(Type[SQLAlchemyModel], selectables["__selection__"])
-
-        if eager_options != (None,):
-            expression = expression.options(*eager_options)
-
-        if filters:
-            expression = expression.filter(*filters)
-
-        expression = expression.order_by(*ordering)
+            ordering = add_default_ordering(model, [])
+        keyset = get_keyset(ordering)
+
+        after = data.after if data.after is not UNSET else None
+        before = data.before if data.before is not UNSET else None
+        if after is not None and before is not None:
+            raise InvalidCursorError("Only one of after and before can be used")
+        if after is not None or before is not None:
+            if keyset is None:
+                raise InvalidCursorError("Cursors can only be used when ordering by attributes of the listed entity")
+            cursor_values = decode_cursor(keyset, cast(str, after if after is not None else before))
+            cursor_shape = (before is not None, tuple(v is None for v in cursor_values))
+
+        if data.page_size is not UNSET and data.page_size:
+            page_size = data.page_size
+    # The count query does not use the page parameters
+    count_parameters = dict(parameters)
+    if cursor_shape is not None:
+        parameters.update({f"cursor_{i}": v for i, v in enumerate(cursor_values) if v is not None})
+    if page_size is not None:
+        # One extra row tells whether there is another page in the paging direction
+        parameters["limit"] = page_size + 1
+        if cursor_shape is None and data.page_number is not UNSET and data.page_number:
+            parameters["offset"] = (data.page_number - 1) * page_size
+
+    plan_key = (
+        model,
+        "list",
+        freeze(selection),
+        filters_shape,
+        freeze(ordering),
+        "limit" in parameters,
+        "offset" in parameters,
+        cursor_shape,
+        projection,
+        raw,
+        aggregate,
+    )
+    plan = plan_cache.get(plan_key) if plan_cache is not None else None
+    if plan is None:
+        plan = await _build_list_plan(
+            model,
+            selection,
+            filters,
+            ordering,
+            "limit" in parameters,
+            "offset" in parameters,
+            keyset,
+            cursor_shape,
+            projection,
+            raw,
+            session.sync_session.get_bind().dialect if aggregate else None,
+        )
+        if plan_cache is not None:
+            plan_cache.set(plan_key, plan)
+
+    async def get_entities(parameters_: Dict[str, Any]) -> List:
+        if plan.documents is not None:
+            documents = cast(DocumentPlan, plan.documents)
+            entities_ = [documents.read(d) for d in (await session.execute(plan.statement, parameters_)).scalars()]
+            # Filters on relationships may join the same entity many times
+            return list({_get_model_pk_values(model, e): e for e in entities_}.values())
+        if plan.rows is None:
+            entities_ = (await session.execute(plan.statement, parameters_)).unique().scalars().all()
+            _order_collections(entities_, selection)
+            return entities_
+        rows = _get_unique_rows(plan.rows, await session.execute(plan.statement, parameters_))
+        return await _read_rows(session, plan.rows, rows)
+
+    async def get_results() -> Tuple[List, bool]:
+        if plan.keys_statement is None:
+            entities = await get_entities(parameters)
+            return entities[:page_size], page_size is not None and len(entities) > page_size
+        keys = [tuple(row) for row in (await session.execute(plan.keys_statement, parameters)).all()]
+        has_more_ = len(keys) > cast(int, page_size)
+        keys = keys[:page_size]
+        if not keys:
+            return [], has_more_
+        page_keys = [k[0] for k in keys] if len(model.get_primary_key()) == 1 else keys
+        entities = await get_entities({"page_keys": page_keys})
+        positions = {key: position for position, key in enumerate(keys)}
+        return sorted(entities, key=lambda e: positions[_get_model_pk_values(model, e)]), has_more_
+
+    async def get_count(count_session_: AsyncSession):
+        return await count_(
+            count_session_, model, filters, filters_shape, count_parameters, cast(CountMode, count_mode), plan_cache
+        )
 
-    results_task = session.execute(expression)
-    results = (await results_task).unique().all()
-    total_results: int = results[0][1] if len(results) > 0 else 0  # TODO: this returns total rowcount, not object count
+    total_results = 0
+    if count_mode is None:
+        entities, has_more = await get_results()
+    elif count_session is not None:
+        (entities, has_more), total_results = await asyncio.gather(get_results(), get_count(count_session))
+    else:
+        entities, has_more = await get_results()
+        total_results = await get_count(session)
+    page_number = data.page_number if (data is not UNSET and data.page_number) else 1
+
+    if cursor_shape is not None:
+        if cursor_shape[0]:
+            entities.reverse()
+        has_next, has_previous = (True, has_more) if cursor_shape[0] else (has_more, True)
+    else:
+        has_next, has_previous = has_more, page_number > 1
+    has_cursors = cursors and keyset is not None and len(entities) > 0
     return model.get_strawberry_type().query_many_output(
-        results=[r[0] for r in results],
-        page=data.page_number if (data is not UNSET and data.page_number) else 1,
-        total_pages=ceil(total_results / data.page_size) if (data is not UNSET and data.page_size) else 1,
+        results=entities,
+        page=page_number,
+        total_pages=ceil(total_results / page_size) if page_size is not None else 1,
         total_results_count=total_results,
-        results_count=len(results),
+        results_count=len(entities),
+        next_cursor=encode_cursor(cast(KeysetType, keyset), entities[-1]) if has_cursors and has_next else None,
+        previous_cursor=(
+            encode_cursor(cast(KeysetType, keyset), entities[0]) if has_cursors and has_previous else None
+        ),
     )
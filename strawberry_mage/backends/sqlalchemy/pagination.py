@@ -0,0 +1,177 @@
+"""Pagination and result counting for the SQLAlchemy backend."""
+import base64
+import binascii
+import datetime
+import enum
+import json
+import uuid
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, and_, bindparam, false, or_, text, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+
+from strawberry_mage.core.strawberry_types import OrderingDirection
+
+KeysetType = List[Tuple[str, OrderingDirection]]
+
+
+class CountMode(enum.Enum):
+    """How the total results count of query-many operations is computed."""
+
+    EXACT = "exact"
+    # Use table statistics of the database planner for unfiltered queries, filtered queries are counted exactly
+    ESTIMATED = "estimated"
+
+
+_ENCODERS = (
+    (datetime.datetime, "dt", lambda v: v.isoformat()),
+    (datetime.date, "d", lambda v: v.isoformat()),
+    (datetime.time, "t", lambda v: v.isoformat()),
+    (Decimal, "dec", str),
+    (uuid.UUID, "uuid", str),
+    (bytes, "b", lambda v: base64.b64encode(v).decode()),
+)
+
+_DECODERS = {
+    "dt": datetime.datetime.fromisoformat,
+    "d": datetime.date.fromisoformat,
+    "t": datetime.time.fromisoformat,
+    "dec": Decimal,
+    "uuid": uuid.UUID,
+    "b": base64.b64decode,
+}
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor cannot be decoded or does not match the ordering of the query."""
+
+
+def _encode_value(value: Any) -> Any:
+    for type_, tag, encoder in _ENCODERS:
+        if isinstance(value, type_):
+            return {tag: encoder(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        ((tag, encoded),) = value.items()
+        return _DECODERS[tag](encoded)
+    return value
+
+
+def get_keyset(ordering: List[Dict]) -> Optional[KeysetType]:
+    """
+    Get the attributes and directions of a keyset from the ordering of a query.
+
+    :param ordering: cleaned up ordering including the default primary key ordering
+    :return: list of [attribute, direction] or None if the ordering uses relationships or enum values
+    """
+    keyset: KeysetType = []
+    for entry in ordering:
+        for attribute, direction in entry.items():
+            if not isinstance(direction, OrderingDirection):
+                return None
+            if attribute not in (k for k, _ in keyset):
+                keyset.append((attribute, direction))
+    return keyset
+
+
+def encode_cursor(keyset: KeysetType, entity: Any) -> str:
+    """
+    Encode a cursor pointing at an entity.
+
+    :param keyset: keyset of the query
+    :param entity: entity from the results
+    :return: opaque cursor string
+    """
+    payload = [[k for k, _ in keyset], [_encode_value(getattr(entity, k)) for k, _ in keyset]]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(keyset: KeysetType, cursor: str) -> List[Any]:
+    """
+    Decode the values of a cursor.
+
+    :param keyset: keyset of the query
+    :param cursor: cursor from the graphql input
+    :return: values of the keyset attributes
+    """
+    try:
+        keys, values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        values = [_decode_value(v) for v in values]
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+    if keys != [k for k, _ in keyset] or len(values) != len(keyset):
+        raise InvalidCursorError("Cursor does not match the ordering of the query")
+    return values
+
+
+def _follows(column: ColumnElement, direction: OrderingDirection, value: Any, is_null: bool) -> ColumnElement:
+    # Nulls are always ordered last
+    if is_null:
+        return false()
+    comparison = column < value if direction == OrderingDirection.DESC else column > value
+    return or_(comparison, column.is_(None))
+
+
+def _precedes(column: ColumnElement, direction: OrderingDirection, value: Any, is_null: bool) -> ColumnElement:
+    if is_null:
+        return column.isnot(None)
+    return column > value if direction == OrderingDirection.DESC else column < value
+
+
+def create_keyset_filter(
+    columns: Sequence[Tuple[ColumnElement, OrderingDirection]],
+    null_values: Sequence[bool],
+    before: bool,
+) -> ColumnElement:
+    """
+    Create a seek predicate selecting rows after (or before) the cursor row.
+
+    Values of the cursor are bound as parameters named cursor_<index>, only the null values change the statement.
+    :param columns: keyset columns with their ordering directions
+    :param null_values: whether the cursor value of each column is null
+    :param before: select rows preceding the cursor instead of the following ones
+    :return: filter expression
+    """
+    compare = _precedes if before else _follows
+    alternatives = []
+    for index, (column, direction) in enumerate(columns):
+        equal = [
+            c.is_(None) if is_null else c == bindparam(f"cursor_{i}")
+            for i, ((c, _), is_null) in enumerate(zip(columns[:index], null_values))
+        ]
+        alternatives.append(
+            and_(true(), *equal, compare(column, direction, bindparam(f"cursor_{index}"), null_values[index]))
+        )
+    return or_(false(), *alternatives)
+
+
+async def estimate_count(session: AsyncSession, table: Table) -> Optional[int]:
+    """
+    Estimate the number of rows of a table from the statistics of the database planner.
+
+    Supported are PostgreSQL (pg_class.reltuples) and SQLite (sqlite_stat1, filled by ANALYZE).
+    :param session: sqlalchemy session
+    :param table: table to estimate
+    :return: estimated number of rows or None if there are no statistics available
+    """
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        statement = text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)")
+        estimate = (await session.execute(statement, {"table": table.fullname})).scalar()
+        # reltuples is -1 for tables which have never been analyzed
+        return estimate if estimate is not None and estimate >= 0 else None
+    if dialect == "sqlite":
+        has_statistics = (
+            await session.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"))
+        ).scalar()
+        if not has_statistics:
+            return None
+        stat = (await session.execute(text("SELECT stat FROM sqlite_stat1 WHERE tbl = :table"), {"table": table.name}))
+        row = stat.first()
+        return int(row[0].split()[0]) if row is not None else None
+    return None
@@ -0,0 +1,121 @@
+"""Read-only entities built directly from result rows, without ORM instances and the identity map."""
+import dataclasses
+from typing import Any, List, Mapping, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Mapper
+from sqlalchemy.sql import Select
+from strawberry.types import Info
+
+
+class EntityRow:
+    """
+    Base of read-only entities of a model loaded from result rows, see create_row_class.
+
+    Rows report the class of their model (e.g. for isinstance checks and resolution of graphql types), only the loaded
+    attributes are set and attributes are not loaded on access.
+    """
+
+    __slots__ = ()
+    __model__: Type
+
+    @property  # type: ignore
+    def __class__(self) -> Type:  # pylint: disable=invalid-overridden-method
+        """
+        Get the model of the row.
+
+        :return: model class
+        """
+        return self.__model__
+
+    @classmethod
+    async def resolve_relationship(cls, attribute: str, info: Info, parent: Any, *args, **kwargs) -> Any:
+        """
+        Resolve a relationship field of a row by its model.
+
+        :param attribute: name of the relationship
+        :param info: strawberry info
+        :param parent: row to resolve the relationship for
+        :param args: nullable arguments
+        :param kwargs: arguments of the relationship field
+        :return: related row or list of related rows
+        """
+        return await cls.__model__.resolve_relationship(attribute, info, parent, *args, **kwargs)
+
+    def __repr__(self) -> str:
+        """
+        Represent the row by its loaded attributes.
+
+        :return: representation of the row
+        """
+        attributes = ", ".join(f"{key}={getattr(self, key)!r}" for key in self.__slots__ if hasattr(self, key))
+        return f"{self.__model__.__name__}Row({attributes})"
+
+
+def create_row_class(model: Type) -> Type[EntityRow]:
+    """
+    Create a class of read-only rows of a model, with a slot for every mapped attribute.
+
+    :param model: mapped class
+    :return: row class
+    """
+    mapper: Mapper = inspect(model)
+    return type(
+        f"{model.__name__}Row",
+        (EntityRow,),
+        {"__slots__": tuple(prop.key for prop in mapper.attrs), "__model__": model, "__module__": __name__},
+    )
+
+
+@dataclasses.dataclass(frozen=True)
+class RelatedRowsPlan:
+    """Statement loading rows of a selected relationship for primary keys of the parent rows, see RowsPlan."""
+
+    # Model owning the relationship, rows of other (polymorphic) models have no such relationship
+    owner: Type
+    attribute: str
+    uselist: bool
+    # Selects the primary key of the parent followed by the columns of the related rows
+    statement: Select
+    plan: "RowsPlan"
+
+
+@dataclasses.dataclass(frozen=True)
+class RowsPlan:
+    """Columns of the entities of one selection level and how to read them from the result rows."""
+
+    columns: Tuple[Any, ...]
+    # Map of [polymorphic identity, (row class, [attribute name, column position])], keyed by None for plain models
+    attributes: Mapping[Any, Tuple[Type[EntityRow], Tuple[Tuple[str, int], ...]]]
+    # Position of the polymorphic discriminator column
+    discriminator: Optional[int]
+    primary_key: Tuple[int, ...]
+    relationships: Tuple[RelatedRowsPlan, ...] = ()
+
+    def read(self, rows: Sequence[Sequence[Any]], offset: int = 0) -> List[EntityRow]:
+        """
+        Create entities from result rows, without their relationships.
+
+        :param rows: result rows
+        :param offset: position of the first column of the plan in the rows
+        :return: entity for every row
+        """
+        entities = []
+        for row in rows:
+            identity = row[offset + self.discriminator] if self.discriminator is not None else None
+            row_class, attributes = self.attributes.get(identity, self.attributes[None])
+            entity = row_class()
+            for key, position in attributes:
+                setattr(entity, key, row[offset + position])
+            entities.append(entity)
+        return entities
+
+    def get_key(self, row: Sequence[Any], offset: int = 0) -> Tuple:
+        """
+        Get the primary key of the entity of a row.
+
+        :param row: result row
+        :param offset: position of the first column of the plan in the row
+        :return: primary key values
+        """
+        return tuple(row[offset + position] for position in self.primary_key)
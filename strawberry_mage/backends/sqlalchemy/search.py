@@ -0,0 +1,222 @@
+"""Index-friendly matching of string attributes and their full-text search (SQLite FTS5, PostgreSQL text search)."""
+from typing import Any, Type, Union
+
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Column,
+    Integer,
+    String,
+    Table,
+    event,
+    func,
+    literal_column,
+    select,
+    table,
+    type_coerce,
+)
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Mapper
+from sqlalchemy.sql import ColumnElement
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
+
+from strawberry_mage.core.types import IEntityModel
+
+# Text search configuration of PostgreSQL, the same for indexes and queries
+POSTGRESQL_CONFIG = "simple"
+# Statements creating a FTS5 table of a column, formatted with names of the index, table, column and primary key
+_SQLITE_STATEMENTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5({column}, content='{table}', content_rowid='{pk}')",
+    "INSERT INTO {index}({index}) VALUES('rebuild')",
+    "CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {index}(rowid, {column}) VALUES (new.{pk}, new.{column}); END",
+    "CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {index}({index}, rowid, {column}) VALUES ('delete', old.{pk}, old.{column}); END",
+    "CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF {column} ON {table} BEGIN "
+    "INSERT INTO {index}({index}, rowid, {column}) VALUES ('delete', old.{pk}, old.{column}); "
+    "INSERT INTO {index}(rowid, {column}) VALUES (new.{pk}, new.{column}); END",
+)
+
+
+class LikePrefix(TypeDecorator):
+    """Prefix of strings, bound as a LIKE pattern with the prefix escaped by '/'."""
+
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Any:
+        """
+        Convert a prefix to a LIKE pattern.
+
+        :param value: prefix
+        :param dialect: dialect of the database
+        :return: bound value
+        """
+        if value is None:
+            return value
+        return value.replace("/", "//").replace("%", "/%").replace("_", "/_") + "%"
+
+
+class GlobPrefix(TypeDecorator):
+    """Prefix of strings, bound as a GLOB pattern (SQLite) with the wildcards of the prefix in brackets."""
+
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Any:
+        """
+        Convert a prefix to a GLOB pattern.
+
+        :param value: prefix
+        :param dialect: dialect of the database
+        :return: bound value
+        """
+        if value is None:
+            return value
+        return "".join(f"[{c}]" if c in "*?[" else c for c in value) + "*"
+
+
+class SearchQuery(TypeDecorator):
+    """Text of a search, bound as a query of literal terms which must all match (FTS5 query syntax is escaped)."""
+
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Any:
+        """
+        Convert the text of a search for a dialect.
+
+        :param value: text of the search
+        :param dialect: dialect of the database
+        :return: bound value
+        """
+        if value is None or dialect.name != "sqlite":
+            return value
+        return " ".join('"' + term.replace('"', '""') + '"' for term in value.split())
+
+
+class prefix_match(FunctionElement):  # noqa: N801 pylint: disable=invalid-name
+    """
+    Case-sensitive filter of strings starting with a prefix, prefix_match(column, prefix).
+
+    Compiled to a LIKE of the escaped prefix, which is case-insensitive on SQLite, so a GLOB is used there instead.
+    Both keep the predicate sargable.
+    """
+
+    type = Boolean()
+    name = "prefix_match"
+    inherit_cache = True
+
+
+@compiles(prefix_match)
+def _compile_prefix_match(element: prefix_match, compiler: Any, **kw) -> str:
+    column, prefix = element.clauses.clauses
+    return f"({compiler.process(column.like(type_coerce(prefix, LikePrefix()), escape='/'), **kw)})"
+
+
+@compiles(prefix_match, "sqlite")
+def _compile_prefix_match_sqlite(element: prefix_match, compiler: Any, **kw) -> str:
+    column, prefix = element.clauses.clauses
+    return f"({compiler.process(column.op('GLOB')(type_coerce(prefix, GlobPrefix())), **kw)})"
+
+
+class search_match(FunctionElement):  # noqa: N801 pylint: disable=invalid-name
+    """
+    Filter of a searchable column, search_match(column, primary key column of its table, search text, index name).
+
+    Compiled to a MATCH of the FTS5 index on SQLite, to a text search of the expression index on PostgreSQL and to
+    a case-insensitive substring match on other databases.
+    """
+
+    type = Boolean()
+    name = "search_match"
+    inherit_cache = True
+
+
+@compiles(search_match)
+def _compile_search_match(element: search_match, compiler: Any, **kw) -> str:
+    column, _, query, _ = element.clauses.clauses
+    return f"({compiler.process(func.lower(column).contains(func.lower(query)), **kw)})"
+
+
+@compiles(search_match, "sqlite")
+def _compile_search_match_sqlite(element: search_match, compiler: Any, **kw) -> str:
+    _, primary_key, query, index = element.clauses.clauses
+    matching = select(literal_column("rowid")).select_from(table(index.name)).where(index.op("MATCH")(query))
+    return compiler.process(primary_key.in_(matching), **kw)
+
+
+@compiles(search_match, "postgresql")
+def _compile_search_match_postgresql(element: search_match, compiler: Any, **kw) -> str:
+    column, _, query, _ = element.clauses.clauses
+    config = literal_column(f"'{POSTGRESQL_CONFIG}'::regconfig")
+    return compiler.process(func.to_tsvector(config, column).op("@@")(func.plainto_tsquery(config, query)), **kw)
+
+
+def get_search_index_name(column: Column) -> str:
+    """
+    Get name of the search index (FTS5 table or PostgreSQL index) of a column.
+
+    :param column: searchable column
+    :return: name of the index
+    """
+    return f"{column.table.name}_{column.name}_search"
+
+
+def create_search_filter(
+    model: Union[Type[IEntityModel], Any], selectable: Any, attribute: str, value: Any
+) -> ColumnElement:
+    """
+    Create a filter of entities with a searchable attribute matching a search text.
+
+    :param model: model of the attribute
+    :param selectable: model or its alias to filter
+    :param attribute: name of the attribute
+    :param value: search text (or its bound parameter)
+    :return: filter expression
+    """
+    if attribute not in getattr(model, "__search_columns__", ()):
+        raise Exception(f"Attribute {attribute} of {model.__name__} is not searchable")
+    mapper: Mapper = getattr(model, "__mapper__")
+    column = mapper.column_attrs[attribute].columns[0]
+    primary_key = mapper.get_property_by_column(column.table.primary_key.columns[0]).key
+    return search_match(
+        getattr(selectable, attribute),
+        getattr(selectable, primary_key),
+        type_coerce(value, SearchQuery()),
+        literal_column(get_search_index_name(column)),
+    )
+
+
+def setup_search_indexes(mapper: Mapper, model: Type) -> None:
+    """
+    Create search indexes of the searchable columns (__search_columns__) of a model together with its table.
+
+    SQLite indexes are external content FTS5 tables kept in sync with the table by triggers, PostgreSQL indexes are
+    GIN expression indexes. Searchable columns inherited from a parent model are indexed with the parent table.
+    :param mapper: mapper of the model
+    :param model: mapped class
+    """
+    local_table: Table = mapper.local_table
+    for name in vars(model).get("__search_columns__", ()):
+        if name not in local_table.c:
+            continue
+        primary_key = list(local_table.primary_key.columns)
+        if len(primary_key) != 1 or not isinstance(primary_key[0].type, Integer):
+            raise Exception(f"Searchable model {model.__name__} needs a single integer primary key column")
+        index = get_search_index_name(local_table.c[name])
+        values = {"index": index, "table": local_table.name, "column": name, "pk": primary_key[0].name}
+        for statement in _SQLITE_STATEMENTS:
+            event.listen(local_table, "after_create", DDL(statement.format(**values)).execute_if(dialect="sqlite"))
+        event.listen(
+            local_table, "before_drop", DDL(f"DROP TABLE IF EXISTS {index}").execute_if(dialect="sqlite")
+        )
+        event.listen(
+            local_table,
+            "after_create",
+            DDL(
+                f"CREATE INDEX IF NOT EXISTS {index} ON {local_table.name} "
+                f"USING gin (to_tsvector('{POSTGRESQL_CONFIG}'::regconfig, {name}))"
+            ).execute_if(dialect="postgresql"),
+        )
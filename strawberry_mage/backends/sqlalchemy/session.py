@@ -0,0 +1,100 @@
+"""Scoping of SQLAlchemy sessions to graphql requests."""
+import asyncio
+import enum
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Optional
+
+from overrides import overrides
+from sqlalchemy.ext.asyncio import AsyncSession
+from strawberry.extensions import Extension
+
+from strawberry_mage.core.types import GraphQLOperation
+from strawberry_mage.core.utils import get_request_state
+
+# Operations which only read data and can run in parallel with each other
+READ_OPERATIONS = frozenset({GraphQLOperation.QUERY_ONE, GraphQLOperation.QUERY_MANY})
+
+_SESSION_KEY = "sqlalchemy_session"
+_SEMAPHORE_KEY = "sqlalchemy_semaphore"
+
+
+class SessionScope(enum.Enum):
+    """Lifetime of the sessions used to resolve graphql operations."""
+
+    # New session for every root field
+    FIELD = "field"
+    # One session shared by all fields of a graphql request, closed at the end of the request by SessionExtension
+    REQUEST = "request"
+
+
+class RequestSession:
+    """Session shared by all fields of one graphql request, used by one field at a time."""
+
+    def __init__(self, session: AsyncSession):
+        """
+        Wrap a session of a request.
+
+        :param session: session to share
+        """
+        self.session = session
+        self.lock = asyncio.Lock()
+
+
+@asynccontextmanager
+async def scoped_session(
+    session_factory: Callable[[], AsyncSession],
+    context: Any,
+    scope: SessionScope = SessionScope.FIELD,
+    operation: Optional[GraphQLOperation] = None,
+    max_concurrent_reads: int = 0,
+) -> AsyncIterator[AsyncSession]:
+    """
+    Get a session for resolving an operation within a graphql request.
+
+    Without a request context, every call creates a new session.
+    :param session_factory: factory of new sessions
+    :param context: context of the graphql request
+    :param scope: lifetime of the sessions
+    :param operation: resolved operation
+    :param max_concurrent_reads: if positive, read operations use separate sessions (and connections), at most this
+        many of them at once per request
+    :return: session
+    """
+    if context is None:
+        async with session_factory() as session:
+            yield session
+        return
+    state = get_request_state(context)
+
+    if max_concurrent_reads > 0 and operation in READ_OPERATIONS:
+        semaphore = state.get(_SEMAPHORE_KEY)
+        if semaphore is None:
+            semaphore = state[_SEMAPHORE_KEY] = asyncio.Semaphore(max_concurrent_reads)
+        async with semaphore:
+            async with session_factory() as session:
+                yield session
+        return
+
+    if scope == SessionScope.FIELD:
+        async with session_factory() as session:
+            yield session
+        return
+
+    request_session: Optional[RequestSession] = state.get(_SESSION_KEY)
+    if request_session is None:
+        request_session = state[_SESSION_KEY] = RequestSession(session_factory())
+    # A session must not be used concurrently, fields sharing it take turns
+    async with request_session.lock:
+        yield request_session.session
+
+
+class SessionExtension(Extension):
+    """Strawberry extension closing the session shared by the fields of a request."""
+
+    @overrides
+    async def on_request_end(self):
+        request_session: Optional[RequestSession] = get_request_state(self.execution_context.context).pop(
+            _SESSION_KEY, None
+        )
+        if request_session is not None:
+            await request_session.session.close()
@@ -1,19 +1,29 @@
 """A basic data backend with some functionality based on dataclasses."""
 
-from functools import lru_cache
-from typing import Any, Dict, Generic, Iterable, List, Optional, Set, Tuple, Type, TypeVar, Union
+from typing import Any, Dict, Generic, Hashable, Iterable, List, Optional, Sequence, Set, Tuple, Type, TypeVar, Union
 
+from graphql import GraphQLError, GraphQLNamedType, GraphQLResolveInfo, get_named_type
+from graphql.language import (
+    ArgumentNode,
+    FieldNode,
+    FragmentSpreadNode,
+    ListValueNode,
+    ObjectValueNode,
+    SelectionNode,
+    ValueNode,
+    VariableNode,
+)
 from inflection import underscore
 from overrides import overrides
 from strawberry.annotation import StrawberryAnnotation
 from strawberry.schema.types import ConcreteType
 from strawberry.types import Info
-from strawberry.types.nodes import InlineFragment
 
+from strawberry_mage.core.cache import LRUCache
 from strawberry_mage.core.resolvers.base import GeneratedType
 from strawberry_mage.core.type_creator import defer_annotation
-from strawberry_mage.core.types import GraphQLOperation, IDataBackend, IEntityModel
-from strawberry_mage.core.utils import get_subclasses
+from strawberry_mage.core.types import GraphQLOperation, IDataBackend, IEntityModel, ISchemaManager, Selection
+from strawberry_mage.core.utils import freeze, get_subclasses
 
 TEntity = TypeVar("TEntity", bound=IEntityModel)
 
@@ -21,34 +31,178 @@ TEntity = TypeVar("TEntity", bound=IEntityModel)
 class DataBackendBase(Generic[TEntity], IDataBackend[TEntity]):
     """A basic data backend with some functionality based on dataclasses."""
 
-    def _build_selection(self, field, manager, operation, level=0):
-        selection = {}
-        for subfield in field.selections:
-            if level == 0 and operation == GraphQLOperation.QUERY_MANY:
-                return self._build_selection(
-                    [f for f in field.selections if f.name == "results"][0], manager, operation, level + 1
-                )
-            if subfield.selections:
-                if isinstance(subfield, InlineFragment):
-                    model = manager.get_model_for_name(GeneratedType.get_original(subfield.type_condition))
-                    selection[model] = self._build_selection(subfield, manager, operation, level)
+    def __init__(self, metadata_cache_size: Optional[int] = 1024, selection_cache_size: Optional[int] = 1024):
+        """
+        Create a new backend.
+
+        :param metadata_cache_size: maximum number of models with cached annotations, None for unbounded
+        :param selection_cache_size: maximum number of cached selections (and lists of variables they depend on),
+            None for unbounded, 0 disables the cache
+        """
+        self._annotations_cache: LRUCache[Type[TEntity], Dict[str, Type]] = LRUCache(maxsize=metadata_cache_size)
+        self._selection_cache: LRUCache[Hashable, Any] = LRUCache(maxsize=selection_cache_size)
+
+    @property
+    def selection_cache(self) -> LRUCache:
+        """
+        Get the cache of selections translated from graphql documents, see get_selection.
+
+        :return: selection cache
+        """
+        return self._selection_cache
+
+    def get_selection(self, info: Info, manager: ISchemaManager, operation: GraphQLOperation) -> Selection:
+        """
+        Get the selection of the field resolved by an operation.
+
+        Selections are cached by the document, the operation name and the path of the field, together with the values
+        of the variables used by the selected fields. Cached selections are shared, they must not be modified.
+        :param info: strawberry info of the resolved field
+        :param manager: schema manager of the resolved model
+        :param operation: resolved operation
+        :return: selected fields of the resolved entities
+        """
+        raw_info: GraphQLResolveInfo = info._raw_info
+        source = raw_info.operation.loc.source.body if raw_info.operation.loc is not None else None
+        if source is None:
+            return self._build_root_selection(raw_info, manager, operation, set())
+        key = (
+            source,
+            raw_info.operation.name.value if raw_info.operation.name else None,
+            tuple(k for k in raw_info.path.as_list() if isinstance(k, str)),
+            operation,
+        )
+        variable_names = self._selection_cache.get(key)
+        if variable_names is not None:
+            values_key = (key, freeze({name: raw_info.variable_values.get(name) for name in variable_names}))
+            selection = self._selection_cache.get(values_key)
+            if selection is not None:
+                return selection
+
+        variables: Set[str] = set()
+        selection = self._build_root_selection(raw_info, manager, operation, variables)
+        variable_names = tuple(sorted(variables))
+        self._selection_cache.set(key, variable_names)
+        values_key = (key, freeze({name: raw_info.variable_values.get(name) for name in variable_names}))
+        self._selection_cache.set(values_key, selection)
+        return selection
+
+    def _build_root_selection(
+        self, info: GraphQLResolveInfo, manager: ISchemaManager, operation: GraphQLOperation, variables: Set[str]
+    ) -> Selection:
+        """
+        Translate the selection of the resolved field from the document.
+
+        Arguments of the resolved field are the input of the operation and are left out of the selection.
+        :param info: graphql-core info of the resolved field
+        :param manager: schema manager of the resolved model
+        :param operation: resolved operation
+        :param variables: set to add names of the variables used by the selection to
+        :return: selected fields of the resolved entities, fields of results for query-many operations
+        """
+        selection = Selection(directives=_convert_directives(info.field_nodes[0], info.variable_values, variables))
+        nodes = [node for field in info.field_nodes if field.selection_set for node in field.selection_set.selections]
+        self._build_selection(info, nodes, get_named_type(info.return_type), manager, variables, selection)
+        if operation == GraphQLOperation.QUERY_MANY:
+            return selection.get("results", Selection())
+        return selection
+
+    def _build_selection(
+        self,
+        info: GraphQLResolveInfo,
+        nodes: Sequence[SelectionNode],
+        type_: GraphQLNamedType,
+        manager: ISchemaManager,
+        variables: Set[str],
+        selection: Selection,
+    ) -> Selection:
+        """
+        Add fields with sub-selections selected by nodes to a selection.
+
+        Fragments (inline and named) on the type of the selection are merged to it, fragments on other entity types
+        (polymorphic models) are added as selections keyed by their models. Fields are keyed by their names, so a field
+        selected under several aliases must have the same arguments and directives in each of them.
+        :param info: graphql-core info of the resolved field
+        :param nodes: selected nodes
+        :param type_: graphql type of the selection
+        :param manager: schema manager of the resolved model
+        :param variables: set to add names of the variables used by the selection to
+        :param selection: selection to add the fields to
+        :return: the selection
+        """
+        for node in nodes:
+            if isinstance(node, FieldNode):
+                name = underscore(node.name.value)
+                if node.selection_set is None:
+                    selection.fields.add(name)
                     continue
-                selection[underscore(subfield.name)] = self._build_selection(subfield, manager, operation, level + 1)
+                arguments = {
+                    underscore(argument.name.value): _convert_value(argument.value, info.variable_values, variables)
+                    for argument in node.arguments
+                }
+                directives = _convert_directives(node, info.variable_values, variables)
+                field_selection = selection.get(name)
+                if field_selection is None:
+                    field_selection = selection[name] = Selection(arguments=arguments, directives=directives)
+                elif field_selection.arguments != arguments or field_selection.directives != directives:
+                    raise GraphQLError(
+                        f"Field '{node.name.value}' is selected with different arguments or directives, "
+                        "select it only once",
+                        nodes=[node],
+                    )
+                field_type = get_named_type(getattr(type_, "fields")[node.name.value].type)
+                self._build_selection(
+                    info, node.selection_set.selections, field_type, manager, variables, field_selection
+                )
+                continue
+
+            fragment = info.fragments[node.name.value] if isinstance(node, FragmentSpreadNode) else node
+            if fragment.type_condition is None:
+                self._build_selection(info, fragment.selection_set.selections, type_, manager, variables, selection)
+                continue
+            fragment_type = info.schema.get_type(fragment.type_condition.name.value)
+            model = manager.get_model_for_name(GeneratedType.get_original(fragment_type.name))
+            type_model = manager.get_model_for_name(GeneratedType.get_original(type_.name))
+            # Fragments on the type itself or on its parents (interfaces) select fields of every entity
+            if model is None or (type_model is not None and issubclass(type_model, model)):
+                target = selection
+            else:
+                target = selection.setdefault(model, Selection())
+            self._build_selection(info, fragment.selection_set.selections, fragment_type, manager, variables, target)
         return selection
 
+    def _is_selected(self, info: Info, names: Set[str]) -> bool:
+        """
+        Check if any of the fields is selected directly in the resolved field.
+
+        :param info: strawberry info of the resolved field
+        :param names: names of the fields
+        :return: True if selected
+        """
+        raw_info: GraphQLResolveInfo = info._raw_info
+        return any(
+            _is_selected(raw_info, field.selection_set.selections, names)
+            for field in raw_info.field_nodes
+            if field.selection_set
+        )
+
     @overrides
     def get_strawberry_field_type(self, type_: StrawberryAnnotation) -> Union[Type, str]:
         res = defer_annotation(type_)
         return res.annotation if isinstance(res, StrawberryAnnotation) else res
 
-    @lru_cache
     def _get_model_annotations(self, model: Type[TEntity]) -> Dict[str, Type]:
+        cached = self._annotations_cache.get(model)
+        if cached is not None:
+            return cached
         current = model
         annotations = {}
         while hasattr(current, "__annotations__"):
             annotations.update(current.__annotations__)
             current = current.__mro__[1]
-        return {f: self.get_strawberry_field_type(a) for f, a in annotations.items() if not f.startswith("_")}
+        result = {f: self.get_strawberry_field_type(a) for f, a in annotations.items() if not f.startswith("_")}
+        self._annotations_cache.set(model, result)
+        return result
 
     @overrides
     def get_attributes(self, model: Type[TEntity], operation: Optional[GraphQLOperation] = None) -> List[str]:
@@ -107,3 +261,47 @@ class DataBackendBase(Generic[TEntity], IDataBackend[TEntity]):
     @overrides
     def post_setup(self) -> None:
         pass
+
+    @overrides
+    def dispose(self) -> None:
+        self._annotations_cache.clear()
+        self._selection_cache.clear()
+
+
+def _is_selected(info: GraphQLResolveInfo, nodes: Sequence[SelectionNode], names: Set[str]) -> bool:
+    for node in nodes:
+        if isinstance(node, FieldNode):
+            if node.name.value in names:
+                return True
+            continue
+        fragment = info.fragments[node.name.value] if isinstance(node, FragmentSpreadNode) else node
+        if _is_selected(info, fragment.selection_set.selections, names):
+            return True
+    return False
+
+
+def _convert_value(node: ValueNode, variable_values: Dict[str, Any], variables: Set[str]) -> Any:
+    # Same conversion as of strawberry selected fields, literals are not coerced
+    if isinstance(node, VariableNode):
+        variables.add(node.name.value)
+        return variable_values.get(node.name.value)
+    if isinstance(node, ListValueNode):
+        return [_convert_value(value, variable_values, variables) for value in node.values]
+    if isinstance(node, ObjectValueNode):
+        return {
+            field.name.value: _convert_value(field.value, variable_values, variables) for field in node.fields
+        }
+    return getattr(node, "value", None)
+
+
+def _convert_arguments(
+    arguments: Sequence[ArgumentNode], variable_values: Dict[str, Any], variables: Set[str]
+) -> Dict[str, Any]:
+    return {argument.name.value: _convert_value(argument.value, variable_values, variables) for argument in arguments}
+
+
+def _convert_directives(node: FieldNode, variable_values: Dict[str, Any], variables: Set[str]) -> Dict[str, Any]:
+    return {
+        directive.name.value: _convert_arguments(directive.arguments, variable_values, variables)
+        for directive in node.directives
+    }
@@ -0,0 +1,124 @@
+"""Bounded in-memory caches."""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Generic, Hashable, NamedTuple, Optional, TypeVar
+
+TKey = TypeVar("TKey", bound=Hashable)
+TValue = TypeVar("TValue")
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a cache, mirrors functools.lru_cache().cache_info()."""
+
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class LRUCache(Generic[TKey, TValue]):
+    """A least-recently-used cache with an optional size bound and hit/miss counters."""
+
+    def __init__(self, maxsize: Optional[int] = 128):
+        """
+        Create a new cache.
+
+        :param maxsize: maximum number of entries, None for an unbounded cache, 0 disables the cache
+        """
+        self._maxsize = maxsize
+        self._data: "OrderedDict[TKey, TValue]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> Optional[int]:
+        """
+        Get the maximum number of entries.
+
+        :return: maxsize
+        """
+        return self._maxsize
+
+    def get(self, key: TKey, default: Optional[TValue] = None) -> Optional[TValue]:
+        """
+        Get an entry and mark it as recently used.
+
+        :param key: key of the entry
+        :param default: value returned on a miss
+        :return: cached value or default
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: TKey, value: TValue) -> None:
+        """
+        Store an entry, evicting the least recently used ones over the size bound.
+
+        :param key: key of the entry
+        :param value: value to store
+        :return: None
+        """
+        if self._maxsize == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self._maxsize is not None:
+                while len(self._data) > self._maxsize:
+                    self._data.popitem(last=False)
+
+    def pop(self, key: TKey, default: Optional[TValue] = None) -> Optional[TValue]:
+        """
+        Remove an entry.
+
+        :param key: key of the entry
+        :param default: value returned if there is no such entry
+        :return: removed value or default
+        """
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        """
+        Remove all entries and reset the counters.
+
+        :return: None
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Get the cache statistics.
+
+        :return: cache info
+        """
+        return CacheInfo(self.hits, self.misses, self._maxsize, len(self._data))
+
+    def __contains__(self, key: object) -> bool:
+        """
+        Check for an entry without affecting its recency.
+
+        :param key: key of the entry
+        :return: whether the entry is cached
+        """
+        return key in self._data
+
+    def __len__(self) -> int:
+        """
+        Get the number of entries.
+
+        :return: number of entries
+        """
+        return len(self._data)
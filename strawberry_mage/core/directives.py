@@ -0,0 +1,156 @@
+"""Execution of field directives with arguments coerced by graphql-core, so that they can be given by variables."""
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from graphql import GraphQLResolveInfo, get_directive_values
+from overrides import overrides
+from strawberry import Schema
+from strawberry.extensions import directives
+from strawberry.schema.execute import execute, execute_sync
+from strawberry.schema.schema import DEFAULT_ALLOWED_OPERATION_TYPES
+from strawberry.types import ExecutionContext, ExecutionResult
+from strawberry.types.graphql import OperationType
+from strawberry.utils.await_maybe import AwaitableOrValue, await_maybe
+
+
+def _get_directive_calls(info: GraphQLResolveInfo) -> Iterator[Tuple[Callable, Dict[str, Any]]]:
+    # Extensions get the graphql-core info of resolved fields
+    schema = info.schema._strawberry_schema  # type: ignore
+    for node in info.field_nodes[0].directives:
+        name = node.name.value
+        if name in directives.SPECIFIED_DIRECTIVES:
+            continue
+        strawberry_directive = schema.get_directive_by_name(name)
+        assert strawberry_directive is not None, f"Directive {name} not found"
+        arguments = get_directive_values(info.schema.get_directive(name), info.field_nodes[0], info.variable_values)
+        yield strawberry_directive.resolver, arguments or {}
+
+
+class DirectivesExtension(directives.DirectivesExtension):
+    """Strawberry directives extension accepting variables and any input type as arguments of directives."""
+
+    @overrides
+    async def resolve(self, _next, root, info: Any, *args, **kwargs) -> AwaitableOrValue[Any]:
+        result = await await_maybe(_next(root, info, *args, **kwargs))
+        for resolver, arguments in _get_directive_calls(info):
+            result = await await_maybe(resolver(result, **arguments))
+        return result
+
+
+class DirectivesExtensionSync(directives.DirectivesExtensionSync):
+    """Synchronous version of DirectivesExtension."""
+
+    @overrides
+    def resolve(self, _next, root, info: Any, *args, **kwargs) -> AwaitableOrValue[Any]:
+        result = _next(root, info, *args, **kwargs)
+        for resolver, arguments in _get_directive_calls(info):
+            result = resolver(result, **arguments)
+        return result
+
+
+class DirectiveSchema(Schema):
+    """Strawberry schema executing field directives by DirectivesExtension."""
+
+    def _get_extensions(self, sync: bool) -> List[Any]:
+        """
+        Get extensions of an execution.
+
+        :param sync: True for synchronous execution
+        :return: extensions of the schema followed by the directives extension
+        """
+        return [*self.extensions, DirectivesExtensionSync if sync else DirectivesExtension]
+
+    @overrides
+    async def execute(
+        self,
+        query: str,
+        variable_values: Optional[Dict[str, Any]] = None,
+        context_value: Optional[Any] = None,
+        root_value: Optional[Any] = None,
+        operation_name: Optional[str] = None,
+        allowed_operation_types: Optional[Iterable[OperationType]] = None,
+    ) -> ExecutionResult:
+        """
+        Execute a query.
+
+        :param query: text of the query
+        :param variable_values: values of the variables
+        :param context_value: context of the request
+        :param root_value: root value
+        :param operation_name: name of the operation to execute
+        :param allowed_operation_types: allowed types of operations
+        :return: result of the execution
+        """
+        execution_context = ExecutionContext(
+            query=query,
+            schema=self,
+            context=context_value,
+            root_value=root_value,
+            variables=variable_values,
+            provided_operation_name=operation_name,
+        )
+        return await self._execute(execution_context, allowed_operation_types)
+
+    @overrides
+    def execute_sync(
+        self,
+        query: str,
+        variable_values: Optional[Dict[str, Any]] = None,
+        context_value: Optional[Any] = None,
+        root_value: Optional[Any] = None,
+        operation_name: Optional[str] = None,
+        allowed_operation_types: Optional[Iterable[OperationType]] = None,
+    ) -> ExecutionResult:
+        """
+        Execute a query synchronously.
+
+        :param query: text of the query
+        :param variable_values: values of the variables
+        :param context_value: context of the request
+        :param root_value: root value
+        :param operation_name: name of the operation to execute
+        :param allowed_operation_types: allowed types of operations
+        :return: result of the execution
+        """
+        execution_context = ExecutionContext(
+            query=query,
+            schema=self,
+            context=context_value,
+            root_value=root_value,
+            variables=variable_values,
+            provided_operation_name=operation_name,
+        )
+        return self._execute_sync(execution_context, allowed_operation_types)
+
+    async def _execute(
+        self, execution_context: ExecutionContext, allowed_operation_types: Optional[Iterable[OperationType]]
+    ) -> ExecutionResult:
+        result = await execute(
+            self._schema,
+            execution_context.query,
+            extensions=self._get_extensions(False),
+            execution_context_class=self.execution_context_class,
+            execution_context=execution_context,
+            allowed_operation_types=(
+                allowed_operation_types if allowed_operation_types is not None else DEFAULT_ALLOWED_OPERATION_TYPES
+            ),
+        )
+        if result.errors:
+            self.process_errors(result.errors, execution_context=execution_context)
+        return result
+
+    def _execute_sync(
+        self, execution_context: ExecutionContext, allowed_operation_types: Optional[Iterable[OperationType]]
+    ) -> ExecutionResult:
+        result = execute_sync(
+            self._schema,
+            execution_context.query,
+            extensions=self._get_extensions(True),
+            execution_context_class=self.execution_context_class,
+            execution_context=execution_context,
+            allowed_operation_types=(
+                allowed_operation_types if allowed_operation_types is not None else DEFAULT_ALLOWED_OPERATION_TYPES
+            ),
+        )
+        if result.errors:
+            self.process_errors(result.errors, execution_context=execution_context)
+        return result
@@ -12,10 +12,12 @@ from strawberry_mage.core.resolvers.resolvers import (
     resolver_create_one,
     resolver_delete_many,
     resolver_delete_one,
+    resolver_delete_where,
     resolver_query_many,
     resolver_query_one,
     resolver_update_many,
     resolver_update_one,
+    resolver_update_where,
 )
 from strawberry_mage.core.strawberry_types import StrawberryModelType
 from strawberry_mage.core.type_creator import (
@@ -110,6 +112,11 @@ class EntityModel(IEntityModel):
     async def resolve(cls, operation: GraphQLOperation, info: Info, data: Any, *args, **kwargs):
         return await cls.__backend__.resolve(cls, operation, info, data, *args, **kwargs)
 
+    @classmethod
+    @overrides
+    async def resolve_relationship(cls, attribute: str, info: Info, parent: Any, *args, **kwargs) -> Any:
+        return await cls.__backend__.resolve_relationship(cls, attribute, info, parent, *args, **kwargs)
+
     @classmethod
     @overrides
     def pre_setup(cls, manager):
@@ -132,9 +139,18 @@ class EntityModel(IEntityModel):
         cls._strawberry_type.update_many = resolver_update_many(cls)
         cls._strawberry_type.delete_one = resolver_delete_one(cls)
         cls._strawberry_type.delete_many = resolver_delete_many(cls)
+        cls._strawberry_type.update_where = resolver_update_where(cls)
+        cls._strawberry_type.delete_where = resolver_delete_where(cls)
         return cls
 
     @classmethod
     @overrides
     def post_setup(cls) -> None:
         pass
+
+    @classmethod
+    @overrides
+    def dispose(cls) -> None:
+        for attribute in ("_strawberry_type", "_properties", "_manager", "__backend__"):
+            if attribute in vars(cls):
+                delattr(cls, attribute)
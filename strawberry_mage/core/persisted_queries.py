@@ -0,0 +1,272 @@
+"""Persisted queries, graphql documents parsed once and executed by the hashes of their text."""
+import hashlib
+from functools import partial
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple, Type, cast
+
+from graphql import ASTValidationRule, DocumentNode, GraphQLError, GraphQLSchema, parse, validate
+from overrides import overrides
+from strawberry.extensions import Extension
+from strawberry.types import ExecutionContext, ExecutionResult
+from strawberry.types.graphql import OperationType
+
+from strawberry_mage.core.cache import LRUCache
+from strawberry_mage.core.directives import DirectiveSchema
+
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+PERSISTED_QUERY_NOT_ALLOWED = "PersistedQueryNotAllowed"
+PERSISTED_QUERY_HASH_MISMATCH = "provided sha does not match query"
+
+
+def get_query_hash(query: str) -> str:
+    """
+    Get hash of a query, the hex digest of its sha256 (same as used by automatic persisted queries clients).
+
+    :param query: text of the query
+    :return: hash of the query
+    """
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class PersistedQueries:
+    """
+    Store of parsed documents by the hashes of their text, together with the results of their validation.
+
+    Without an allow-list, documents of executed queries are stored automatically and evicted when the least recently
+    used, clients can send only the hash of a query after it was executed once. With an allow-list, only the listed
+    queries can be executed (by their text or hash) and they are never evicted.
+    Documents are validated on every execution with the validation rules of the request (including the rules added
+    by schema extensions), the results are cached by the schema and the rules.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 1024, allow_list: Optional[Iterable[str]] = None):
+        """
+        Create a new store of persisted queries.
+
+        :param maxsize: maximum number of automatically persisted documents, None for unbounded, 0 disables the cache
+        :param allow_list: texts of the only queries allowed to execute
+        """
+        self._cache: LRUCache[str, DocumentNode] = LRUCache(maxsize=maxsize)
+        self._allowed: Optional[Dict[str, str]] = (
+            {get_query_hash(query): query for query in allow_list} if allow_list is not None else None
+        )
+        self._allowed_documents: Dict[str, DocumentNode] = {}
+        self._validations: LRUCache[Hashable, List[GraphQLError]] = LRUCache(
+            maxsize=maxsize if self._allowed is None or maxsize is None else max(maxsize, len(self._allowed))
+        )
+
+    @property
+    def cache(self) -> LRUCache:
+        """
+        Get the cache of automatically persisted documents.
+
+        :return: document cache
+        """
+        return self._cache
+
+    def get_document(
+        self, query: Optional[str], query_hash: Optional[str] = None
+    ) -> Tuple[Optional[DocumentNode], List[GraphQLError]]:
+        """
+        Get the parsed document of a query, see validate.
+
+        :param query: text of the query, may be left out if the query is persisted
+        :param query_hash: hash of the query, computed from its text if not given
+        :return: tuple [document, errors], the document is None if there are errors
+        """
+        if query is not None:
+            text_hash = get_query_hash(query)
+            if query_hash is not None and query_hash != text_hash:
+                return None, [GraphQLError(PERSISTED_QUERY_HASH_MISMATCH)]
+            query_hash = text_hash
+        if query_hash is None:
+            return None, [GraphQLError(PERSISTED_QUERY_NOT_FOUND)]
+
+        if self._allowed is not None:
+            document = self._allowed_documents.get(query_hash)
+            if document is not None:
+                return document, []
+            if query_hash not in self._allowed:
+                return None, [GraphQLError(PERSISTED_QUERY_NOT_ALLOWED)]
+            document, errors = self._parse(self._allowed[query_hash])
+            if document is not None:
+                self._allowed_documents[query_hash] = document
+            return document, errors
+
+        document = self._cache.get(query_hash)
+        if document is not None:
+            return document, []
+        if query is None:
+            return None, [GraphQLError(PERSISTED_QUERY_NOT_FOUND)]
+        document, errors = self._parse(query)
+        if document is not None:
+            self._cache.set(query_hash, document)
+        return document, errors
+
+    def validate(
+        self, schema: GraphQLSchema, document: DocumentNode, rules: Tuple[Type[ASTValidationRule], ...]
+    ) -> List[GraphQLError]:
+        """
+        Validate a persisted document, the result is cached by the schema and the validation rules.
+
+        :param schema: schema to validate the document against
+        :param document: document from get_document
+        :param rules: validation rules of the request
+        :return: validation errors
+        """
+        # Persisted documents are kept by their text, which identifies them
+        key = (schema, document.loc.source.body if document.loc is not None else id(document), rules)
+        errors = self._validations.get(key)
+        if errors is None:
+            errors = validate(schema, document, rules)
+            self._validations.set(key, errors)
+        return errors
+
+    def clear(self) -> None:
+        """Remove all persisted documents, allowed queries are parsed again on their next execution."""
+        self._cache.clear()
+        self._allowed_documents = {}
+        self._validations.clear()
+
+    @staticmethod
+    def _parse(query: str) -> Tuple[Optional[DocumentNode], List[GraphQLError]]:
+        try:
+            return parse(query), []
+        except GraphQLError as error:
+            return None, [error]
+
+
+class _PersistedQueryValidation(Extension):
+    """Validation of persisted documents with the validation rules of the request, cached by the store."""
+
+    def __init__(self, *, execution_context: ExecutionContext, persisted_queries: PersistedQueries):
+        """
+        Create a new extension.
+
+        :param execution_context: execution context of the request
+        :param persisted_queries: store of the executed document
+        """
+        super().__init__(execution_context=execution_context)
+        self._persisted_queries = persisted_queries
+
+    @overrides
+    def on_validation_start(self) -> None:
+        # Rules were added by the other extensions when the request started, setting the errors skips validation
+        execution_context = self.execution_context
+        execution_context.errors = self._persisted_queries.validate(
+            execution_context.schema._schema,
+            cast(DocumentNode, execution_context.graphql_document),
+            execution_context.validation_rules,
+        )
+
+
+class PersistedQuerySchema(DirectiveSchema):
+    """
+    Strawberry schema executing documents from a store of persisted queries.
+
+    Queries are parsed only when they are not persisted yet and validated once per set of validation rules (so the rules
+    added by extensions apply to persisted documents as well). Persisted documents keep the same text,
+    so selections and query plans cached by the data backend for the document are reused as well.
+    """
+
+    def __init__(self, *args, persisted_queries: PersistedQueries, **kwargs):
+        """
+        Create a new schema.
+
+        :param args: arguments of strawberry schema
+        :param persisted_queries: store of persisted queries
+        :param kwargs: keyword arguments of strawberry schema
+        """
+        super().__init__(*args, **kwargs)
+        self.persisted_queries = persisted_queries
+
+    def _create_execution_context(
+        self,
+        query: Optional[str],
+        query_hash: Optional[str],
+        variable_values: Optional[Dict[str, Any]],
+        context_value: Optional[Any],
+        root_value: Optional[Any],
+        operation_name: Optional[str],
+    ) -> Tuple[Optional[ExecutionContext], List[GraphQLError]]:
+        document, errors = self.persisted_queries.get_document(query, query_hash)
+        if document is None:
+            return None, errors
+        return (
+            ExecutionContext(
+                query=document.loc.source.body if document.loc is not None else query,
+                schema=self,
+                context=context_value,
+                root_value=root_value,
+                variables=variable_values,
+                provided_operation_name=operation_name,
+                graphql_document=document,
+            ),
+            [],
+        )
+
+    @overrides
+    def _get_extensions(self, sync: bool) -> List[Any]:
+        validation = partial(_PersistedQueryValidation, persisted_queries=self.persisted_queries)
+        return [*super()._get_extensions(sync), validation]
+
+    @overrides
+    async def execute(
+        self,
+        query: Optional[str],
+        variable_values: Optional[Dict[str, Any]] = None,
+        context_value: Optional[Any] = None,
+        root_value: Optional[Any] = None,
+        operation_name: Optional[str] = None,
+        allowed_operation_types: Optional[Iterable[OperationType]] = None,
+        query_hash: Optional[str] = None,
+    ) -> ExecutionResult:
+        """
+        Execute a query.
+
+        :param query: text of the query, may be left out if the query is persisted
+        :param variable_values: values of the variables
+        :param context_value: context of the request
+        :param root_value: root value
+        :param operation_name: name of the operation to execute
+        :param allowed_operation_types: allowed types of operations
+        :param query_hash: hash of the query, see get_query_hash
+        :return: result of the execution
+        """
+        execution_context, errors = self._create_execution_context(
+            query, query_hash, variable_values, context_value, root_value, operation_name
+        )
+        if execution_context is None:
+            self.process_errors(errors)
+            return ExecutionResult(data=None, errors=errors)
+        return await self._execute(execution_context, allowed_operation_types)
+
+    @overrides
+    def execute_sync(
+        self,
+        query: Optional[str],
+        variable_values: Optional[Dict[str, Any]] = None,
+        context_value: Optional[Any] = None,
+        root_value: Optional[Any] = None,
+        operation_name: Optional[str] = None,
+        allowed_operation_types: Optional[Iterable[OperationType]] = None,
+        query_hash: Optional[str] = None,
+    ) -> ExecutionResult:
+        """
+        Execute a query synchronously.
+
+        :param query: text of the query, may be left out if the query is persisted
+        :param variable_values: values of the variables
+        :param context_value: context of the request
+        :param root_value: root value
+        :param operation_name: name of the operation to execute
+        :param allowed_operation_types: allowed types of operations
+        :param query_hash: hash of the query, see get_query_hash
+        :return: result of the execution
+        """
+        execution_context, errors = self._create_execution_context(
+            query, query_hash, variable_values, context_value, root_value, operation_name
+        )
+        if execution_context is None:
+            self.process_errors(errors)
+            return ExecutionResult(data=None, errors=errors)
+        return self._execute_sync(execution_context, allowed_operation_types)
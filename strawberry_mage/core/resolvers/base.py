@@ -13,6 +13,9 @@ from strawberry_mage.core.types import (
     ModuleBoundStrawberryAnnotation,
 )
 
+NESTED_PAGE_SIZE = 30
+NESTED_OFFSET = 0
+
 
 class GeneratedType(enum.Enum):
     """Type of a generated entity."""
@@ -20,6 +23,7 @@ class GeneratedType(enum.Enum):
     ENTITY = ""
     PRIMARY_KEY_INPUT = "PrimaryKey"
     PRIMARY_KEY_FIELD = "PrimaryKeyField"
+    COLLECTION_UPDATE = "CollectionUpdate"
     QUERY_ONE = "QueryOne"
     QUERY_MANY = "QueryMany"
     QUERY_MANY_INPUT = "QueryManyInput"
@@ -29,6 +33,9 @@ class GeneratedType(enum.Enum):
     UPDATE_MANY = "UpdateMany"
     DELETE_ONE = "DeleteOne"
     DELETE_MANY = "DeleteMany"
+    UPDATE_WHERE_INPUT = "UpdateWhereInput"
+    UPDATE_WHERE_VALUES = "UpdateValues"
+    DELETE_WHERE_INPUT = "DeleteWhereInput"
     INPUTS = "Inputs"
     FILTER = "Filter"
     ORDERING = "Ordering"
@@ -96,17 +103,19 @@ class ModuleBoundStrawberryResolver(StrawberryResolver):
 
 def resolver_nested_select(entity_type: str, field_name: str):
     """
-    Create strawberry field resolver for retrieving one entity.
+    Create strawberry field resolver for a to-many relationship.
 
+    The page_size and offset arguments are applied per parent entity by the data backend when loading the relationship.
     :param entity_type: entity model name to use for the resolver
+    :param field_name: name of the relationship field
     :return: strawberry field resolver
     """
     return_type = List[GeneratedType.ENTITY.get_typename(entity_type)]  # type: ignore
 
     async def nested_select(
-        self, info: Info, page_size: Optional[int] = 30, offset: Optional[int] = 0
+        self, info: Info, page_size: Optional[int] = NESTED_PAGE_SIZE, offset: Optional[int] = NESTED_OFFSET
     ) -> return_type:  # type: ignore
-        return getattr(self, info.python_name)
+        return await type(self).resolve_relationship(field_name, info, self, page_size=page_size, offset=offset)
 
     resolver = ModuleBoundStrawberryResolver(nested_select)
     return StrawberryField(
@@ -114,3 +123,27 @@ def resolver_nested_select(entity_type: str, field_name: str):
         python_name=field_name,
         type_annotation=resolver.type_annotation,
     )
+
+
+def resolver_nested_one(entity_type: str, field_name: str, optional: bool = True):
+    """
+    Create strawberry field resolver for a relationship to one entity.
+
+    :param entity_type: entity model name to use for the resolver
+    :param field_name: name of the relationship field
+    :param optional: whether the relationship is nullable
+    :return: strawberry field resolver
+    """
+    return_type = GeneratedType.ENTITY.get_typename(entity_type)
+    if optional:
+        return_type = Optional[return_type]  # type: ignore
+
+    async def nested_one(self, info: Info) -> return_type:  # type: ignore
+        return await type(self).resolve_relationship(field_name, info, self)
+
+    resolver = ModuleBoundStrawberryResolver(nested_one)
+    return StrawberryField(
+        base_resolver=resolver,
+        python_name=field_name,
+        type_annotation=resolver.type_annotation,
+    )
@@ -7,7 +7,7 @@ from strawberry import UNSET
 from strawberry.types import Info
 
 from strawberry_mage.core.resolvers.base import ModuleBoundStrawberryResolver
-from strawberry_mage.core.strawberry_types import DeleteResult
+from strawberry_mage.core.strawberry_types import DeleteResult, UpdateResult
 from strawberry_mage.core.resolvers.base import GeneratedType
 from strawberry_mage.core.types import (
     GraphQLOperation,
@@ -139,3 +139,33 @@ def resolver_delete_many(model: Type[IEntityModel]):
         return await model.resolve(GraphQLOperation.DELETE_MANY, info, data)
 
     return strawberry.field(ModuleBoundStrawberryResolver(delete_many))
+
+
+def resolver_update_where(model: Type[IEntityModel]):
+    """
+    Create strawberry field resolver for updating all entities matching filters.
+
+    :param model: entity model to use for the resolver
+    :return: strawberry field resolver
+    """
+    data_type = GeneratedType.UPDATE_WHERE_INPUT.get_typename(model.__name__)  # type: ignore
+
+    async def update_where(info: Info, data: data_type) -> UpdateResult:  # type: ignore
+        return await model.resolve(GraphQLOperation.UPDATE_WHERE, info, data)
+
+    return strawberry.field(ModuleBoundStrawberryResolver(update_where))
+
+
+def resolver_delete_where(model: Type[IEntityModel]):
+    """
+    Create strawberry field resolver for deleting all entities matching filters.
+
+    :param model: entity model to use for the resolver
+    :return: strawberry field resolver
+    """
+    data_type = GeneratedType.DELETE_WHERE_INPUT.get_typename(model.__name__)  # type: ignore
+
+    async def delete_where(info: Info, data: data_type) -> DeleteResult:  # type: ignore
+        return await model.resolve(GraphQLOperation.DELETE_WHERE, info, data)
+
+    return strawberry.field(ModuleBoundStrawberryResolver(delete_where))
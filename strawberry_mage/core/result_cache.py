@@ -0,0 +1,149 @@
+"""Caches of resolved query results, invalidated by tags of the data they were read from (e.g. table names)."""
+import abc
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Iterable, Mapping, NamedTuple, Optional
+
+from frozendict import frozendict
+from overrides import overrides
+
+from strawberry_mage.core.cache import CacheInfo, LRUCache
+
+
+class IResultCache(abc.ABC):
+    """
+    Storage of query results tagged by the data they were read from.
+
+    Results are stored together with a snapshot of the versions of their tags taken before they were read. Results
+    whose tags were invalidated since the snapshot are stale, including results which were being read while the data
+    changed. Implementations may share the results between processes.
+    """
+
+    @abc.abstractmethod
+    def snapshot(self, tags: Iterable[str]) -> Any:
+        """
+        Take a snapshot of the versions of tags, before reading a result.
+
+        :param tags: tags of the data the result is read from
+        :return: opaque snapshot passed to set
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a result which is neither expired nor invalidated.
+
+        :param key: key of the result
+        :return: cached result or None
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set(self, key: Hashable, value: Any, snapshot: Any) -> None:
+        """
+        Store a result.
+
+        :param key: key of the result
+        :param value: result
+        :param snapshot: snapshot of the versions of the tags of the result, taken before the result was read
+        :return: None
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def invalidate(self, tags: Iterable[str]) -> None:
+        """
+        Invalidate all results read from data with any of the tags, after the data changed.
+
+        :param tags: tags of the changed data
+        :return: None
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """
+        Remove all results.
+
+        :return: None
+        """
+        raise NotImplementedError
+
+
+class _Entry(NamedTuple):
+    value: Any
+    versions: frozendict
+    expires: Optional[float]
+
+
+class InMemoryResultCache(IResultCache):
+    """Result cache of one process, with least-recently-used eviction over a size bound and expiration of results."""
+
+    def __init__(
+        self, maxsize: Optional[int] = 1024, ttl: Optional[float] = 60.0, clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Create a new cache.
+
+        :param maxsize: maximum number of results, None for unbounded, 0 disables the cache
+        :param ttl: number of seconds after which results expire, None for results which expire only by invalidation
+        :param clock: source of the current time in seconds
+        """
+        self._entries: LRUCache[Hashable, _Entry] = LRUCache(maxsize=maxsize)
+        self._ttl = ttl
+        self._clock = clock
+        self._versions: Dict[str, int] = {}
+        self._lock = Lock()
+
+    @overrides
+    def snapshot(self, tags: Iterable[str]) -> frozendict:
+        with self._lock:
+            return frozendict({tag: self._versions.get(tag, 0) for tag in tags})
+
+    @overrides
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if (entry.expires is not None and entry.expires <= self._clock()) or not self._is_current(entry.versions):
+            self._entries.pop(key)
+            return None
+        return entry.value
+
+    @overrides
+    def set(self, key: Hashable, value: Any, snapshot: Any) -> None:
+        # Results read while their data changed are stale already
+        if self._is_current(snapshot):
+            expires = self._clock() + self._ttl if self._ttl is not None else None
+            self._entries.set(key, _Entry(value, snapshot, expires))
+
+    @overrides
+    def invalidate(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    @overrides
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def info(self) -> CacheInfo:
+        """
+        Get the cache statistics, lookups of stale results are counted as hits.
+
+        :return: cache info
+        """
+        return self._entries.info()
+
+    def _is_current(self, versions: Mapping[str, int]) -> bool:
+        with self._lock:
+            return all(self._versions.get(tag, 0) == version for tag, version in versions.items())
+
+    def __len__(self) -> int:
+        """
+        Get the number of stored results, including the stale ones which were not evicted yet.
+
+        :return: number of results
+        """
+        return len(self._entries)
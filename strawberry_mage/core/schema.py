@@ -1,7 +1,7 @@
 """Manager class for all entity models and for creating strawberry schema."""
 
-from functools import lru_cache
-from typing import Dict, Optional, Type, TypeVar
+import sys
+from typing import Any, Dict, Optional, Type, TypeVar
 
 import strawberry
 from frozendict import frozendict
@@ -11,7 +11,10 @@ from overrides import overrides
 from strawberry import Schema
 from strawberry.schema.types import ConcreteType
 
+from strawberry_mage.core.directives import DirectiveSchema
+from strawberry_mage.core.persisted_queries import PersistedQueries, PersistedQuerySchema
 from strawberry_mage.core.resolvers.base import GeneratedType
+from strawberry_mage.core.strawberry_types import ROOT_NS
 from strawberry_mage.core.types import GraphQLOperation, IDataBackend, IEntityModel, ISchemaManager
 
 TEntity = TypeVar("TEntity", bound=IEntityModel)
@@ -21,6 +24,8 @@ class SchemaManager(ISchemaManager[TEntity]):
     """Manager class for all entity models and for creating strawberry schema."""
 
     _models: Dict[str, Type[IEntityModel]]
+    # Types generated for the models, by their name in the ROOT_NS module
+    _generated_types: Dict[str, Any]
 
     def __init__(self, *models: Type[TEntity], backend: IDataBackend[TEntity]):
         """
@@ -33,9 +38,14 @@ class SchemaManager(ISchemaManager[TEntity]):
             raise IndexError("Need at least one model for the GraphQL schema.")
         self._models = {GeneratedType.ENTITY.get_typename(m.__name__): m for m in models}
         self._backend = backend
+        namespace = vars(sys.modules[ROOT_NS])
+        existing = dict(namespace)
         for model in self._models.values():
             model.__backend__ = self._backend
             model.pre_setup(self)
+        self._generated_types = {
+            name: type_ for name, type_ in namespace.items() if existing.get(name, None) is not type_
+        }
         self._backend.pre_setup(models)
 
     @property
@@ -48,11 +58,13 @@ class SchemaManager(ISchemaManager[TEntity]):
         if operation in model.get_operations():
             name = model.__name__
 
-            if operation.value % 2 == 0:
+            if operation.value % 2 == 0 or operation.name.endswith("_WHERE"):
                 name = pluralize(name)
             name = underscore(name)
             if operation.value > 2:
                 name = operation.name.lower().split("_")[0] + "_" + name
+            if operation.name.endswith("_WHERE"):
+                name = name + "_where"
 
             setattr(
                 type_object,
@@ -69,7 +81,6 @@ class SchemaManager(ISchemaManager[TEntity]):
     def get_model_for_name(self, name: str) -> Optional[Type[IEntityModel]]:
         return self._models.get(name, None)
 
-    @lru_cache
     def _collect_types(self):
         types = []
         for model in self._models.values():
@@ -110,14 +121,30 @@ class SchemaManager(ISchemaManager[TEntity]):
             # Update
             self._add_operation(mutation_object, GraphQLOperation.UPDATE_ONE, model)
             self._add_operation(mutation_object, GraphQLOperation.UPDATE_MANY, model)
+            self._add_operation(mutation_object, GraphQLOperation.UPDATE_WHERE, model)
 
             # Delete
             self._add_operation(mutation_object, GraphQLOperation.DELETE_ONE, model)
             self._add_operation(mutation_object, GraphQLOperation.DELETE_MANY, model)
+            self._add_operation(mutation_object, GraphQLOperation.DELETE_WHERE, model)
         return strawberry.type(mutation_object)
 
     @overrides
-    def get_schema(self, query: Optional[type] = None, mutation: Optional[type] = None) -> Schema:
+    def get_schema(
+        self,
+        query: Optional[type] = None,
+        mutation: Optional[type] = None,
+        persisted_queries: Optional[PersistedQueries] = None,
+    ) -> Schema:
+        """
+        Create a strawberry schema from the managed models.
+
+        :param query: query type, generated from the models if not given
+        :param mutation: mutation type, generated from the models if not given
+        :param persisted_queries: store of persisted queries, if given the schema executes queries by their hashes and
+            parses and validates every query only once, see PersistedQuerySchema
+        :return: Schema
+        """
         for model in self._models.values():
             model.post_setup()
         self._backend.post_setup()
@@ -126,23 +153,50 @@ class SchemaManager(ISchemaManager[TEntity]):
         if not mutation:
             mutation = self.mutation
 
-        schema = Schema(
+        arguments = dict(
             query=query,
             mutation=(mutation if len(mutation.__annotations__) > 0 else None),
             types=self._collect_types(),
+            directives=self._backend.get_schema_directives(),
+            extensions=self._backend.get_schema_extensions(),
+        )
+        schema = (
+            PersistedQuerySchema(**arguments, persisted_queries=persisted_queries)
+            if persisted_queries is not None
+            else DirectiveSchema(**arguments)
         )
 
-        def resolve_interface_type(obj, *_, **__):
+        def get_type_name(class_name: str) -> str:
             if (
                 base_type := schema.schema_converter.type_map.get(
-                    GeneratedType.POLYMORPHIC_BASE.get_typename(obj.__class__.__name__)
+                    GeneratedType.POLYMORPHIC_BASE.get_typename(class_name)
                 )
             ) is not None:
                 return self._backend.get_polymorphic_type(base_type).name
-            return self._backend.get_polymorphic_type(schema.schema_converter.type_map[obj.__class__.__name__]).name
+            return self._backend.get_polymorphic_type(schema.schema_converter.type_map[class_name]).name
+
+        # Names of the graphql types of entities are looked up by their classes
+        type_names = {model: get_type_name(model.__name__) for model in self._models.values()}
+
+        def resolve_interface_type(obj, *_, **__):
+            type_name = type_names.get(obj.__class__)
+            return type_name if type_name is not None else get_type_name(obj.__class__.__name__)
 
         for entry in schema.schema_converter.type_map.values():
             if isinstance(entry, ConcreteType) and isinstance(entry.implementation, GraphQLInterfaceType):
                 setattr(entry.implementation, "resolve_type", resolve_interface_type)
 
         return schema
+
+    @overrides
+    def dispose(self) -> None:
+        namespace = sys.modules[ROOT_NS]
+        for name, type_ in self._generated_types.items():
+            # Types of the same name may have been generated again by another manager
+            if getattr(namespace, name, None) is type_:
+                delattr(namespace, name)
+        self._generated_types = {}
+        self._backend.dispose()
+        for model in self._models.values():
+            model.dispose()
+        self._models = {}
@@ -13,6 +13,8 @@ from strawberry import ID, UNSET
 from strawberry.field import StrawberryField
 
 ROOT_NS = "strawberry_mage.core.types_generated"
+# Suffix of the fields of update inputs which add entities to collections and remove them, see CollectionUpdate
+COLLECTION_CHANGES_SUFFIX = "_changes"
 
 
 @dataclass
@@ -27,6 +29,13 @@ class DeleteResult:
     affected_rows: int
 
 
+@strawberry.type
+class UpdateResult:
+    """Result of the update-where operation."""
+
+    affected_rows: int
+
+
 @strawberry.type
 class QueryManyResult:
     """Result of the query-many operation."""
@@ -36,6 +45,8 @@ class QueryManyResult:
     total_results_count: int
     results_count: int
     results: List[EntityType]
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
 
 
 @dataclass
@@ -50,16 +61,28 @@ class PrimaryKeyField:
     primary_key_: PrimaryKeyInput
 
 
+@dataclass
+class CollectionUpdate:
+    """
+    Changes of a collection of related entities, the entities from remove are removed and the entities from add added.
+
+    Changes are applied after the collection is replaced by the entries of its own field, if given.
+    """
+
+
 @dataclass
 class StrawberryModelInputTypes:
     """Collection of per-entity input types."""
 
     primary_key_input: PrimaryKeyInput
     primary_key_field: PrimaryKeyField
+    collection_update_input: CollectionUpdate
     query_one_input: "QueryOne"
     query_many_input: "QueryMany"
     create_one_input: EntityType
     update_one_input: EntityType
+    update_where_input: "UpdateWhere"
+    delete_where_input: "DeleteWhere"
 
 
 @dataclass
@@ -80,6 +103,8 @@ class StrawberryModelType:
     update_many: Optional[StrawberryField] = field(default=None)
     delete_one: Optional[StrawberryField] = field(default=None)
     delete_many: Optional[StrawberryField] = field(default=None)
+    update_where: Optional[StrawberryField] = field(default=None)
+    delete_where: Optional[StrawberryField] = field(default=None)
 
     @cached_property
     def graphql_input_types(self):
@@ -93,11 +118,18 @@ class StrawberryModelType:
 
 @dataclass
 class ObjectFilter:
-    """Generic filter base for any object."""
+    """
+    Generic filter base for any object.
+
+    Filters of related entities match if any (ANY_, the default), all (ALL_) or none (NONE_) of the related entities
+    match.
+    """
 
     AND_: Optional[List[Optional["ObjectFilter"]]]  # pylint: disable=invalid-name
     OR_: Optional[List[Optional["ObjectFilter"]]]  # pylint: disable=invalid-name
-    ANY_: Optional[bool] = False
+    ANY_: Optional[bool] = False  # pylint: disable=invalid-name
+    ALL_: Optional[bool] = False  # pylint: disable=invalid-name
+    NONE_: Optional[bool] = False  # pylint: disable=invalid-name
 
 
 @dataclass
@@ -158,9 +190,13 @@ class StringFilter(ScalarFilter):
     iexact: Optional[str] = UNSET
     contains: Optional[str] = UNSET
     icontains: Optional[str] = UNSET
+    startswith: Optional[str] = UNSET
+    istartswith: Optional[str] = UNSET
     like: Optional[str] = UNSET
     ilike: Optional[str] = UNSET
     in_: Optional[List[str]] = UNSET
+    # Full-text search of the terms, supported by attributes configured as searchable by the data backend
+    search: Optional[str] = UNSET
 
 
 @strawberry.input
@@ -245,6 +281,25 @@ class QueryMany:
     filters: Optional[List[Optional[ObjectFilter]]] = UNSET
     page_size: Optional[int] = 30
     page_number: Optional[int] = 1
+    after: Optional[str] = UNSET
+    before: Optional[str] = UNSET
+
+
+@strawberry.input
+class UpdateWhere:
+    """Input type for updating all entities matching filters, every entity only if all_entities is set."""
+
+    set: EntityType
+    filters: Optional[List[Optional[ObjectFilter]]] = UNSET
+    all_entities: Optional[bool] = False
+
+
+@strawberry.input
+class DeleteWhere:
+    """Input type for deleting all entities matching filters, every entity only if all_entities is set."""
+
+    filters: Optional[List[Optional[ObjectFilter]]] = UNSET
+    all_entities: Optional[bool] = False
 
 
 SCALAR_FILTERS = {
@@ -14,8 +14,11 @@ from strawberry.schema.types.scalar import DEFAULT_SCALAR_REGISTRY
 from strawberry.type import StrawberryType
 from strawberry.utils.typing import is_list, is_optional
 
-from strawberry_mage.core.resolvers.base import GeneratedType, resolver_nested_select
+from strawberry_mage.core.resolvers.base import GeneratedType, resolver_nested_one, resolver_nested_select
 from strawberry_mage.core.strawberry_types import (
+    COLLECTION_CHANGES_SUFFIX,
+    CollectionUpdate,
+    DeleteWhere,
     EntityType,
     ObjectFilter,
     ObjectOrdering,
@@ -28,6 +31,7 @@ from strawberry_mage.core.strawberry_types import (
     SCALAR_FILTERS,
     ScalarFilter,
     StrawberryModelInputTypes,
+    UpdateWhere,
 )
 from strawberry_mage.core.types import (
     GraphQLOperation,
@@ -184,7 +188,7 @@ def create_entity_type(model: Type[IEntityModel]) -> Tuple[Type[EntityType], Typ
     :param model: class to create entity type for
     :return: entity type
     """
-    attrs = model.get_attribute_types()
+    attrs = dict(model.get_attribute_types())
 
     for name in attrs.keys():
         attr: Union[Type, str] = strip_typename(attrs[name])
@@ -200,6 +204,8 @@ def create_entity_type(model: Type[IEntityModel]) -> Tuple[Type[EntityType], Typ
             or (get_origin(attrs[name] is List))
         ):
             attrs[name] = resolver_nested_select(cast(str, attr), name)
+        elif isinstance(attr, str):
+            attrs[name] = resolver_nested_one(attr, name, is_optional(attrs[name]))
 
     children = model.get_children_class_names()
     parent_name = model.get_parent_class_name()
@@ -234,7 +240,7 @@ def create_entity_type(model: Type[IEntityModel]) -> Tuple[Type[EntityType], Typ
     base_entity.__module__ = ROOT_NS
 
     def is_type_of(other, *_):
-        return other.__class__.__name__ == model.__name__
+        return other.__class__ is model
 
     getattr(base_entity, "_type_definition").is_type_of = is_type_of
 
@@ -255,10 +261,13 @@ def create_input_types(model: Type[IEntityModel]) -> Type:
         {
             "primary_key_input": create_primary_key_input(model),
             "primary_key_field": create_primary_key_field(model),
+            "collection_update_input": create_collection_update_input(model),
             "query_one_input": create_query_one_input(model),
             "query_many_input": create_query_many_input(model),
             "create_one_input": create_create_one_input(model),
             "update_one_input": create_update_one_input(model),
+            "update_where_input": create_update_where_input(model),
+            "delete_where_input": create_delete_where_input(model),
         }
     )
     del fields["__annotations__"]
@@ -374,6 +383,28 @@ def create_primary_key_field(model: Type[IEntityModel]) -> Type:
     return pk_field
 
 
+def create_collection_update_input(model: Type[IEntityModel]) -> type:
+    """
+    Create input type for changing a collection of entities.
+
+    :param model: class of the entities in the collection
+    :return: collection update type
+    """
+    entries = Optional[List[model.__name__]]  # type: ignore
+    collection_update = strawberry.input(
+        type(
+            GeneratedType.COLLECTION_UPDATE.get_typename(model.__name__),
+            (CollectionUpdate,),
+            _create_fields({"add": entries, "remove": entries}, GeneratedType.PRIMARY_KEY_FIELD),
+        )
+    )
+
+    setattr(sys.modules[ROOT_NS], collection_update.__name__, collection_update)
+    collection_update.__module__ = ROOT_NS
+
+    return collection_update
+
+
 def create_query_one_input(model: Type[IEntityModel]) -> type:
     """
     Create input type for retrieving an entity.
@@ -462,8 +493,9 @@ def create_update_one_input(model: Type[IEntityModel]) -> type:
                 {
                     "primary_key_": GeneratedType.PRIMARY_KEY_INPUT.get_typename(model.__name__),
                     **{
-                        f: Optional[model.get_attribute_type(f)]  # type: ignore
+                        field: type_
                         for f in model.get_attributes(GraphQLOperation.UPDATE_ONE)
+                        for field, type_ in get_update_fields(f, model.get_attribute_type(f)).items()
                     },
                 },
                 GeneratedType.PRIMARY_KEY_FIELD,
@@ -477,6 +509,74 @@ def create_update_one_input(model: Type[IEntityModel]) -> type:
     return update_one
 
 
+def create_update_where_input(model: Type[IEntityModel]) -> type:
+    """
+    Create input type for updating all entities matching filters.
+
+    Only attributes and references to one entity can be set, collections are changed by the update-one input.
+    :param model: class to be updated
+    :return: input type
+    """
+    attributes = {f: model.get_attribute_type(f) for f in model.get_attributes(GraphQLOperation.UPDATE_WHERE)}
+    values = strawberry.input(
+        type(
+            GeneratedType.UPDATE_WHERE_VALUES.get_typename(model.__name__),
+            (EntityType,),
+            _create_fields(
+                {f: Optional[type_] for f, type_ in attributes.items() if not _is_collection(type_)},  # type: ignore
+                GeneratedType.PRIMARY_KEY_FIELD,
+            ),
+        )
+    )
+    setattr(sys.modules[ROOT_NS], values.__name__, values)
+    values.__module__ = ROOT_NS
+
+    update_where = strawberry.input(
+        type(
+            GeneratedType.UPDATE_WHERE_INPUT.get_typename(model.__name__),
+            (UpdateWhere,),
+            _create_fields(
+                {
+                    "set": values.__name__,
+                    "filters": Optional[
+                        List[Optional[GeneratedType.FILTER.get_typename(model.__name__)]]  # type: ignore
+                    ],
+                }
+            ),
+        )
+    )
+    setattr(sys.modules[ROOT_NS], update_where.__name__, update_where)
+    update_where.__module__ = ROOT_NS
+
+    return update_where
+
+
+def create_delete_where_input(model: Type[IEntityModel]) -> type:
+    """
+    Create input type for deleting all entities matching filters.
+
+    :param model: class to be deleted
+    :return: input type
+    """
+    delete_where = strawberry.input(
+        type(
+            GeneratedType.DELETE_WHERE_INPUT.get_typename(model.__name__),
+            (DeleteWhere,),
+            _create_fields(
+                {
+                    "filters": Optional[
+                        List[Optional[GeneratedType.FILTER.get_typename(model.__name__)]]  # type: ignore
+                    ],
+                }
+            ),
+        )
+    )
+    setattr(sys.modules[ROOT_NS], delete_where.__name__, delete_where)
+    delete_where.__module__ = ROOT_NS
+
+    return delete_where
+
+
 def create_query_many_output(model: Type[IEntityModel]) -> Type[QueryManyResult]:
     """
     Create query-many output type for listing entities.
@@ -497,6 +597,29 @@ def create_query_many_output(model: Type[IEntityModel]) -> Type[QueryManyResult]
     return cast(Type[QueryManyResult], query_many)
 
 
+def _is_collection(type_: Any) -> bool:
+    inner_type = [a for a in type_.__args__ if a is not NoneType][0] if is_optional(type_) else type_
+    return is_list(inner_type) and isinstance(strip_typename(inner_type), str)
+
+
+def get_update_fields(attribute: str, type_: Any) -> Dict[str, Any]:
+    """
+    Get fields of an attribute in the update input.
+
+    Collections of related entities are replaced by lists of entries, or changed by a collection update input in the
+    field suffixed by COLLECTION_CHANGES_SUFFIX.
+    :param attribute: name of the attribute
+    :param type_: type of the attribute
+    :return: map of [field name, field type]
+    """
+    fields = {attribute: Optional[type_]}  # type: ignore
+    if _is_collection(type_):
+        fields[f"{attribute}{COLLECTION_CHANGES_SUFFIX}"] = Optional[
+            GeneratedType.COLLECTION_UPDATE.get_typename(strip_typename(type_))  # type: ignore
+        ]
+    return fields
+
+
 def get_enum_ordering_type(type_: Type[enum.Enum]):
     """
     Create enum type for ordering.
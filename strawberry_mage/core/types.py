@@ -4,11 +4,26 @@ import abc
 import dataclasses
 import enum
 import sys
-from functools import lru_cache
-from typing import Any, Dict, Generic, Iterable, List, Optional, Protocol, Set, Tuple, Type, TypeVar, Union
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from strawberry import Schema
 from strawberry.annotation import StrawberryAnnotation
+from strawberry.directive import StrawberryDirective
+from strawberry.extensions import Extension
 from strawberry.schema.types import ConcreteType
 from strawberry.types import Info
 
@@ -63,6 +78,30 @@ class IsDataclass(Protocol):
     __dataclass_fields__: Dict
 
 
+class Selection(Dict[Union[str, Type], "Selection"]):
+    """Selected sub-fields of a graphql field, keyed by attribute names or by model classes for inline fragments."""
+
+    def __init__(
+        self,
+        *args,
+        arguments: Optional[Dict[str, Any]] = None,
+        directives: Optional[Dict[str, Dict[str, Any]]] = None,
+        fields: Optional[Set[str]] = None,
+        **kwargs,
+    ):
+        """
+        Create a new selection.
+
+        :param arguments: arguments of the selected field with snake_case names
+        :param directives: map of [directive name, directive arguments] of the selected field
+        :param fields: snake_case names of the selected sub-fields without sub-selections (scalar attributes)
+        """
+        super().__init__(*args, **kwargs)
+        self.arguments: Dict[str, Any] = arguments if arguments is not None else {}
+        self.directives: Dict[str, Dict[str, Any]] = directives if directives is not None else {}
+        self.fields: Set[str] = fields if fields is not None else set()
+
+
 TEntity = TypeVar("TEntity", bound="IEntityModel")
 
 
@@ -77,6 +116,8 @@ class GraphQLOperation(enum.Enum):
     UPDATE_MANY = 6
     DELETE_ONE = 7
     DELETE_MANY = 8
+    UPDATE_WHERE = 9
+    DELETE_WHERE = 10
 
 
 class IDataBackend(abc.ABC, Generic[TEntity]):
@@ -203,6 +244,63 @@ class IDataBackend(abc.ABC, Generic[TEntity]):
         """
         raise NotImplementedError
 
+    def dispose(self) -> None:
+        """
+        Do not call manually.
+
+        Callback when the schema manager is disposed, releases all data cached for its models.
+        :return: None
+        """
+
+    async def resolve_relationship(
+        self, model: Type[TEntity], attribute: str, info: Info, parent: TEntity, *args, **kwargs
+    ) -> Any:
+        """
+        Resolve a relationship field of an entity.
+
+        By default, relationships are expected to be loaded together with the entity by resolve.
+        :param model: entity model owning the relationship
+        :param attribute: name of the relationship
+        :param info: strawberry info
+        :param parent: entity to resolve the relationship for
+        :param args: nullable arguments
+        :param kwargs: arguments of the relationship field (page_size and offset for relationships to many entities)
+        :return: related entity or list of related entities
+        """
+        return getattr(parent, attribute)
+
+    async def load_related(
+        self, model: Type[TEntity], attribute: str, keys: Sequence[Tuple], *args, **kwargs
+    ) -> List[Any]:
+        """
+        Load related entities of many entities at once.
+
+        :param model: entity model owning the relationship
+        :param attribute: name of the relationship
+        :param keys: primary keys of the entities
+        :param args: nullable arguments
+        :param kwargs: arguments of the relationship field (page_size and offset for relationships to many entities),
+            info of the first relationship field of the batch
+        :return: related entity (or list of related entities) for every primary key, in the order of the keys
+        """
+        raise NotImplementedError
+
+    def get_schema_directives(self) -> List[StrawberryDirective]:
+        """
+        Get directives the backend adds to the schema.
+
+        :return: list of strawberry directives
+        """
+        return []
+
+    def get_schema_extensions(self) -> List[Type[Extension]]:
+        """
+        Get strawberry extensions the backend adds to the schema.
+
+        :return: list of strawberry extension classes
+        """
+        return []
+
     @abc.abstractmethod
     def get_polymorphic_type(self, base_type: ConcreteType):
         """
@@ -259,6 +357,16 @@ class ISchemaManager(abc.ABC, Generic[ManagedEntity]):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def dispose(self) -> None:
+        """
+        Tear down the managed models and release the generated types and the data cached for them.
+
+        Schemas created by the manager must not be used afterwards.
+        :return: None
+        """
+        raise NotImplementedError
+
 
 @dataclasses.dataclass
 class IEntityModel(abc.ABC):
@@ -279,7 +387,6 @@ class IEntityModel(abc.ABC):
         raise NotImplementedError
 
     @classmethod
-    @lru_cache
     @abc.abstractmethod
     def get_operations(cls) -> Set[GraphQLOperation]:
         """
@@ -378,6 +485,21 @@ class IEntityModel(abc.ABC):
         """
         raise NotImplementedError
 
+    @classmethod
+    @abc.abstractmethod
+    async def resolve_relationship(cls, attribute: str, info: Info, parent: Any, *args, **kwargs) -> Any:
+        """
+        Resolve a relationship field of an entity.
+
+        :param attribute: name of the relationship
+        :param info: strawberry info
+        :param parent: entity to resolve the relationship for
+        :param args: nullable arguments
+        :param kwargs: arguments of the relationship field
+        :return: related entity or list of related entities
+        """
+        raise NotImplementedError
+
     @classmethod
     @abc.abstractmethod
     def pre_setup(cls, manager: ISchemaManager) -> None:
@@ -399,3 +521,12 @@ class IEntityModel(abc.ABC):
         :return: None
         """
         raise NotImplementedError
+
+    @classmethod
+    def dispose(cls) -> None:
+        """
+        Do not call this manually.
+
+        Called when the SchemaManager of the entity model is disposed, see ISchemaManager.dispose.
+        :return: None
+        """
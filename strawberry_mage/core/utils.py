@@ -1,6 +1,10 @@
 """Utilities :)."""
 
-from typing import Set, Type
+from typing import Any, Dict, Hashable, Set, Type
+
+from frozendict import frozendict
+
+from strawberry_mage.core.types import Selection
 
 
 def get_subclasses(cls: Type) -> Set[Type]:
@@ -11,3 +15,49 @@ def get_subclasses(cls: Type) -> Set[Type]:
     :return: list of subclasses
     """
     return set(cls.__subclasses__()).union([s for c in cls.__subclasses__() for s in get_subclasses(c)])
+
+
+def freeze(value: Any) -> Hashable:
+    """
+    Convert nested dicts, lists and sets to their hashable counterparts.
+
+    :param value: value to convert
+    :return: hashable representation usable as a cache key
+    """
+    if isinstance(value, Selection):
+        return (
+            frozendict({k: freeze(v) for k, v in value.items()}),
+            freeze(value.arguments),
+            freeze(value.directives),
+            frozenset(value.fields),
+        )
+    if isinstance(value, dict):
+        return frozendict({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    return value
+
+
+REQUEST_STATE_KEY = "strawberry_mage"
+
+
+def get_request_state(context: Any) -> Dict[str, Any]:
+    """
+    Get a dictionary for state shared by all resolvers of one graphql request.
+
+    The state is stored in the context of the request, under the REQUEST_STATE_KEY key of a dict context or as an
+    attribute of a context object. Without a context, every call returns a new dictionary.
+    :param context: context of the graphql request (info.context)
+    :return: request state
+    """
+    if context is None:
+        return {}
+    if isinstance(context, dict):
+        return context.setdefault(REQUEST_STATE_KEY, {})
+    state = getattr(context, REQUEST_STATE_KEY, None)
+    if state is None:
+        state = {}
+        setattr(context, REQUEST_STATE_KEY, state)
+    return state
@@ -1,3 +1,4 @@
+from datetime import date, datetime, time
 from pathlib import Path
 
 import pytest
@@ -41,7 +42,7 @@ async def prepare_database(session):
         ]
         session.add_all(weapons)
         await session.flush()
-        king1 = King(name="Vizimir II")
+        king1 = King(name="Vizimir II", crowned_at=datetime(1245, 3, 1, 10, 30, 0, 120000), audience_time=time(9, 15))
         session.add(king1)
         await session.flush()
         king2 = King(name="Radovid V", submits_to=king1, weapons=[weapons[5]])
@@ -68,7 +69,7 @@ async def prepare_database(session):
         session.add_all(entities)
         await session.flush()
         titles = [
-            Title(name="squire", entities=[entities[1], entities[3]]),
+            Title(name="squire", entities=[entities[1], entities[3]], granted_on=date(1262, 5, 12)),
             Title(name="personal guard", entities=[entities[3]]),
         ]
         session.add_all(titles)
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, Enum, Float, ForeignKey, Integer, String, Table
+from sqlalchemy import Column, Date, DateTime, Enum, Float, ForeignKey, Integer, String, Table, Time
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import relationship
 
@@ -21,10 +21,13 @@ entity_title_m2m = Table(
 
 class Title(Base):
     name = Column(String, primary_key=True)
+    granted_on = Column(Date)
     entities = relationship("Entity", secondary=entity_title_m2m, back_populates="titles")
 
 
 class Weapon(Base):
+    __search_columns__ = ("name",)
+
     id = Column(Integer, primary_key=True)
     owner_id, owner = make_fk("Entity", back_populates="weapons")
     damage = Column(Integer, nullable=False)
@@ -81,6 +84,8 @@ class Archer(Entity):
 class King(Entity):
     id = Column(Integer, ForeignKey("entity.id"), primary_key=True)
     name = Column(String)
+    crowned_at = Column(DateTime)
+    audience_time = Column(Time)
     subjects = relationship("Entity", back_populates="submits_to", foreign_keys="Entity.submits_to_id")
 
     __mapper_args__ = {
@@ -96,7 +101,9 @@ class CompositeKeyEntity(Base):
 
 
 engine = create_async_engine("sqlite+aiosqlite:///", echo=False, future=True)
-schema = SchemaManager(House, Weapon, Entity, Mage, Archer, King, Title, backend=SQLAlchemyBackend(engine)).get_schema()
+backend = SQLAlchemyBackend(engine)
+manager = SchemaManager(House, Weapon, Entity, Mage, Archer, King, Title, backend=backend)
+schema = manager.get_schema()
 
 if __name__ == "__main__":
     Base.metadata.create_all(bind=engine)
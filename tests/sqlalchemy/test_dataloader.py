@@ -0,0 +1,82 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from strawberry import Schema
+
+from strawberry_mage.backends.dataloader import DataLoaderBackend
+from strawberry_mage.core.schema import SchemaManager
+from strawberry_mage.core.strawberry_types import ROOT_NS
+from tests.sqlalchemy.example_app.schema import Archer, Entity, House, King, Mage, Title, Weapon, backend
+from tests.sqlalchemy.test_loading import count_statements
+
+
+@pytest.fixture
+def dataloader_schema():
+    # The models are set up again by the new schema manager, the example schema is restored afterwards
+    models = (House, Weapon, Entity, Mage, Archer, King, Title)
+    attributes = ("_strawberry_type", "_properties", "_manager", "__backend__")
+    saved = [{a: vars(m)[a] for a in attributes if a in vars(m)} for m in models]
+    namespace = dict(vars(sys.modules[ROOT_NS]))
+    try:
+        yield SchemaManager(*models, backend=DataLoaderBackend(backend)).get_schema()
+    finally:
+        for model, values in zip(models, saved):
+            for attribute, value in values.items():
+                setattr(model, attribute, value)
+        vars(sys.modules[ROOT_NS]).update(namespace)
+
+
+@pytest.mark.asyncio
+async def test_dataloader_batches_relationships(session):
+    dataloader_backend = DataLoaderBackend(backend)
+    info = SimpleNamespace(context={})
+    kings = (await session.execute(select(King).options(selectinload(King.subjects)))).scalars().all()
+    entities = (
+        (await session.execute(select(Entity).options(selectinload(Entity.submits_to), selectinload(Entity.titles))))
+        .scalars()
+        .all()
+    )
+
+    with count_statements() as statements:
+        subjects = await asyncio.gather(
+            *(dataloader_backend.resolve_relationship(King, "subjects", info, king) for king in kings)
+        )
+    assert len(statements) == 1
+    assert [sorted(s.id for s in s_) for s_ in subjects] == [sorted(s.id for s in king.subjects) for king in kings]
+
+    with count_statements() as statements:
+        lords = await asyncio.gather(
+            *(dataloader_backend.resolve_relationship(Entity, "submits_to", info, e) for e in entities)
+        )
+    assert len(statements) == 1
+    assert [lord.id if lord else None for lord in lords] == [e.submits_to_id for e in entities]
+
+    with count_statements() as statements:
+        titles = await asyncio.gather(
+            *(dataloader_backend.resolve_relationship(Entity, "titles", info, e, page_size=1) for e in entities)
+        )
+    assert len(statements) == 1
+    assert [[t.name for t in t_] for t_ in titles] == [
+        sorted((t.name for t in e.titles), reverse=True)[:1] for e in entities
+    ]
+
+
+@pytest.mark.asyncio
+async def test_dataloader_schema(schema: Schema, dataloader_schema: Schema, operations):
+    expected = await schema.execute(operations, operation_name="nestedSelectQuery")
+    with count_statements() as statements:
+        result = await dataloader_schema.execute(operations, operation_name="nestedSelectQuery", context_value={})
+
+    assert result.errors is None
+    assert result.data == expected.data
+    # One query of the archers, then one IN query per relationship level: titles, submitsTo, weapons and the subjects
+    # of submitsTo
+    (archers, *relationships) = statements
+    assert " IN " not in archers
+    assert len(relationships) == 4
+    assert all("WHERE anon_1.archer_id IN (?, ?, ?)" in s for s in relationships[:3])
+    assert "WHERE anon_1.king_id IN (?, ?)" in relationships[3]
@@ -0,0 +1,192 @@
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from types import SimpleNamespace
+from uuid import UUID
+
+import pytest
+from sqlalchemy import Date, DateTime, Interval, Time, column, desc, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from strawberry import Schema
+
+from strawberry_mage.backends.sqlalchemy.documents import get_converter, json_collection
+from strawberry_mage.backends.sqlalchemy.operations import retrieve_
+from strawberry_mage.backends.sqlalchemy.rows import EntityRow
+from strawberry_mage.core.types import Selection
+from tests.sqlalchemy.example_app.schema import Archer, Weapon, backend, engine
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *_):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.asyncio
+async def test_loading_strategies(schema: Schema, operations):
+    with count_statements() as default_statements:
+        default_result = await schema.execute(operations, operation_name="defaultLoadingQuery")
+    with count_statements() as joined_statements:
+        joined_result = await schema.execute(operations, operation_name="joinedLoadingQuery")
+
+    assert default_result.errors is None
+    assert joined_result.errors is None
+
+    # Collections are loaded by separate IN queries by default
+    assert len(default_statements) == 3
+    assert "JOIN weapon" not in default_statements[0]
+    assert len(joined_statements) == 1
+    assert "JOIN weapon" in joined_statements[0]
+
+    def normalize(data):
+        return sorted(
+            (
+                a["id"],
+                sorted(w["id"] for w in a["weapons"]),
+                sorted(t["name"] for t in a["titles"]),
+            )
+            for a in data["archers"]["results"]
+        )
+
+    assert normalize(default_result.data) == normalize(joined_result.data)
+
+
+@pytest.mark.asyncio
+async def test_loading_directive_variable(schema: Schema, operations):
+    results = {}
+    for strategy in ("JOINED", "SELECTIN"):
+        with count_statements() as statements:
+            result = await schema.execute(
+                operations, operation_name="variableLoadingQuery", variable_values={"strategy": strategy}
+            )
+        assert result.errors is None
+        archers = result.data["archers"]["results"]
+        results[strategy] = (statements, sorted((a["id"], sorted(w["id"] for w in a["weapons"])) for a in archers))
+
+    assert len(results["JOINED"][0]) == 1
+    assert "JOIN weapon" in results["JOINED"][0][0]
+    assert len(results["SELECTIN"][0]) == 2
+    assert results["JOINED"][1] == results["SELECTIN"][1]
+
+
+@pytest.mark.asyncio
+async def test_column_projection(schema: Schema, operations):
+    with count_statements() as statements:
+        result = await schema.execute(operations, operation_name="defaultLoadingQuery")
+
+    assert result.errors is None
+    assert len(statements) == 3
+    # Only the selected columns and the keys are loaded
+    weapon_statement = next(s for s in statements if "FROM weapon" in s)
+    assert "_1.id" in weapon_statement
+    assert ".owner_id" in weapon_statement
+    assert ".damage" not in weapon_statement
+    assert ".name" not in weapon_statement
+
+
+@pytest.mark.asyncio
+async def test_deferred_columns(session: AsyncSession, monkeypatch):
+    monkeypatch.setattr(Weapon, "__deferred_columns__", ("name",))
+    data = SimpleNamespace(primary_key_=SimpleNamespace(id=1))
+
+    with count_statements() as statements:
+        weapon = await retrieve_(session, Weapon, data, Selection(fields={"id", "damage"}), projection=False)
+        assert weapon.damage == 10
+        await retrieve_(session, Weapon, data, Selection(fields={"id", "name"}), projection=False)
+
+    assert ".name" not in statements[0]
+    assert ".damage" in statements[0]
+    assert ".name" in statements[1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "operation_name",
+    ["fragmentQuery", "defaultLoadingQuery", "nestedPaginationQuery", "dashboardQuery", "datesQuery"],
+)
+async def test_raw_rows(schema: Schema, operations, monkeypatch, operation_name):
+    orm_result = await schema.execute(operations, operation_name=operation_name)
+    monkeypatch.setattr(backend, "_raw_rows", True)
+    raw_result = await schema.execute(operations, operation_name=operation_name)
+
+    assert orm_result.errors is None
+    assert raw_result.errors is None
+    # Collections are ordered by the primary key (descending) in both paths
+    assert raw_result.data == orm_result.data
+
+
+@pytest.mark.asyncio
+async def test_raw_rows_retrieve(session: AsyncSession):
+    data = SimpleNamespace(primary_key_=SimpleNamespace(id=2))
+    selection = Selection(fields={"id", "name"})
+    selection["owner"] = Selection(fields={"id"})
+    selection["owner"][Archer] = Selection(fields={"draw_strength"})
+
+    with count_statements() as statements:
+        weapon = await retrieve_(session, Weapon, data, selection, raw=True)
+
+    # Rows are not orm instances, but they report their models
+    assert isinstance(weapon, EntityRow) and isinstance(weapon, Weapon)
+    assert weapon.name == "bow"
+    assert isinstance(weapon.owner, Archer) and weapon.owner.draw_strength == 30
+    assert len(statements) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "operation_name",
+    ["fragmentQuery", "defaultLoadingQuery", "nestedPaginationQuery", "dashboardQuery", "datesQuery"],
+)
+async def test_json_aggregation(schema: Schema, operations, monkeypatch, operation_name):
+    orm_result = await schema.execute(operations, operation_name=operation_name)
+    monkeypatch.setattr(backend, "_json_aggregation", True)
+    with count_statements() as statements:
+        json_result = await schema.execute(operations, operation_name=operation_name)
+
+    assert orm_result.errors is None
+    assert json_result.errors is None
+    # Relationships are aggregated by the statement of the root field
+    assert len(statements) == len(json_result.data)
+    assert json_result.data == orm_result.data
+
+
+def test_json_collection_ordering():
+    collection = json_collection(column("document"), desc(column("key_0")))
+
+    # PostgreSQL does not keep the order of the aggregated rows, SQLite does
+    assert str(collection.compile(dialect=postgresql.dialect())) == (
+        "coalesce(json_agg(document ORDER BY key_0 DESC), '[]'::json)"
+    )
+    assert str(collection.compile(dialect=sqlite.dialect())) == "json_group_array(json(document))"
+
+
+def test_json_converters():
+    dialect = postgresql.asyncpg.dialect()
+
+    # PostgreSQL renders values of native types in ISO format with fractions of any length, and intervals in its style
+    assert get_converter(DateTime(), dialect)("2020-01-01T10:00:00.12") == datetime(2020, 1, 1, 10, 0, 0, 120000)
+    assert get_converter(DateTime(timezone=True), dialect)("2020-01-01T10:00:00.1234567+02:00") == datetime(
+        2020, 1, 1, 8, 0, 0, 123456, tzinfo=timezone.utc
+    )
+    assert get_converter(Time(), dialect)("10:00:00.5") == time(10, 0, 0, 500000)
+    assert get_converter(Date(), dialect)("2020-01-01") == date(2020, 1, 1)
+    assert get_converter(Interval(), dialect)("1 year 2 mons 3 days 04:05:06.5") == timedelta(
+        days=428, hours=4, minutes=5, seconds=6.5
+    )
+    assert get_converter(Interval(), dialect)("-1 days -02:00:00") == timedelta(days=-1, hours=-2)
+    uuid = "12345678-1234-5678-1234-567812345678"
+    assert get_converter(postgresql.UUID(as_uuid=True), dialect)(uuid) == UUID(uuid)
+    assert get_converter(postgresql.UUID(), dialect) is None
+
+    # SQLite stores them as text read by the column types, intervals as datetimes since the epoch
+    dialect = sqlite.aiosqlite.dialect()
+    assert get_converter(DateTime(), dialect)("2020-01-01 10:00:00.120000") == datetime(2020, 1, 1, 10, 0, 0, 120000)
+    assert get_converter(Interval(), dialect)("1970-01-02 02:00:00.000000") == timedelta(days=1, hours=2)
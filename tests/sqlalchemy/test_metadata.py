@@ -0,0 +1,56 @@
+import sys
+
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from strawberry_mage.backends.sqlalchemy import metadata as metadata_module
+from strawberry_mage.backends.sqlalchemy.backend import SQLAlchemyBackend
+from strawberry_mage.backends.sqlalchemy.models import create_base_entity
+from strawberry_mage.core.schema import SchemaManager
+from strawberry_mage.core.strawberry_types import ROOT_NS
+from strawberry_mage.core.types import GraphQLOperation
+from tests.sqlalchemy.example_app.schema import Archer, Entity, Title, Weapon, backend
+
+
+def test_metadata_registry(monkeypatch):
+    def inspect(*_):
+        raise AssertionError("Mappers of set up models are not inspected")
+
+    monkeypatch.setattr(metadata_module, "inspect", inspect)
+
+    assert Weapon.get_primary_key() == ("id",)
+    assert Title.get_primary_key() == ("name",)
+    assert "owner_id" not in Weapon.get_attributes()
+    assert Archer.get_attributes(GraphQLOperation.UPDATE_ONE) == backend.get_attributes(
+        Archer, GraphQLOperation.CREATE_ONE
+    )
+    assert "entity_class" not in Archer.get_attributes(GraphQLOperation.CREATE_ONE)
+    assert Archer.get_attributes(GraphQLOperation.DELETE_ONE) == []
+    assert Archer.get_parent_class_name() == "Entity"
+    assert Entity.get_children_class_names() == {"Entity", "Archer", "Mage", "King"}
+    assert backend.get_metadata(Entity).relationships["weapons"].uselist
+    # Subclasses do not share the metadata of their parent
+    assert backend.get_metadata(Archer).local_table.name == "archer"
+
+
+def test_dispose_schema():
+    base = create_base_entity()
+
+    class Tenant(base):
+        id = Column(Integer, primary_key=True)
+        name = Column(String)
+
+    tenant_backend = SQLAlchemyBackend(create_async_engine("sqlite+aiosqlite:///"), selection_cache_size=16)
+    assert tenant_backend.selection_cache.maxsize == 16
+    manager = SchemaManager(Tenant, backend=tenant_backend)
+    schema = manager.get_schema()
+    namespace = sys.modules[ROOT_NS]
+    assert hasattr(namespace, "TenantFilter") and "updateTenantsWhere" in str(schema)
+
+    manager.dispose()
+
+    assert not hasattr(namespace, "TenantFilter")
+    assert "_strawberry_type" not in vars(Tenant) and "__mapper_metadata__" not in vars(Tenant)
+    assert len(tenant_backend.plan_cache) == 0
+    # Types of other schemas are kept
+    assert hasattr(namespace, "WeaponFilter")
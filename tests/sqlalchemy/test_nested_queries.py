@@ -1,9 +1,11 @@
 import pytest
-from sqlalchemy import desc, select
-from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy import desc, select, update
+from sqlalchemy.orm import aliased, joinedload, selectinload
 from strawberry import Schema
 
-from tests.sqlalchemy.example_app.schema import Archer, Entity, King, Weapon
+from strawberry_mage.backends.sqlalchemy.loading import LoadingStrategy
+from tests.sqlalchemy.example_app.schema import Archer, Entity, King, Title, Weapon, backend
+from tests.sqlalchemy.test_loading import count_statements
 
 
 # @pytest.mark.asyncio
@@ -38,7 +40,8 @@ async def test_nested_select(schema: Schema, operations, session):
         .all()
     )
     assert len(data) == len(archers)
-    assert any((a["titles"][0].get("name")) == "personal guard" for a in data if a["titles"])
+    # Collections are ordered by the primary key descending
+    assert any([t["name"] for t in a["titles"]] == ["squire", "personal guard"] for a in data)
     for archer in archers:
         (selected,) = [a for a in data if a["id"] == archer.id]
         if archer.submits_to:
@@ -48,13 +51,15 @@ async def test_nested_select(schema: Schema, operations, session):
                     sorted(
                         [{"id": s.id} for s in archer.submits_to.subjects],
                         key=lambda s: s["id"],
+                        reverse=True,
                     )
                     == selected["submitsTo"]["subjects"]
                 )
         else:
             assert selected.get("submitsTo") == archer.submits_to
         if archer.weapons:
-            assert [{"damage": w.damage, "id": w.id} for w in archer.weapons] == selected["weapons"]
+            weapons = sorted(archer.weapons, key=lambda w: w.id, reverse=True)
+            assert [{"damage": w.damage, "id": w.id} for w in weapons] == selected["weapons"]
         else:
             assert selected.get("weapons") == archer.weapons
 
@@ -87,6 +92,41 @@ async def test_nested_filter(schema: Schema, operations, session):
     assert sorted([a.id for a in archers]) == [r["id"] for r in data]
 
 
+@pytest.mark.asyncio
+async def test_relationship_quantifiers(schema: Schema, operations, session):
+    # The only weapon of king 2 has no name
+    await session.execute(update(Weapon).where(Weapon.owner_id == 2).values(name=None))
+    await session.commit()
+    for min_id in (4, 10):
+        with count_statements() as statements:
+            result = await schema.execute(
+                operations, operation_name="relationshipQuantifiers", variable_values={"minId": min_id}
+            )
+
+        assert result.errors is None
+        # Related entities are filtered by EXISTS subqueries, not joined
+        assert all("EXISTS" in statement for statement in statements)
+        assert not any("LEFT OUTER JOIN" in statement for statement in statements)
+
+        async def ids(statement):
+            return sorted((await session.execute(statement)).scalars().all(), reverse=True)
+
+        matching = Entity.id >= min_id
+        any_ids = await ids(select(King.id).where(King.subjects.any(matching)))
+        assert result.data["any"]["totalResultsCount"] == len(any_ids)
+        assert [k["id"] for k in result.data["any"]["results"]] == any_ids[:1]
+        assert [k["id"] for k in result.data["all"]["results"]] == await ids(
+            select(King.id).where(~King.subjects.any(~matching))
+        )
+        assert [k["id"] for k in result.data["none"]["results"]] == await ids(
+            select(King.id).where(~King.subjects.any(matching))
+        )
+        titles = (await session.execute(select(Title.name).where(~Title.entities.any(~matching)))).scalars().all()
+        assert sorted(t["name"] for t in result.data["titles"]["results"]) == sorted(titles)
+        # Weapons without a name match no name filter, king 1 has no weapons
+        assert [k["id"] for k in result.data["named"]["results"]] == [1]
+
+
 @pytest.mark.asyncio
 async def test_nested_ordering(schema: Schema, operations, session):
     result = await schema.execute(operations, operation_name="nestedOrderingQuery")
@@ -123,3 +163,109 @@ async def test_polymorphic_fragment(schema: Schema, operations, session):
     entities = (await session.execute(select(Entity))).unique().scalars().all()
     assert len(data) == len(entities)
     assert [r["id"] for r in data] == [a.id for a in entities]
+
+
+@pytest.mark.asyncio
+async def test_polymorphic_loading(schema: Schema, operations, monkeypatch):
+    backend.plan_cache.clear()
+    with count_statements() as joined_statements:
+        joined_result = await schema.execute(operations, operation_name="fragmentQuery")
+    monkeypatch.setattr(Entity, "__polymorphic_loading__", LoadingStrategy.SELECTIN)
+    backend.plan_cache.clear()
+    with count_statements() as selectin_statements:
+        selectin_result = await schema.execute(operations, operation_name="fragmentQuery")
+    backend.plan_cache.clear()
+
+    assert joined_result.errors is None
+    assert selectin_result.errors is None
+
+    # Only tables of the sub-models selected by fragments are joined
+    assert len(joined_statements) == 1
+    assert "JOIN archer" in joined_statements[0]
+    assert "JOIN mage" in joined_statements[0]
+    assert "king" not in joined_statements[0]
+    # Every selected sub-model is loaded by a separate query
+    assert len(selectin_statements) == 3
+    assert "JOIN" not in selectin_statements[0]
+
+    def normalize(data):
+        return sorted((e["id"], e.get("drawStrength"), e.get("powerSource")) for e in data["entities"]["results"])
+
+    assert normalize(joined_result.data) == normalize(selectin_result.data)
+    assert any(e.get("drawStrength") for e in joined_result.data["entities"]["results"])
+
+
+@pytest.mark.asyncio
+async def test_nested_pagination(schema: Schema, operations, session):
+    with count_statements() as statements:
+        result = await schema.execute(operations, operation_name="nestedPaginationQuery")
+
+    assert result.errors is None
+    # Only the related rows of the parent of the filtered row are ranked, by a correlated subquery
+    assert any("WHERE entity_1.submits_to_id = entity.submits_to_id ORDER BY" in s for s in statements)
+    assert any("WHERE entity_title_m2m_2.entity_id = entity_title_m2m_1.entity_id ORDER BY" in s for s in statements)
+
+    kings = (await session.execute(select(King).options(selectinload(King.subjects)))).scalars().all()
+    for king in kings:
+        (selected,) = [k for k in result.data["kings"]["results"] if k["id"] == king.id]
+        expected = sorted((s.id for s in king.subjects), reverse=True)[1:3]
+        assert sorted((s["id"] for s in selected["subjects"]), reverse=True) == expected
+
+    archers = (await session.execute(select(Archer).options(selectinload(Archer.titles)))).scalars().all()
+    for archer in archers:
+        (selected,) = [a for a in result.data["archers"]["results"] if a["id"] == archer.id]
+        expected = sorted((t.name for t in archer.titles), reverse=True)[:1]
+        assert [t["name"] for t in selected["titles"]] == expected
+
+
+@pytest.mark.asyncio
+async def test_aliased_pagination(schema: Schema, operations):
+    result = await schema.execute(
+        operations, operation_name="aliasedPaginationQuery", variable_values={"firstPageSize": 1, "secondPageSize": 1}
+    )
+    assert result.errors is None
+    for king in result.data["kings"]["results"]:
+        assert king["first"] == king["second"]
+        assert len(king["first"]) == 1
+
+    # Aliases of one relationship are loaded once, they must not select different windows
+    result = await schema.execute(
+        operations, operation_name="aliasedPaginationQuery", variable_values={"firstPageSize": 1, "secondPageSize": 5}
+    )
+    assert result.data is None
+    assert [e.message for e in result.errors] == [
+        "Field 'subjects' is selected with different arguments or directives, select it only once"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_named_fragments(schema: Schema, operations, session):
+    backend.selection_cache.clear()
+    kings = (
+        (await session.execute(select(King).options(selectinload(King.weapons), selectinload(King.subjects))))
+        .scalars()
+        .all()
+    )
+    archers = {a.id: a for a in (await session.execute(select(Archer).options(selectinload(Archer.weapons)))).scalars()}
+
+    for page_size in (2, 2, 3):
+        with count_statements() as statements:
+            result = await schema.execute(
+                operations, operation_name="namedFragmentQuery", variable_values={"subjectsPageSize": page_size}
+            )
+
+        assert result.errors is None
+        # Directives of fields selected in fragments apply too
+        assert "JOIN weapon" in statements[0]
+        for king in kings:
+            (selected,) = [k for k in result.data["kings"]["results"] if k["id"] == king.id]
+            assert sorted(w["id"] for w in selected["weapons"]) == sorted(w.id for w in king.weapons)
+            expected = sorted((s.id for s in king.subjects), reverse=True)[:page_size]
+            assert sorted((s["id"] for s in selected["subjects"]), reverse=True) == expected
+            for subject in selected["subjects"]:
+                if subject["id"] in archers:
+                    assert [w["id"] for w in subject["weapons"]] == [w.id for w in archers[subject["id"]].weapons]
+
+    # The selection is translated once per value of the page size variable
+    assert backend.selection_cache.info().misses == 2
+    assert backend.selection_cache.info().hits == 3
@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from strawberry import Schema
+
+from strawberry_mage.backends.sqlalchemy import operations as operations_module
+from strawberry_mage.backends.sqlalchemy.operations import count_
+from strawberry_mage.backends.sqlalchemy.pagination import CountMode
+from tests.sqlalchemy.example_app.schema import Title, Weapon, backend
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination(schema: Schema, operations, session: AsyncSession):
+    weapons = (await session.execute(select(Weapon).order_by(Weapon.damage, Weapon.id.desc()))).scalars().all()
+
+    pages = []
+    cursor = None
+    while True:
+        result = await schema.execute(
+            operations, operation_name="weaponsPage", variable_values={"pageSize": 3, "after": cursor}
+        )
+        assert result.errors is None
+        pages.append(result.data["weapons"])
+        cursor = result.data["weapons"]["nextCursor"]
+        if cursor is None:
+            break
+
+    assert [len(p["results"]) for p in pages] == [3, 3, 2]
+    assert [w["id"] for p in pages for w in p["results"]] == [w.id for w in weapons]
+    assert pages[0]["previousCursor"] is None
+
+    result = await schema.execute(
+        operations,
+        operation_name="weaponsPage",
+        variable_values={"pageSize": 3, "before": pages[2]["previousCursor"]},
+    )
+    assert result.errors is None
+    assert result.data["weapons"]["results"] == pages[1]["results"]
+    assert result.data["weapons"]["previousCursor"] == pages[1]["previousCursor"]
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination_invalid_cursor(schema: Schema, operations):
+    result = await schema.execute(
+        operations, operation_name="weaponsPage", variable_values={"pageSize": 3, "after": "invalid"}
+    )
+
+    assert result.errors is not None
+
+
+@pytest.mark.asyncio
+async def test_count_only_when_selected(schema: Schema, operations, session: AsyncSession):
+    backend.plan_cache.clear()
+    result = await schema.execute(operations, operation_name="weaponsPage", variable_values={"pageSize": 3})
+
+    assert result.errors is None
+    assert (Weapon, "count", ()) not in backend.plan_cache
+
+    result = await schema.execute(operations, operation_name="weaponsCount", variable_values={"damage": 17})
+
+    assert result.errors is None
+    count = (await session.execute(select(func.count(Weapon.id)).where(Weapon.damage >= 17))).scalar()
+    assert result.data["weapons"]["totalResultsCount"] == count
+    assert result.data["weapons"]["totalPages"] == (count + 1) // 2
+    assert len(result.data["weapons"]["results"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_cursors_only_when_selected(schema: Schema, operations, monkeypatch):
+    encoded = []
+    encode_cursor = operations_module.encode_cursor
+    monkeypatch.setattr(operations_module, "encode_cursor", lambda *args: encoded.append(args) or encode_cursor(*args))
+    result = await schema.execute(operations, operation_name="weaponsCount", variable_values={"damage": 0})
+
+    assert result.errors is None
+    assert encoded == []
+
+    result = await schema.execute(operations, operation_name="weaponsPage", variable_values={"pageSize": 3})
+
+    assert result.errors is None
+    assert result.data["weapons"]["nextCursor"] is not None
+    assert len(encoded) == 1
+
+
+@pytest.mark.asyncio
+async def test_estimated_count(session: AsyncSession):
+    assert await count_(session, Weapon, [], (), {}, CountMode.ESTIMATED) == 8
+
+    await session.execute(text("ANALYZE"))
+    await session.execute(text("UPDATE sqlite_stat1 SET stat = '1000 1' WHERE tbl = 'weapon'"))
+
+    assert await count_(session, Weapon, [], (), {}, CountMode.ESTIMATED) == 1000
+
+
+@pytest.mark.asyncio
+async def test_pagination_with_joined_collections(schema: Schema, operations, session: AsyncSession):
+    titles = (await session.execute(select(Title).options(selectinload(Title.entities)))).scalars().all()
+    titles = sorted(titles, key=lambda t: t.name, reverse=True)
+
+    for page_size in (1, 2):
+        result = await schema.execute(operations, operation_name="titlesPage", variable_values={"pageSize": page_size})
+
+        assert result.errors is None
+        data = result.data["titles"]["results"]
+        assert [t["name"] for t in data] == [t.name for t in titles[:page_size]]
+        for title, selected in zip(titles, data):
+            assert sorted(e["id"] for e in selected["entities"]) == sorted(e.id for e in title.entities)
+        assert (result.data["titles"]["nextCursor"] is None) == (page_size >= len(titles))
@@ -0,0 +1,79 @@
+import pytest
+from strawberry import Schema
+from strawberry.extensions import QueryDepthLimiter
+
+from strawberry_mage.core import persisted_queries as persisted_queries_module
+from strawberry_mage.core.persisted_queries import PersistedQueries, get_query_hash
+from tests.sqlalchemy.example_app.schema import manager
+
+SIMPLE_QUERY = "query weaponIds { weapons { results { id } } }"
+DEEP_QUERY = "query kingSubjects { kings { results { id subjects { id } } } }"
+
+
+@pytest.mark.asyncio
+async def test_automatic_persisted_queries(schema: Schema, operations, monkeypatch):
+    persisted_queries = PersistedQueries(maxsize=8)
+    persisted_schema = manager.get_schema(persisted_queries=persisted_queries)
+    query_hash = get_query_hash(operations)
+    variables = {"damage": 15, "names": ["crossbow", "fire staff"]}
+
+    result = await persisted_schema.execute(None, variables, operation_name="filteredWeapons", query_hash=query_hash)
+    assert [e.message for e in result.errors] == ["PersistedQueryNotFound"]
+
+    result = await persisted_schema.execute(operations, variables, operation_name="filteredWeapons")
+    assert result.errors is None
+    expected = (await schema.execute(operations, variables, operation_name="filteredWeapons")).data
+    assert result.data == expected
+
+    def parse(*_):
+        raise AssertionError("Persisted queries are not parsed again")
+
+    monkeypatch.setattr(persisted_queries_module, "parse", parse)
+    result = await persisted_schema.execute(None, variables, operation_name="filteredWeapons", query_hash=query_hash)
+    assert result.errors is None
+    assert result.data == expected
+    assert persisted_queries.cache.info().currsize == 1
+
+    result = await persisted_schema.execute(SIMPLE_QUERY, query_hash=query_hash)
+    assert [e.message for e in result.errors] == ["provided sha does not match query"]
+
+
+@pytest.mark.asyncio
+async def test_persisted_queries_allow_list(operations):
+    persisted_schema = manager.get_schema(persisted_queries=PersistedQueries(allow_list=[SIMPLE_QUERY]))
+
+    result = await persisted_schema.execute(operations, operation_name="simpleQuery")
+    assert [e.message for e in result.errors] == ["PersistedQueryNotAllowed"]
+
+    by_text = await persisted_schema.execute(SIMPLE_QUERY)
+    by_hash = await persisted_schema.execute(None, query_hash=get_query_hash(SIMPLE_QUERY))
+    assert by_text.errors is None
+    assert by_hash.errors is None
+    assert len(by_hash.data["weapons"]["results"]) == 8
+    assert by_text.data == by_hash.data
+
+
+@pytest.mark.asyncio
+async def test_persisted_queries_extension_validation_rules():
+    persisted_queries = PersistedQueries()
+    persisted_schema = manager.get_schema(persisted_queries=persisted_queries)
+    persisted_schema.extensions = [*persisted_schema.extensions, QueryDepthLimiter(max_depth=2)]
+
+    by_text = await persisted_schema.execute(DEEP_QUERY)
+    by_hash = await persisted_schema.execute(None, query_hash=get_query_hash(DEEP_QUERY))
+    for result in (by_text, by_hash):
+        assert result.data is None
+        assert [e.message for e in result.errors] == ["'kingSubjects' exceeds maximum operation depth of 2"]
+
+    result = await persisted_schema.execute(SIMPLE_QUERY)
+    assert result.errors is None
+
+    other_schema = manager.get_schema(persisted_queries=persisted_queries)
+    result = await other_schema.execute(None, query_hash=get_query_hash(DEEP_QUERY))
+    assert result.errors is None
+    assert len(result.data["kings"]["results"]) == 2
+
+    result = await persisted_schema.execute("{ weapons { unknown } }")
+    assert result.errors
+    result = await persisted_schema.execute(None, query_hash=get_query_hash("{ weapons { unknown } }"))
+    assert result.errors
@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from strawberry import Schema
+
+from tests.sqlalchemy.example_app.schema import Weapon, backend
+
+
+@pytest.mark.asyncio
+async def test_plan_cache_reuses_plans(schema: Schema, operations, session: AsyncSession):
+    backend.plan_cache.clear()
+    for damage, names in ((15, ["crossbow", "fire staff"]), (30, ["mace", "bow", "lightning wand", "fire staff"])):
+        result = await schema.execute(
+            operations, operation_name="filteredWeapons", variable_values={"damage": damage, "names": names}
+        )
+
+        assert result.errors is None
+
+        weapons = (
+            (
+                await session.execute(
+                    select(Weapon).where(Weapon.damage >= damage, Weapon.name.in_(names)).order_by(Weapon.id.desc())
+                )
+            )
+            .scalars()
+            .all()
+        )
+        assert [w["id"] for w in result.data["weapons"]["results"]] == [w.id for w in weapons]
+
+    assert backend.plan_cache.info().misses == 1
+    assert backend.plan_cache.info().hits == 1
+    assert backend.plan_cache.info().currsize == 1
@@ -0,0 +1,58 @@
+import pytest
+from strawberry import Schema
+
+from strawberry_mage.core.result_cache import InMemoryResultCache
+from tests.sqlalchemy.example_app.schema import backend
+from tests.sqlalchemy.test_loading import count_statements
+
+
+def test_in_memory_result_cache():
+    now = [0.0]
+    cache = InMemoryResultCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.set("weapons", 1, cache.snapshot(["weapon"]))
+    cache.set("titles", 2, cache.snapshot(["title", "entity_title_m2m"]))
+    cache.invalidate(["weapon"])
+    assert cache.get("weapons") is None
+    assert cache.get("titles") == 2
+
+    # Results read while their tables changed are not stored
+    snapshot = cache.snapshot(["title"])
+    cache.invalidate(["title"])
+    cache.set("titles", 3, snapshot)
+    assert cache.get("titles") is None
+
+    cache.set("a", 1, cache.snapshot([]))
+    cache.set("b", 2, cache.snapshot([]))
+    cache.get("a")
+    cache.set("c", 3, cache.snapshot([]))
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    now[0] = 10
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+
+
+@pytest.mark.asyncio
+async def test_result_cache(schema: Schema, operations, monkeypatch):
+    monkeypatch.setattr(backend, "_result_cache", InMemoryResultCache())
+    result = await schema.execute(operations, operation_name="nestedSelectQuery")
+    with count_statements() as statements:
+        cached_result = await schema.execute(operations, operation_name="nestedSelectQuery")
+
+    assert result.errors is None
+    assert cached_result.data == result.data
+    assert statements == []
+
+    (archer, *_) = result.data["archers"]["results"]
+    weapons = [{"damage": 1, "name": "dagger", "owner": {"primaryKey_": {"id": archer["id"]}}}]
+    created = await schema.execute(operations, operation_name="bulkCreateWeapons", variable_values={"weapons": weapons})
+    with count_statements() as statements:
+        changed_result = await schema.execute(operations, operation_name="nestedSelectQuery")
+
+    assert created.errors is None
+    # Created weapons invalidate the results which selected weapons
+    assert statements
+    (changed_archer, *_) = changed_result.data["archers"]["results"]
+    assert len(changed_archer["weapons"]) == len(archer["weapons"]) + 1
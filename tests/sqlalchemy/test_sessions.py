@@ -0,0 +1,80 @@
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+import pytest
+from sqlalchemy import event
+from strawberry import Schema
+
+from strawberry_mage.backends.sqlalchemy.session import SessionScope
+from tests.sqlalchemy.example_app.schema import backend, engine
+
+
+@contextmanager
+def count_checkouts():
+    checkouts = []
+
+    def checkout(*args):
+        checkouts.append(args)
+
+    event.listen(engine.sync_engine.pool, "checkout", checkout)
+    try:
+        yield checkouts
+    finally:
+        event.remove(engine.sync_engine.pool, "checkout", checkout)
+
+
+@asynccontextmanager
+async def measure_in_flight():
+    in_flight = [0]
+    peak = [0]
+
+    def before_cursor_execute(*_):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+
+    def after_cursor_execute(*_):
+        in_flight[0] -= 1
+
+    # Statements are slowed down in the thread of the driver, the event loop keeps running meanwhile
+    async with engine.connect() as connection:
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+    await driver_connection.set_progress_handler(lambda: time.sleep(0.001), 100)
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        yield peak
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.remove(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+        await driver_connection.set_progress_handler(None, 100)
+
+
+@pytest.mark.asyncio
+async def test_request_scoped_session(schema: Schema, operations, monkeypatch):
+    field_result = await schema.execute(operations, operation_name="dashboardQuery", context_value={})
+
+    monkeypatch.setattr(backend, "_session_scope", SessionScope.REQUEST)
+    context = {}
+    with count_checkouts() as checkouts:
+        request_result = await schema.execute(operations, operation_name="dashboardQuery", context_value=context)
+
+    assert request_result.errors is None
+    assert request_result.data == field_result.data
+    # All root fields share a single connection, the session is closed at the end of the request
+    assert len(checkouts) == 1
+    assert "sqlalchemy_session" not in context["strawberry_mage"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads(schema: Schema, operations, monkeypatch):
+    sequential_result = await schema.execute(operations, operation_name="dashboardQuery")
+
+    monkeypatch.setattr(backend, "_session_scope", SessionScope.REQUEST)
+    monkeypatch.setattr(backend, "_max_concurrent_reads", 2)
+    async with measure_in_flight() as peak:
+        concurrent_result = await schema.execute(operations, operation_name="dashboardQuery", context_value={})
+
+    assert concurrent_result.errors is None
+    assert concurrent_result.data == sequential_result.data
+    # Root fields are read concurrently, at most 2 at a time
+    assert 1 < peak[0] <= 2
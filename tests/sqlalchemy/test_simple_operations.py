@@ -1,10 +1,12 @@
 import pytest
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from strawberry import Schema
 
-from tests.sqlalchemy.example_app.schema import King, Weapon, Entity, Archer
+from strawberry_mage.backends.sqlalchemy import operations as operations_module
+from tests.sqlalchemy.example_app.schema import King, Weapon, Entity, Archer, House, Mage
+from tests.sqlalchemy.test_loading import count_statements
 
 
 @pytest.mark.asyncio
@@ -101,3 +103,274 @@ async def test_simple_delete(schema: Schema, session: AsyncSession, operations):
     assert await session.get(Archer, archer_id) is None
     assert await session.get(Weapon, 1) is None
     assert await session.get(Weapon, 6) is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_create(schema: Schema, session: AsyncSession, operations):
+    weapons = [
+        {"damage": i, "name": f"bulk {i}", "owner": {"primaryKey_": {"id": 1 + i % 3}} if i % 2 else None}
+        for i in range(50)
+    ]
+    with count_statements() as statements:
+        result = await schema.execute(
+            operations, operation_name="bulkCreateWeapons", variable_values={"weapons": weapons}
+        )
+
+    assert result.errors is None
+    # Owners are checked by selecting their primary keys, without loading the entities
+    assert [s for s in statements if s.startswith("SELECT") and "FROM entity" in s] == [
+        "SELECT entity.id \nFROM entity \nWHERE entity.id IN (?, ?, ?)"
+    ]
+    # Without RETURNING (SQLite), every row is inserted by a separate statement to get its primary key
+    assert sum(s.startswith("INSERT INTO weapon") for s in statements) == len(weapons)
+
+    created = {w["id"]: w for w in result.data["createWeapons"]}
+    assert sorted(w["name"] for w in created.values()) == sorted(w["name"] for w in weapons)
+    rows = (await session.execute(select(Weapon).where(Weapon.id.in_(created)))).scalars().all()
+    owners = {w.name: w.owner_id for w in rows}
+    assert owners == {w["name"]: w["owner"]["primaryKey_"]["id"] if w["owner"] else None for w in weapons}
+
+    weapons[1]["owner"] = {"primaryKey_": {"id": 1000}}
+    result = await schema.execute(operations, operation_name="bulkCreateWeapons", variable_values={"weapons": weapons})
+    assert result.errors[0].message == "Entity with primary key (id=1000) does not exist"
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_chunks(session: AsyncSession):
+    rows = [{"id": 100 + i, "damage": i, "name": f"chunked {i}"} for i in range(5)]
+    with count_statements() as statements:
+        primary_keys = await operations_module._bulk_insert(session, Weapon, rows, 2)
+        generated_keys = await operations_module._bulk_insert(session, Weapon, [{"damage": 1}, {"damage": 2}], 2)
+    await session.commit()
+
+    assert primary_keys == [{"id": 100 + i} for i in range(5)]
+    assert len(generated_keys) == 2 and all(key["id"] > 104 for key in generated_keys)
+    # Rows with primary keys are inserted by multi-row statements, the others one by one
+    assert [s.count("(?, ?, ?)") for s in statements[:3]] == [2, 2, 1]
+    assert len(statements) == 5
+
+
+@pytest.mark.asyncio
+async def test_create_with_batched_references(schema: Schema, session: AsyncSession, operations):
+    kings = [
+        {
+            "name": f"king {i}",
+            "submitsTo": {"primaryKey_": {"id": 1}},
+            "weapons": [{"primaryKey_": {"id": i * 2 + 1}}, {"primaryKey_": {"id": i * 2 + 2}}],
+            "subjects": [{"primaryKey_": {"id": 4 + i}}],
+        }
+        for i in range(3)
+    ]
+    with count_statements() as statements:
+        result = await schema.execute(
+            operations, operation_name="createKingsWithReferences", variable_values={"kings": kings}
+        )
+
+    assert result.errors is None
+    # One query per referenced model, Weapon, Entity and King, before the kings are inserted
+    inserts = [i for i, s in enumerate(statements) if s.startswith("INSERT")]
+    assert len([s for s in statements[: inserts[0]] if s.startswith("SELECT")]) == 3
+
+    ids = [k["id"] for k in result.data["createKings"]]
+    created = (
+        (await session.execute(select(King).options(selectinload(King.weapons)).where(King.id.in_(ids))))
+        .scalars()
+        .all()
+    )
+    assert sorted(sorted(w.id for w in k.weapons) for k in created) == [[1, 2], [3, 4], [5, 6]]
+
+    kings[1]["weapons"].append({"primaryKey_": {"id": 1000}})
+    result = await schema.execute(
+        operations, operation_name="createKingsWithReferences", variable_values={"kings": kings}
+    )
+    assert result.errors[0].message == "Weapon with primary key (id=1000) does not exist"
+
+
+@pytest.mark.asyncio
+async def test_update_columns_without_loading(schema: Schema, session: AsyncSession, operations):
+    archers = (await session.execute(select(Archer).order_by(Archer.id))).scalars().all()
+    data = [
+        {"primaryKey_": {"id": a.id}, "drawStrength": 50.0 + i, "submitsTo": {"primaryKey_": {"id": 1}}}
+        for i, a in enumerate(archers)
+    ]
+    with count_statements() as statements:
+        result = await schema.execute(
+            operations, operation_name="updateArchersColumns", variable_values={"archers": data}
+        )
+
+    assert result.errors is None
+    # Columns of both tables of the joined inheritance are updated without loading the entities
+    updates = [s for s in statements if s.startswith("UPDATE")]
+    assert sorted(updates) == sorted(
+        [
+            "UPDATE archer SET draw_strength=? WHERE archer.id = ?",
+            "UPDATE entity SET submits_to_id=? WHERE entity.id = ?",
+        ]
+    )
+    assert not any("weapon" in s or "title" in s for s in statements)
+    assert sorted((a["id"], a["drawStrength"], a["submitsTo"]["id"]) for a in result.data["updateArchers"]) == [
+        (a.id, 50.0 + i, 1) for i, a in enumerate(archers)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_update_collections(schema: Schema, session: AsyncSession, operations):
+    def keys(*ids, name="id"):
+        return [{"primaryKey_": {name: i}} for i in ids]
+
+    # An entity without titles and an archer with both titles and a weapon
+    first, second = 3, 6
+    data = [
+        {
+            "primaryKey_": {"id": first},
+            "titlesChanges": {"add": keys("squire", "personal guard", name="name")},
+            "weapons": keys(1, 2),
+        },
+        {
+            "primaryKey_": {"id": second},
+            "titles": keys("squire", "personal guard", name="name"),
+            "titlesChanges": {"remove": keys("squire", name="name")},
+            "weaponsChanges": {"add": keys(3)},
+        },
+    ]
+    with count_statements() as statements:
+        result = await schema.execute(
+            operations, operation_name="updateCollections", variable_values={"entities": data}
+        )
+
+    assert result.errors is None
+    # Collections are changed without loading them, replaced ones are diffed against the keys of their entries
+    assert not any(s.startswith("SELECT") and "JOIN" in s and "entity_title_m2m" in s for s in statements)
+    assert sum(s.startswith("SELECT entity_title_m2m.entity_id, entity_title_m2m.title_name") for s in statements) == 1
+    # Only the entries not kept are changed
+    assert sorted(s for s in statements if s.startswith(("INSERT", "DELETE", "UPDATE"))) == [
+        "DELETE FROM entity_title_m2m WHERE entity_title_m2m.entity_id = ? AND entity_title_m2m.title_name = ?",
+        "INSERT INTO entity_title_m2m (entity_id, title_name) VALUES (?, ?)",
+        "UPDATE weapon SET owner_id=? WHERE weapon.id = ?",
+    ]
+
+    updated = (
+        (
+            await session.execute(
+                select(Entity)
+                .where(Entity.id.in_([first, second]))
+                .options(selectinload(Entity.titles), selectinload(Entity.weapons))
+                .order_by(Entity.id)
+                .execution_options(populate_existing=True)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    assert [sorted(t.name for t in e.titles) for e in updated] == [["personal guard", "squire"], ["personal guard"]]
+    assert [sorted(w.id for w in e.weapons) for e in updated] == [[1, 2], [3]]
+
+    result = await schema.execute(
+        operations,
+        operation_name="updateCollections",
+        variable_values={"entities": [{"primaryKey_": {"id": first}, "weapons": keys(2, 4)}]},
+    )
+    assert result.errors is None
+    owners = dict((await session.execute(select(Weapon.id, Weapon.owner_id).where(Weapon.id.in_([1, 2, 4])))).all())
+    assert owners == {1: None, 2: first, 4: first}
+
+    result = await schema.execute(
+        operations,
+        operation_name="updateCollections",
+        variable_values={"entities": [{"primaryKey_": {"id": first}, "titles": keys("king", name="name")}]},
+    )
+    assert result.errors[0].message == "Title with primary key (name='king') does not exist"
+
+
+@pytest.mark.asyncio
+async def test_delete_in_chunks(schema: Schema, session: AsyncSession, operations, monkeypatch):
+    session.add_all([House(name=f"house {i}", region="north" if i % 2 else "south") for i in range(5)])
+    await session.commit()
+    monkeypatch.setattr(operations_module, "MAX_BOUND_PARAMETERS", 4)
+
+    houses = [{"primaryKey_": {"name": f"house {i}", "region": "north" if i % 2 else "south"}} for i in range(4)]
+    with count_statements() as statements:
+        result = await schema.execute(
+            operations,
+            operation_name="deleteMany",
+            variable_values={"weapons": [{"primaryKey_": {"id": i}} for i in range(1, 7)], "houses": houses},
+        )
+
+    assert result.errors is None
+    assert result.data["deleteWeapons"]["affectedRows"] == 6
+    assert result.data["deleteHouses"]["affectedRows"] == 4
+    deletes = [s for s in statements if s.startswith("DELETE")]
+    # 4 weapon keys and 2 composite house keys fit in one statement
+    assert sum("FROM weapon" in s for s in deletes) == 2
+    assert sum("FROM house" in s for s in deletes) == 2
+    assert all(" OR " not in s for s in deletes)
+    assert (await session.execute(select(House.name))).scalars().all() == ["house 4"]
+
+
+@pytest.mark.asyncio
+async def test_filter_mutations(schema: Schema, session: AsyncSession, operations):
+    with count_statements() as statements:
+        result = await schema.execute(
+            operations,
+            operation_name="filterMutations",
+            variable_values={"kingName": "Vizimir II", "kingId": 1, "drawStrength": 35, "damage": 19},
+        )
+
+    assert result.errors is None
+    assert result.data["updateWeaponsWhere"]["affectedRows"] == 4
+    assert result.data["updateArchersWhere"]["affectedRows"] == 2
+    assert result.data["deleteWeaponsWhere"]["affectedRows"] == 1
+    # Weapons are updated and deleted by one statement each, without selecting them
+    assert sum(s.startswith("UPDATE weapon") for s in statements) == 1
+    assert sum(s.startswith("DELETE FROM weapon") for s in statements) == 1
+    assert not any(s.startswith("SELECT") and "FROM weapon" in s for s in statements)
+
+    weapons = (await session.execute(select(Weapon.id, Weapon.damage).order_by(Weapon.id))).all()
+    assert weapons == [(1, 5), (2, 5), (3, 13), (4, 17), (5, 17), (6, 5), (7, 5)]
+    archers = (await session.execute(select(Archer.id, Archer.draw_strength, Archer.submits_to_id))).all()
+    assert sorted(archers) == [(4, 50, 1), (6, 50, 1), (9, 40, 2)]
+
+
+@pytest.mark.asyncio
+async def test_unrestricted_where(schema: Schema, session: AsyncSession, operations):
+    operations_data = {"updateWeaponsWhere": {"set": {"damage": 1}}, "deleteWeaponsWhere": {}}
+    for operation_name, data in operations_data.items():
+        for filters in ({}, {"filters": []}, {"filters": [None, {}]}):
+            result = await schema.execute(
+                operations, operation_name=operation_name, variable_values={"data": {**data, **filters}}
+            )
+            assert result.data is None
+            assert [e.message for e in result.errors] == [
+                "Filters are required to update or delete entities by filters, unless allEntities is set"
+            ]
+    assert (await session.execute(select(func.count()).where(Weapon.damage != 1))).scalar() == 8
+
+    for operation_name, data in operations_data.items():
+        result = await schema.execute(
+            operations, operation_name=operation_name, variable_values={"data": {**data, "allEntities": True}}
+        )
+        assert result.errors is None
+        assert result.data[operation_name]["affectedRows"] == 8
+    assert (await session.execute(select(func.count()).select_from(Weapon))).scalar() == 0
+
+
+@pytest.mark.asyncio
+async def test_polymorphic_delete_where(schema: Schema, session: AsyncSession, operations):
+    result = await schema.execute(
+        operations,
+        operation_name="polymorphicDeleteWhere",
+        variable_values={"kingName": "Radovid V", "drawStrength": 35},
+    )
+
+    assert result.errors is None
+    assert result.data["deleteArchersWhere"]["affectedRows"] == 2
+    assert result.data["deleteEntitiesWhere"]["affectedRows"] == 3
+    # Rows are deleted from the tables of parent models and of sub-models
+    for table, rows in ((Entity.__table__, 5), (Archer.__table__, 0), (Mage.__table__, 1)):
+        assert (await session.execute(select(func.count()).select_from(table))).scalar() == rows
+
+    result = await schema.execute(operations, operation_name="fragmentQuery")
+
+    assert result.errors is None
+    assert len(result.data["entities"]["results"]) == 5
+    assert [e["powerSource"] for e in result.data["entities"]["results"] if "powerSource" in e] == ["AIR"]
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import update
+from strawberry import Schema
+
+from tests.sqlalchemy.example_app.schema import Weapon
+
+
+async def _match(schema: Schema, operations, prefix: str, search: str):
+    result = await schema.execute(
+        operations, operation_name="stringMatching", variable_values={"prefix": prefix, "search": search}
+    )
+    assert result.errors is None
+    return {key: sorted(w["name"] for w in value["results"]) for key, value in result.data.items()}
+
+
+@pytest.mark.asyncio
+async def test_prefix_filters(schema: Schema, operations):
+    data = await _match(schema, operations, "Cross", "bow")
+    assert data["prefixed"] == []
+    assert data["insensitivePrefixed"] == ["crossbow"]
+    # Wildcards of the prefix are escaped
+    for prefix in ("%bow", "*bow", "?ross", "[c]ross"):
+        data = await _match(schema, operations, prefix, "bow")
+        assert data["prefixed"] == []
+        assert data["insensitivePrefixed"] == []
+    data = await _match(schema, operations, "one-", "bow")
+    assert data["prefixed"] == ["one-handed sword"]
+
+
+@pytest.mark.asyncio
+async def test_search_filter(schema: Schema, operations, session):
+    data = await _match(schema, operations, "x", "sword")
+    assert data["searched"] == ["one-handed sword", "two-handed sword"]
+    data = await _match(schema, operations, "x", "crossbow blue")
+    assert data["searched"] == ["blue crossbow"]
+    # Search syntax of the text is escaped
+    data = await _match(schema, operations, "x", 'sword" OR "bow')
+    assert data["searched"] == []
+
+    # The search index is kept in sync with the table
+    session.add(Weapon(damage=5, name="wooden sword"))
+    await session.execute(update(Weapon).where(Weapon.name == "one-handed sword").values(name="one-handed axe"))
+    await session.commit()
+    data = await _match(schema, operations, "x", "sword")
+    assert data["searched"] == ["two-handed sword", "wooden sword"]
+
+
+@pytest.mark.asyncio
+async def test_search_not_searchable(schema: Schema):
+    result = await schema.execute('{ kings(data: { filters: [{ name: { search: "II" } }] }) { results { id } } }')
+    assert [e.message for e in result.errors] == ["Attribute name of King is not searchable"]